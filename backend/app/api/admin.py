@@ -3,65 +3,130 @@ Admin API endpoints (internal use).
 """
 import asyncio
 import logging
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from app.services.refresh import refresh_all_sources
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database import get_db, get_write_db
+from app.scrapers.registry import list_scrapers
+from app.services.refresh_queue import enqueue_refresh, get_job
+from app.services.refresh_runs import get_run_report
+from app.services.refresh_worker import start_refresh_worker
+from app.services.source_schedule import load_schedules
 # Note: APScheduler removed - using Koyeb cron jobs instead
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 logger = logging.getLogger(__name__)
 
-
-def run_refresh_background():
-    """Run refresh in background thread."""
-    try:
-        logger.info("Starting background refresh...")
-        result = refresh_all_sources()
-        logger.info(
-            f"Background refresh completed: {result.status}, "
-            f"{result.sources_processed} sources, "
-            f"{result.new_offers} new, {result.updated_offers} updated"
-        )
-    except Exception as e:
-        logger.error(f"Background refresh failed: {str(e)}", exc_info=True)
+# Set when a `refresh_cli --daemon` consumes the queue, so the API doesn't start its own workers
+REFRESH_QUEUE_DAEMON = os.getenv("REFRESH_QUEUE_DAEMON", "").lower() in ("1", "true", "yes")
 
 
 @router.post("/refresh")
-async def refresh_jobs(background_tasks: BackgroundTasks):
+async def refresh_jobs(sources: Optional[str] = None, dry_run: bool = False, db: Session = Depends(get_write_db)):
     """
-    Trigger a manual refresh of all job offers.
+    Trigger a manual refresh of job offers.
+    
+    Args:
+        sources: Comma-separated sources to refresh (default: all sources)
+        dry_run: Scrape and compute the would-be new/updated/inactivated
+                 offers without writing them; the changes are returned by
+                 GET /api/admin/refresh/jobs/{job_id}
     
     This endpoint:
     - Returns immediately (for cron services with short timeouts)
-    - Runs scraping in background
-    - Re-scrapes all configured sources
+    - Queues a refresh job (refresh_jobs); repeated requests while a job is
+      still queued are coalesced into it
+    - Starts a `refresh_cli --drain` worker process to consume the queue,
+      unless REFRESH_QUEUE_DAEMON says a `refresh_cli --daemon` is running
+    - Re-scrapes the selected sources
     - Updates existing offers
     - Adds new offers
     - Marks missing offers as inactive
     
     Returns:
-        Immediate response indicating refresh started
+        Immediate response with the queued job
     """
-    # Run refresh in background to avoid timeout issues
-    background_tasks.add_task(run_refresh_background)
+    source_ids = None
+    if sources is not None:
+        source_ids = [name.strip() for name in sources.split(",") if name.strip()]
+        unknown = sorted(set(source_ids) - set(list_scrapers()))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown sources: {', '.join(unknown)}")
+        if not source_ids:
+            raise HTTPException(status_code=400, detail="No sources given")
+    
+    job_id, coalesced = enqueue_refresh(source_ids, dry_run, db)
+    if not REFRESH_QUEUE_DAEMON:
+        start_refresh_worker(["--drain"])
     
     return {
-        "status": "started",
-        "message": "Refresh job started in background. Check logs for progress.",
+        "status": "queued",
+        "job_id": job_id,
+        "coalesced": coalesced,
+        "dry_run": dry_run,
+        "message": f"Refresh job queued. Check GET /api/admin/refresh/jobs/{job_id} for progress.",
         "note": "This endpoint returns immediately to avoid timeout issues with cron services."
     }
 
 
+@router.get("/refresh/latest")
+async def get_latest_refresh(db: Session = Depends(get_db)):
+    """
+    Get the status of the most recent refresh run.
+    
+    Returns:
+        Run report (see get_refresh)
+    """
+    report = get_run_report(db)
+    if not report:
+        raise HTTPException(status_code=404, detail="No refresh runs recorded")
+    return report
+
+
+@router.get("/refresh/jobs/{job_id}")
+async def get_refresh_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Get the status of a queued refresh job.
+    
+    Returns:
+        Job status and run id; dry-run jobs include their result (changes
+        and timings per source)
+    """
+    job = get_job(job_id, db)
+    if not job:
+        raise HTTPException(status_code=404, detail="Refresh job not found")
+    return job
+
+
+@router.get("/refresh/{run_id}")
+async def get_refresh(run_id: int, db: Session = Depends(get_db)):
+    """
+    Get the status of a refresh run.
+    
+    Returns:
+        Run status and RefreshResult counters, with per-source state,
+        duration, bytes fetched and item counts (slowest sources first)
+    """
+    report = get_run_report(db, run_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Refresh run not found")
+    return report
+
+
 @router.get("/scheduler/status")
-async def get_scheduler_status():
+async def get_scheduler_status(db: Session = Depends(get_db)):
     """
     Get the status of scheduled refreshes.
     
     Note: Scheduled refreshes are handled by Koyeb cron jobs,
     not by an in-process scheduler. This endpoint provides
-    information about the cron schedule.
+    information about the cron schedule and the adaptive per-source
+    intervals used by `refresh_cli --due-only`.
     
     Returns:
-        Dictionary with cron schedule information
+        Dictionary with cron schedule information and source schedules
     """
     return {
         "scheduler_type": "koyeb_cron",
@@ -70,6 +135,7 @@ async def get_scheduler_status():
         "timezone": "UTC",
         "schedule": "Daily at 1:00 AM UTC (2:00 AM Polish time, 3:00 AM during DST)",
         "cron_expression": "0 1 * * *",
-        "message": "Scheduled refreshes are handled by Koyeb cron jobs. Use /api/admin/refresh for manual refresh."
+        "message": "Scheduled refreshes are handled by Koyeb cron jobs. Use /api/admin/refresh for manual refresh.",
+        "source_schedules": load_schedules(db),
     }
 
@@ -3,14 +3,79 @@ Job offers API endpoints.
 """
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from sqlalchemy import func, or_, select
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import JobOffer, MedicalRole
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
+# Fields a list result can contain, in response order
+LIST_FIELDS = (
+    "id", "title", "facility_name", "city", "role", "description", "summary", "mentions_physiotherapist",
+    "source_url", "created_at",
+)
+
+# Named field sets for the fields= parameter; "card" is what job cards show (and filter on:
+# mentions_physiotherapist stands in for the description there)
+FIELD_PRESETS = {
+    "card": tuple(field for field in LIST_FIELDS if field != "description"),
+    "full": LIST_FIELDS,
+}
+
+# Serializers for fields that are not returned as stored
+FIELD_SERIALIZERS = {
+    "role": lambda role: role.value,
+    "created_at": lambda created_at: created_at.isoformat(),
+}
+
+
+def parse_fields(fields: Optional[str]) -> tuple:
+    """
+    Resolve the fields= parameter of list_jobs.
+    
+    Args:
+        fields: A preset name ("card" or "full") or a comma-separated list of
+            field names; None means "card"
+    
+    Returns:
+        Field names in response order
+    
+    Raises:
+        HTTPException: 400 if a field name is unknown
+    """
+    if not fields:
+        return FIELD_PRESETS["card"]
+    if fields in FIELD_PRESETS:
+        return FIELD_PRESETS[fields]
+    
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(LIST_FIELDS)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+                   f"Use {', '.join(FIELD_PRESETS)} or a comma-separated subset of {', '.join(LIST_FIELDS)}",
+        )
+    return tuple(field for field in LIST_FIELDS if field in requested)
+
+
+def _escape_like(text: str) -> str:
+    """Escape LIKE wildcards so user input matches literally (escape character: backslash)."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def serialize_job(job: JobOffer, fields: tuple) -> dict:
+    """Serialize the given fields of a job offer."""
+    result = {}
+    for field in fields:
+        value = getattr(job, field)
+        serializer = FIELD_SERIALIZERS.get(field)
+        result[field] = serializer(value) if serializer and value is not None else value
+    return result
+
 
 @router.get("")
 @router.get("/")
@@ -18,48 +83,59 @@ async def list_jobs(
     role: Optional[MedicalRole] = None,
     limit: int = 100,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    q: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    List job offers with optional role filter.
+    List job offers with optional role filter and text search.
+    
+    Only the requested columns are loaded; with the default "card" fields the
+    description is never sent. Search runs in the database, so it also finds
+    offers whose description (not part of the card) matches.
     
     Args:
         role: Filter by medical role (optional)
         limit: Maximum number of results (default: 100)
         offset: Pagination offset (default: 0)
+        fields: "card" (default, without description), "full", or a
+            comma-separated list of fields
+        q: Only offers whose title or description contains this text
+            (case-insensitive; optional)
         db: Database session
     """
-    query = db.query(JobOffer).filter(JobOffer.status == 'active')
+    selected = parse_fields(fields)
+    
+    conditions = [JobOffer.status == 'active']
     
     if role:
-        query = query.filter(JobOffer.role == role)
+        conditions.append(JobOffer.role == role)
+    
+    if q and q.strip():
+        pattern = '%' + _escape_like(q.strip()) + '%'
+        conditions.append(or_(
+            JobOffer.title.ilike(pattern, escape='\\'),
+            JobOffer.description.ilike(pattern, escape='\\'),
+        ))
     
-    total = query.count()
-    jobs = query.order_by(JobOffer.created_at.desc()).limit(limit).offset(offset).all()
+    total = await db.scalar(select(func.count()).select_from(JobOffer).where(*conditions))
+    jobs = (await db.scalars(
+        select(JobOffer).where(*conditions).options(
+            load_only(*(getattr(JobOffer, field) for field in selected))
+        ).order_by(JobOffer.created_at.desc()).limit(limit).offset(offset)
+    )).all()
     
     return {
         "total": total,
         "limit": limit,
         "offset": offset,
-        "results": [
-            {
-                "id": job.id,
-                "title": job.title,
-                "facility_name": job.facility_name,
-                "city": job.city,
-                "role": job.role.value,
-                "description": job.description,
-                "summary": job.summary,
-                "source_url": job.source_url,
-                "created_at": job.created_at.isoformat(),
-            }
-            for job in jobs
-        ],
+        "fields": list(selected),
+        "results": [serialize_job(job, selected) for job in jobs],
     }
 
 
 @router.get("/{job_id}")
-async def get_job(job_id: int, db: Session = Depends(get_db)):
+async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get a single job offer by ID.
     
@@ -67,7 +143,7 @@ async def get_job(job_id: int, db: Session = Depends(get_db)):
         job_id: Job offer ID
         db: Database session
     """
-    job = db.query(JobOffer).filter(JobOffer.id == job_id).first()
+    job = await db.get(JobOffer, job_id)
     
     if not job:
         raise HTTPException(status_code=404, detail="Job offer not found")
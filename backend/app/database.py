@@ -1,14 +1,27 @@
 """
 Database connection and session management.
+
+Engines are created on first use (get_engine(), get_read_engine(),
+get_async_engine()), not at import, so importing this module stays cheap
+and can't fail on DNS.
 """
+import logging
 import os
 import socket
-from sqlalchemy import create_engine
+import threading
+import time
+from functools import lru_cache
+from typing import Dict
+from sqlalchemy import create_engine, event, inspect, make_url, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from urllib.parse import urlparse, urlunparse
 
-from app.models import Base
+from app.models import Base, JobOffer
+from app.utils.urls import canonicalize_url
+
+logger = logging.getLogger(__name__)
 
 # Get database URL from environment variable (for production) or use SQLite (for local)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./medi-etat.db")
@@ -20,20 +33,59 @@ if DATABASE_URL.startswith("postgres://"):
 # Determine if we're using SQLite or PostgreSQL
 is_sqlite = DATABASE_URL.startswith("sqlite")
 
-if is_sqlite:
-    # SQLite configuration
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},  # Needed for SQLite
-        poolclass=StaticPool,  # SQLite doesn't support connection pooling
-        echo=False,  # Set to True for SQL query logging during development
-    )
-else:
-    # PostgreSQL configuration
-    # Railway and most platforms support both IPv4 and IPv6
-    # PythonAnywhere free tier doesn't support IPv6, but Railway does
+# An in-memory database exists once per connection, so it can't be pooled
+is_sqlite_memory = is_sqlite and make_url(DATABASE_URL).database in (None, "", ":memory:")
+
+# How long a resolved IPv4 address of the database host is reused (seconds)
+DATABASE_DNS_TTL = float(os.getenv("DATABASE_DNS_TTL", "300"))
+
+# SQLite tuning, applied to every new connection (see set_sqlite_pragmas)
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Connect event: put a new SQLite connection into the production profile.
+    
+    WAL lets readers run alongside a writer (the journal mode is stored in
+    the database file). synchronous=NORMAL is durable enough with WAL and
+    avoids an fsync per commit; mmap_size serves reads from memory-mapped
+    pages; busy_timeout makes a connection wait for a lock instead of
+    failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def set_sqlite_read_only(dbapi_connection, connection_record):
+    """Connect event: make a connection of the read engine refuse writes."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+
+@lru_cache(maxsize=None)
+def rewrite_supabase_url(url: str) -> str:
+    """
+    Rewrite Supabase URLs to the IPv4-compatible Session Pooler.
+    
+    Railway and most platforms support both IPv4 and IPv6, but PythonAnywhere
+    free tier is IPv4-only. Only rewrites the URL, no DNS lookups.
+    
+    Args:
+        url: PostgreSQL URL
+    
+    Returns:
+        The URL to connect to
+    """
     try:
-        parsed = urlparse(DATABASE_URL)
+        parsed = urlparse(url)
         hostname = parsed.hostname
         port = parsed.port
         
@@ -53,7 +105,7 @@ else:
                 else:
                     netloc = parsed.netloc + ':5432'
                 
-                DATABASE_URL = urlunparse((
+                url = urlunparse((
                     parsed.scheme,
                     netloc,
                     parsed.path,
@@ -62,11 +114,10 @@ else:
                     parsed.fragment
                 ))
                 # Re-parse after conversion
-                parsed = urlparse(DATABASE_URL)
+                parsed = urlparse(url)
                 hostname = parsed.hostname
                 port = parsed.port
-                import logging
-                logging.getLogger(__name__).info(f"Converted Transaction Pooler (6543) to Session Pooler (5432) for IPv4 compatibility")
+                logger.info(f"Converted Transaction Pooler (6543) to Session Pooler (5432) for IPv4 compatibility")
         
         # If using direct connection (IPv6-only), we MUST convert to Session Pooler
         if hostname and 'supabase.co' in hostname and '.pooler.' not in hostname:
@@ -91,7 +142,7 @@ else:
                     
                     netloc = f"{auth}@{pooler_hostname}:5432"
                     
-                    DATABASE_URL = urlunparse((
+                    url = urlunparse((
                         parsed.scheme,
                         netloc,
                         parsed.path,
@@ -100,94 +151,136 @@ else:
                         parsed.fragment
                     ))
                     # Re-parse after conversion
-                    parsed = urlparse(DATABASE_URL)
+                    parsed = urlparse(url)
                     hostname = parsed.hostname
                     port = parsed.port
-                    import logging
-                    logging.getLogger(__name__).info(f"Converted direct connection to Session Pooler for IPv4 compatibility")
-        
-        # Try IPv4 resolution for all Supabase connections (direct or pooler)
-        # PythonAnywhere free tier doesn't support IPv6 - MUST use IPv4
-        if hostname and 'supabase' in hostname:
-            # Check if hostname is already an IP address
-            is_ip = False
-            try:
-                socket.inet_aton(hostname)  # Will raise exception if not an IP
-                is_ip = True
-            except socket.error:
-                pass
-            
-            if not is_ip:
-                # Not an IP, try to resolve to IPv4
-                import logging
-                logger = logging.getLogger(__name__)
-                try:
-                    # Force IPv4-only resolution (AF_INET = IPv4 only)
-                    # This prevents IPv6 addresses from being returned
-                    ip_addresses = socket.getaddrinfo(
-                        hostname, 
-                        port or 5432, 
-                        socket.AF_INET,  # IPv4 only!
-                        socket.SOCK_STREAM,
-                        socket.IPPROTO_TCP
-                    )
-                    ipv4_address = None
-                    for addr_info in ip_addresses:
-                        if addr_info[0] == socket.AF_INET:  # IPv4
-                            ipv4_address = addr_info[4][0]
-                            break
-                    
-                    if ipv4_address:
-                        # Replace hostname with IPv4 address in netloc
-                        # Handle port in netloc properly
-                        if ':' in parsed.netloc:
-                            # netloc format: user:pass@host:port
-                            parts = parsed.netloc.rsplit('@', 1)
-                            if len(parts) == 2:
-                                auth_part, host_port = parts
-                                if ':' in host_port:
-                                    host_part, port_part = host_port.rsplit(':', 1)
-                                    netloc = f"{auth_part}@{ipv4_address}:{port_part}"
-                                else:
-                                    netloc = f"{auth_part}@{ipv4_address}:{port or 5432}"
-                            else:
-                                # No auth, just host:port
-                                if ':' in parsed.netloc:
-                                    netloc = parsed.netloc.replace(hostname, ipv4_address)
-                                else:
-                                    netloc = f"{ipv4_address}:{port or 5432}"
-                        else:
-                            # No port in netloc
-                            if '@' in parsed.netloc:
-                                # Has auth: user:pass@host
-                                auth_part, host_part = parsed.netloc.rsplit('@', 1)
-                                netloc = f"{auth_part}@{ipv4_address}:{port or 5432}"
-                            else:
-                                # Just hostname
-                                netloc = f"{ipv4_address}:{port or 5432}"
-                        
-                        DATABASE_URL = urlunparse((
-                            parsed.scheme,
-                            netloc,
-                            parsed.path,
-                            parsed.params,
-                            parsed.query,
-                            parsed.fragment
-                        ))
-                        logger.info(f"Resolved {hostname} to IPv4: {ipv4_address}. New URL: {DATABASE_URL.split('@')[0]}@[REDACTED]")
-                    else:
-                        logger.warning(f"Could not find IPv4 address for {hostname}")
-                except (socket.gaierror, OSError, ValueError) as e:
-                    # If resolution fails, log error
-                    import logging
-                    logging.getLogger(__name__).error(f"Could not resolve {hostname} to IPv4: {e}. Connection will likely fail on PythonAnywhere.")
+                    logger.info(f"Converted direct connection to Session Pooler for IPv4 compatibility")
     except Exception as e:
         # If URL parsing fails, log and continue with original URL
-        import logging
-        logging.getLogger(__name__).error(f"Error parsing DATABASE_URL: {e}. Using as-is.")
+        logger.error(f"Error parsing DATABASE_URL: {e}. Using as-is.")
+    return url
+
+
+# hostname -> (IPv4 address, expiry as time.monotonic())
+_dns_cache = {}
+_dns_lock = threading.Lock()
+
+
+def resolve_ipv4(hostname: str, port: int, refresh: bool = False):
+    """
+    Resolve a hostname to an IPv4 address, cached for DATABASE_DNS_TTL seconds.
+    
+    Args:
+        hostname: Host to resolve
+        port: Port (for getaddrinfo)
+        refresh: Ignore the cached address
+    
+    Returns:
+        IPv4 address, or None if it can't be resolved
+    """
+    now = time.monotonic()
+    with _dns_lock:
+        cached = _dns_cache.get(hostname)
+        if cached and not refresh and cached[1] > now:
+            return cached[0]
     
+    try:
+        # Force IPv4-only resolution (AF_INET = IPv4 only)
+        # This prevents IPv6 addresses from being returned
+        addresses = socket.getaddrinfo(hostname, port, socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    except (socket.gaierror, OSError, ValueError) as e:
+        logger.error(f"Could not resolve {hostname} to IPv4: {e}. Connection will likely fail on PythonAnywhere.")
+        # A stale address is better than none while DNS is having a hiccup
+        return cached[0] if cached else None
+    
+    if not addresses:
+        logger.warning(f"Could not find IPv4 address for {hostname}")
+        return None
+    ipv4_address = addresses[0][4][0]
+    with _dns_lock:
+        _dns_cache[hostname] = (ipv4_address, now + DATABASE_DNS_TTL)
+    if not cached or cached[0] != ipv4_address:
+        logger.info(f"Resolved {hostname} to IPv4: {ipv4_address}")
+    return ipv4_address
+
+
+def _is_ip_address(hostname: str) -> bool:
+    try:
+        socket.inet_aton(hostname)  # Will raise exception if not an IP
+        return True
+    except socket.error:
+        return False
+
+
+def connect_over_ipv4(engine, address_param: str):
+    """
+    Make an engine connect to its Supabase host over IPv4.
+    
+    PythonAnywhere free tier doesn't support IPv6, so every new connection
+    gets the host's (cached) IPv4 address in address_param: libpq's
+    hostaddr for psycopg2, which keeps host for TLS, or asyncpg's host. If
+    connecting fails, the address is resolved again (it may have changed)
+    and the connection retried once.
+    """
+    @event.listens_for(engine, "do_connect")
+    def do_connect(dialect, connection_record, cargs, cparams):
+        hostname = cparams.get("host")
+        if not hostname or "supabase" not in hostname or _is_ip_address(hostname):
+            return None
+        port = cparams.get("port") or 5432
+        
+        ipv4_address = resolve_ipv4(hostname, port)
+        if not ipv4_address:
+            return None
+        try:
+            return dialect.connect(*cargs, **dict(cparams, **{address_param: ipv4_address}))
+        except Exception:
+            fresh_address = resolve_ipv4(hostname, port, refresh=True)
+            if not fresh_address or fresh_address == ipv4_address:
+                raise
+            logger.info(f"Retrying connection to {hostname} at its new address {fresh_address}")
+            return dialect.connect(*cargs, **dict(cparams, **{address_param: fresh_address}))
+
+
+def _create_engines():
+    """Create the sync write and read engines (see get_engine())."""
+    if is_sqlite_memory:
+        engine = create_engine(
+            DATABASE_URL,
+            connect_args={"check_same_thread": False},  # Needed for SQLite
+            poolclass=StaticPool,  # All sessions share the one in-memory database
+            echo=False,  # Set to True for SQL query logging during development
+        )
+        return engine, engine
+    
+    if is_sqlite:
+        # SQLite configuration: every session checks out its own pooled
+        # connection, so API threads and the refresh threads no longer share one
+        engine = create_engine(
+            DATABASE_URL,
+            connect_args={"check_same_thread": False},  # Connections move between threads via the pool
+            pool_size=5,
+            max_overflow=10,
+            echo=False,  # Set to True for SQL query logging during development
+        )
+        event.listen(engine, "connect", set_sqlite_pragmas)
+        
+        # Read-only engine for request handlers: with WAL, its readers see the
+        # last committed state while a refresh is writing
+        read_engine = create_engine(
+            DATABASE_URL,
+            connect_args={"check_same_thread": False},
+            pool_size=5,
+            max_overflow=10,
+            echo=False,
+        )
+        event.listen(read_engine, "connect", set_sqlite_pragmas)
+        event.listen(read_engine, "connect", set_sqlite_read_only)
+        return engine, read_engine
+    
+    # PostgreSQL configuration
     engine = create_engine(
-        DATABASE_URL,
+        rewrite_supabase_url(DATABASE_URL),
         pool_pre_ping=True,  # Verify connections before using
         pool_size=5,  # Connection pool size
         max_overflow=10,  # Max overflow connections
@@ -196,23 +289,329 @@ else:
             "connect_timeout": 10,
         },
     )
+    connect_over_ipv4(engine, "hostaddr")
+    return engine, engine
+
+
+def _create_async_engine():
+    """
+    Create the async engine for the async API endpoints (see get_async_engine()).
+    
+    Same URL with the async driver; reads through it don't block the event loop.
+    Not used with in-memory SQLite, whose database only exists on the sync
+    engine's connection (see get_async_db()).
+    """
+    if is_sqlite:
+        async_engine = create_async_engine(
+            make_url(DATABASE_URL).set(drivername="sqlite+aiosqlite"),
+            connect_args={"check_same_thread": False},
+            echo=False,
+        )
+        event.listen(async_engine.sync_engine, "connect", set_sqlite_pragmas)
+        event.listen(async_engine.sync_engine, "connect", set_sqlite_read_only)
+        return async_engine
+    
+    async_url = make_url(rewrite_supabase_url(DATABASE_URL)).set(drivername="postgresql+asyncpg")
+    async_connect_args = {
+        "timeout": 10,  # asyncpg's name for connect_timeout
+    }
+    # asyncpg doesn't understand libpq's sslmode query parameter, but takes its values as ssl
+    if "sslmode" in async_url.query:
+        async_connect_args["ssl"] = async_url.query["sslmode"]
+        async_url = async_url.difference_update_query(["sslmode"])
+    async_engine = create_async_engine(
+        async_url,
+        pool_pre_ping=True,
+        pool_size=5,
+        max_overflow=10,
+        echo=False,
+        connect_args=async_connect_args,
+    )
+    connect_over_ipv4(async_engine.sync_engine, "host")
+    return async_engine
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def _get_or_create(name: str, create):
+    engine = _engines.get(name)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(name)
+            if engine is None:
+                started = time.perf_counter()
+                created = create()
+                if isinstance(created, tuple):
+                    _engines["engine"], _engines["read_engine"] = created
+                else:
+                    _engines[name] = created
+                logger.info(f"Created {name} in {(time.perf_counter() - started) * 1000:.1f} ms")
+                engine = _engines[name]
+    return engine
+
+
+def get_engine():
+    """The engine for writes, created on first use."""
+    return _get_or_create("engine", _create_engines)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def get_read_engine():
+    """The read-only engine (the write engine except on file-based SQLite), created on first use."""
+    return _get_or_create("read_engine", _create_engines)
+
+
+def get_async_engine():
+    """The async (read-only on SQLite) engine, created on first use."""
+    return _get_or_create("async_engine", _create_async_engine)
+
+
+async def dispose_engines():
+    """Close the pooled connections of the engines created so far."""
+    async_engine = _engines.get("async_engine")
+    if async_engine is not None:
+        await async_engine.dispose()
+    for name in ("engine", "read_engine"):
+        if name in _engines:
+            _engines[name].dispose()
+
+
+def __getattr__(name):
+    # Keep `from app.database import engine` working (it creates the engine)
+    getters = {"engine": get_engine, "read_engine": get_read_engine, "async_engine": get_async_engine}
+    if name in getters:
+        return getters[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazySession(Session):
+    """Session bound to an engine getter, so creating it doesn't create the engine."""
+    
+    def __init__(self, engine_getter=None, **kwargs):
+        super().__init__(**kwargs)
+        self.engine_getter = engine_getter
+    
+    def get_bind(self, mapper=None, **kwargs):
+        if self.bind is None and self.engine_getter is not None:
+            return self.engine_getter()
+        return super().get_bind(mapper, **kwargs)
+
+
+# Create session factories
+SessionLocal = sessionmaker(class_=LazySession, autocommit=False, autoflush=False, engine_getter=get_engine)
+ReadSessionLocal = sessionmaker(
+    class_=LazySession, autocommit=False, autoflush=False, engine_getter=get_read_engine
+)
+AsyncSessionLocal = async_sessionmaker(
+    sync_session_class=LazySession,
+    autoflush=False,
+    expire_on_commit=False,
+    engine_getter=lambda: get_async_engine().sync_engine,
+)
+
+
+# Indexes replaced by newer model indexes, dropped by init_db() (per dialect)
+REPLACED_INDEXES = {
+    # Partial job_offers indexes that had status as a leading key column
+    'postgresql': (
+        'ix_job_offers_status_created_at',
+        'ix_job_offers_status_role_created_at',
+        'ix_job_offers_source_id_status_last_seen_at',
+    ),
+}
 
 
 def init_db():
     """Initialize database - create all tables."""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
+    add_missing_columns()
+    add_missing_indexes()
+    drop_replaced_indexes()
+    backfill_canonical_urls()
+
+
+def add_missing_columns():
+    """
+    Add model columns that are missing from existing tables.
+    
+    create_all() only creates missing tables, so columns added to a model
+    later are added here with ALTER TABLE. Such columns must be nullable
+    (no constraints or defaults are carried over).
+    """
+    engine = get_engine()
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+
+
+
+def add_missing_indexes():
+    """
+    Create model indexes that are missing from existing tables.
+    
+    Like add_missing_columns(), for indexes declared after a table was
+    created (create_all() skips existing tables entirely).
+    """
+    engine = get_engine()
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+
+
+def drop_replaced_indexes():
+    """Drop the indexes listed in REPLACED_INDEXES for this database's dialect."""
+    engine = get_engine()
+    names = REPLACED_INDEXES.get(engine.dialect.name, ())
+    if not names:
+        return
+    with engine.begin() as conn:
+        for name in names:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def backfill_canonical_urls(dry_run: bool = False) -> Dict:
+    """
+    Set canonical_url on offers stored before the column existed.
+    
+    Writers match offers by canonical_url, so a legacy offer without one
+    would not be found under a variant of its URL and would be stored again.
+    Offers get canonicalize_url(source_url), oldest first. An offer whose
+    canonical URL is already taken is a duplicate: it keeps canonical_url
+    NULL and, if still active, is marked inactive.
+    
+    Args:
+        dry_run: Compute the changes without writing them
+    
+    Returns:
+        {'assigned': int, 'duplicates': list of their source_urls, 'inactivated': int}
+    """
+    chunk_size = 500
+    report = {'assigned': 0, 'duplicates': [], 'inactivated': 0}
+    with Session(bind=get_engine()) as db:
+        rows = db.execute(
+            select(JobOffer.id, JobOffer.source_url, JobOffer.status)
+            .where(JobOffer.canonical_url.is_(None)).order_by(JobOffer.id)
+        ).all()
+        if not rows:
+            return report
+        canonical_urls = [canonicalize_url(row.source_url) for row in rows]
+        taken = set()
+        for start in range(0, len(canonical_urls), chunk_size):
+            taken.update(db.execute(
+                select(JobOffer.canonical_url).where(JobOffer.canonical_url.in_(canonical_urls[start:start + chunk_size]))
+            ).scalars())
+        
+        assigned = []
+        inactivate = []
+        for row, canonical_url in zip(rows, canonical_urls):
+            if canonical_url in taken:
+                report['duplicates'].append(row.source_url)
+                if row.status == 'active':
+                    inactivate.append(row.id)
+                continue
+            taken.add(canonical_url)
+            assigned.append({'id': row.id, 'canonical_url': canonical_url})
+        report['assigned'] = len(assigned)
+        report['inactivated'] = len(inactivate)
+        if dry_run or not (assigned or inactivate):
+            return report
+        
+        for start in range(0, len(assigned), chunk_size):
+            db.execute(update(JobOffer), assigned[start:start + chunk_size])
+        for start in range(0, len(inactivate), chunk_size):
+            db.execute(update(JobOffer).where(JobOffer.id.in_(inactivate[start:start + chunk_size]))
+                       .values(status='inactive'))
+        db.commit()
+    logger.info(f"Set canonical_url on {report['assigned']} legacy offers, "
+                f"inactivated {report['inactivated']} of {len(report['duplicates'])} duplicates")
+    return report
 
 
 def get_db() -> Session:
     """
-    Dependency for FastAPI to get database session.
+    Dependency for FastAPI to get a read-only database session.
     Usage: db: Session = Depends(get_db)
+    
+    On SQLite the session comes from read_engine, so it never waits for (or
+    blocks) a refresh writing; on PostgreSQL it is a regular session.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_write_db() -> Session:
+    """
+    Dependency for FastAPI endpoints that write.
+    Usage: db: Session = Depends(get_write_db)
     """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+class SyncBackedAsyncSession:
+    """
+    The awaitable AsyncSession methods the async endpoints use, run on a sync Session.
+    
+    aiosqlite would open a second, empty in-memory database, so with
+    in-memory SQLite the async endpoints read through the shared StaticPool
+    connection instead (each query blocks the event loop, as before).
+    """
+    
+    def __init__(self, session: Session):
+        self.session = session
+    
+    async def execute(self, statement, *args, **kwargs):
+        return self.session.execute(statement, *args, **kwargs)
+    
+    async def scalar(self, statement, *args, **kwargs):
+        return self.session.scalar(statement, *args, **kwargs)
+    
+    async def scalars(self, statement, *args, **kwargs):
+        return self.session.scalars(statement, *args, **kwargs)
+    
+    async def get(self, entity, ident, **kwargs):
+        return self.session.get(entity, ident, **kwargs)
+
+
+async def get_async_db() -> AsyncSession:
+    """
+    Dependency for async FastAPI endpoints to get an async database session.
+    Usage: db: AsyncSession = Depends(get_async_db)
+    
+    With in-memory SQLite it is a SyncBackedAsyncSession over the shared
+    connection.
+    """
+    if is_sqlite_memory:
+        db = ReadSessionLocal()
+        try:
+            yield SyncBackedAsyncSession(db)
+        finally:
+            db.close()
+        return
+    
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -10,7 +10,7 @@ from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from app.database import init_db
+from app.database import dispose_engines, init_db
 from app.api import jobs, admin
 # Note: APScheduler removed - using Koyeb cron jobs instead
 
@@ -44,6 +44,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Medietat API...")
+    await dispose_engines()
     logger.info("Shutdown complete")
 
 
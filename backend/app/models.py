@@ -5,11 +5,20 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, Float, Boolean, String, Text, DateTime, ForeignKey, Index, UniqueConstraint, Enum as SQLEnum, func, or_, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import column_property
 
 Base = declarative_base()
 
+# Words that mark an "other staff" offer as a physiotherapist's (matched case-insensitively)
+PHYSIOTHERAPIST_KEYWORDS = ('fizjoterapeut', 'physiotherapist')
+
+
+def _mentions_any(columns, keywords):
+    """SQL expression: any of the columns contains any of the keywords (case-insensitive)."""
+    return or_(*(column.ilike(f'%{keyword}%') for column in columns for keyword in keywords))
+
 
 class MedicalRole(str, Enum):
     """Medical role taxonomy for job offers."""
@@ -23,6 +32,23 @@ class MedicalRole(str, Enum):
 class JobOffer(Base):
     """Job offer model."""
     __tablename__ = "job_offers"
+    __table_args__ = (
+        # Query shapes of GET /api/jobs (active offers, optionally by role, newest first) and of
+        # the refresh (a source's active offers by last_seen_at). SQLite can't match partial
+        # indexes against bound parameters, so status is a key column there.
+        Index('ix_job_offers_status_created_at', 'status', 'created_at').ddl_if(dialect='sqlite'),
+        Index('ix_job_offers_status_role_created_at', 'status', 'role', 'created_at').ddl_if(dialect='sqlite'),
+        Index('ix_job_offers_source_id_status_last_seen_at', 'source_id', 'status', 'last_seen_at')
+        .ddl_if(dialect='sqlite'),
+        # On PostgreSQL the indexes only cover active rows. status stays out of the keys: as a
+        # leading column the planner couldn't seek on the columns after it.
+        Index('ix_job_offers_active_created_at', 'created_at',
+              postgresql_where=text("status = 'active'")).ddl_if(dialect='postgresql'),
+        Index('ix_job_offers_active_role_created_at', 'role', 'created_at',
+              postgresql_where=text("status = 'active'")).ddl_if(dialect='postgresql'),
+        Index('ix_job_offers_active_source_id_last_seen_at', 'source_id', 'last_seen_at',
+              postgresql_where=text("status = 'active'")).ddl_if(dialect='postgresql'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(500), nullable=False, index=True)
@@ -31,7 +57,9 @@ class JobOffer(Base):
     role = Column(SQLEnum(MedicalRole), nullable=False, index=True)
     description = Column(Text, nullable=True)  # Full description from source
     summary = Column(String(500), nullable=True)  # Short summary for cards (generated or extracted)
+    content_hash = Column(String(64), nullable=True, index=True)  # sha256 of cleaned title/facility/city/role/description
     source_url = Column(String(1000), unique=True, nullable=False, index=True)
+    canonical_url = Column(String(1000), unique=True, nullable=True, index=True)  # canonicalize_url(source_url) when first stored
     scraped_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
@@ -41,7 +69,188 @@ class JobOffer(Base):
     first_seen_at = Column(DateTime, nullable=True)  # When this offer was first discovered
     last_seen_at = Column(DateTime, nullable=True, index=True)  # When this offer was last seen during refresh
     status = Column(String(20), default='active', nullable=False, index=True)  # 'active' | 'inactive'
+    
+    # Whether the title or description names a physiotherapist, computed by the database so
+    # list results can classify offers without loading the description (deferred: load on request)
+    mentions_physiotherapist = column_property(
+        _mentions_any((title, func.coalesce(description, '')), PHYSIOTHERAPIST_KEYWORDS), deferred=True,
+    )
 
     def __repr__(self):
         return f"<JobOffer(id={self.id}, title='{self.title[:50]}...', facility='{self.facility_name}', city='{self.city}', status='{self.status}')>"
 
+
+class JobOfferArchive(Base):
+    """
+    Inactive job offer moved out of job_offers by the archival job (app/services/archive.py).
+    
+    Same columns as JobOffer; the original id is kept in offer_id, and the
+    offer is moved back (and reactivated) if its source lists it again.
+    """
+    __tablename__ = "job_offers_archive"
+
+    id = Column(Integer, primary_key=True)
+    offer_id = Column(Integer, nullable=False, index=True)  # job_offers.id before archiving
+    title = Column(String(500), nullable=False)
+    facility_name = Column(String(255), nullable=False)
+    city = Column(String(100), nullable=False)
+    role = Column(SQLEnum(MedicalRole), nullable=False)
+    description = Column(Text, nullable=True)
+    summary = Column(String(500), nullable=True)
+    content_hash = Column(String(64), nullable=True)
+    source_url = Column(String(1000), nullable=False, index=True)
+    canonical_url = Column(String(1000), nullable=True, index=True)
+    scraped_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    source_id = Column(String(100), nullable=True)
+    external_job_url = Column(String(1000), nullable=True)
+    first_seen_at = Column(DateTime, nullable=True)
+    last_seen_at = Column(DateTime, nullable=True)
+    status = Column(String(20), nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<JobOfferArchive(offer_id={self.offer_id}, source_url='{self.source_url}', archived_at='{self.archived_at}')>"
+
+
+class SourceValidator(Base):
+    """HTTP cache validators from the last successful fetch of a source URL."""
+    __tablename__ = "source_validators"
+
+    url = Column(String(1000), primary_key=True)
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+    content_length = Column(Integer, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # sha256 of the response body
+    config_hash = Column(String(64), nullable=True)  # Scraper configuration the validators were recorded under
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SourceValidator(url='{self.url}', etag='{self.etag}', last_modified='{self.last_modified}')>"
+
+
+class SourceFingerprint(Base):
+    """Hash of a source's normalized job listing from the last successful refresh."""
+    __tablename__ = "source_fingerprints"
+
+    source_id = Column(String(100), primary_key=True)
+    listing_hash = Column(String(64), nullable=False)  # sha256 of the normalized listing
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SourceFingerprint(source_id='{self.source_id}', listing_hash='{self.listing_hash[:12]}...')>"
+
+
+class RefreshRun(Base):
+    """A refresh of all sources, checkpointed per source so it can be resumed."""
+    __tablename__ = "refresh_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), default='running', nullable=False, index=True)  # 'running' | 'incomplete' | 'success' | 'partial' | 'failed'
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)  # When the last attempt on this run ended
+    
+    # RefreshResult counters, aggregated over all sources of the run (set when an attempt ends)
+    sources_processed = Column(Integer, nullable=True)
+    sources_failed = Column(Integer, nullable=True)
+    sources_pending = Column(Integer, nullable=True)
+    sources_timed_out = Column(Integer, nullable=True)
+    new_offers = Column(Integer, nullable=True)
+    updated_offers = Column(Integer, nullable=True)
+    inactivated_offers = Column(Integer, nullable=True)
+    fingerprint_hits = Column(Integer, nullable=True)
+    fingerprint_misses = Column(Integer, nullable=True)
+    bytes_fetched = Column(Integer, nullable=True)
+
+    def __repr__(self):
+        return f"<RefreshRun(id={self.id}, status='{self.status}', started_at='{self.started_at}')>"
+
+
+class RefreshSourceRun(Base):
+    """State of one source within a refresh run."""
+    __tablename__ = "refresh_source_runs"
+    __table_args__ = (UniqueConstraint('run_id', 'source_id', name='uq_refresh_source_runs_run_source'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey('refresh_runs.id'), nullable=False, index=True)
+    source_id = Column(String(100), nullable=False)
+    state = Column(String(20), default='pending', nullable=False)  # 'pending' | 'running' | 'done' | 'failed'
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+    new_offers = Column(Integer, default=0, nullable=False)
+    updated_offers = Column(Integer, default=0, nullable=False)
+    inactivated_offers = Column(Integer, default=0, nullable=False)
+    
+    # Metrics of the last attempt
+    outcome = Column(String(20), nullable=True)  # 'not_modified' | 'fingerprint_hit' | 'applied' | 'empty' | 'timed_out'
+    duration_seconds = Column(Float, nullable=True)
+    bytes_fetched = Column(Integer, nullable=True)  # Response bodies (rendered HTML for Playwright pages)
+    items_scraped = Column(Integer, nullable=True)  # Offers returned by the scraper
+
+    def __repr__(self):
+        return f"<RefreshSourceRun(run_id={self.run_id}, source_id='{self.source_id}', state='{self.state}')>"
+
+
+class SourceSchedule(Base):
+    """Observed change rate and adaptive refresh interval of a source."""
+    __tablename__ = "source_schedules"
+
+    source_id = Column(String(100), primary_key=True)
+    change_rate = Column(Float, nullable=True)  # Smoothed offer changes (new + updated + inactivated) per hour
+    interval_hours = Column(Float, nullable=False)
+    last_refreshed_at = Column(DateTime, nullable=True)  # Last successful refresh
+    next_due_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<SourceSchedule(source_id='{self.source_id}', interval_hours={self.interval_hours}, next_due_at='{self.next_due_at}')>"
+
+
+class RefreshJob(Base):
+    """A queued refresh request, consumed by refresh_cli workers."""
+    __tablename__ = "refresh_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), default='queued', nullable=False, index=True)  # 'queued' | 'running' | 'done' | 'failed' | 'coalesced'
+    sources = Column(Text, nullable=True)  # JSON list of source ids (NULL: all sources)
+    dry_run = Column(Boolean, default=False, nullable=True)  # Compute changes without writing them
+    request_count = Column(Integer, default=1, nullable=False)  # Requests coalesced into this job
+    requested_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    leased_by = Column(String(100), nullable=True)  # Worker holding the job
+    lease_expires_at = Column(DateTime, nullable=True)  # Another worker may take over after this
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    run_id = Column(Integer, nullable=True)  # refresh_runs row of the job
+    error = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)  # JSON result of dry runs (they have no refresh_runs row)
+
+    def __repr__(self):
+        return f"<RefreshJob(id={self.id}, status='{self.status}', leased_by='{self.leased_by}')>"
+
+
+class SourceLease(Base):
+    """Lease held by the worker currently refreshing a source (at most one per source)."""
+    __tablename__ = "source_leases"
+
+    source_id = Column(String(100), primary_key=True)
+    holder = Column(String(100), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<SourceLease(source_id='{self.source_id}', holder='{self.holder}', expires_at='{self.expires_at}')>"
+
+
+class BackfillProgress(Base):
+    """Progress cursor of a maintenance backfill, committed with each chunk."""
+    __tablename__ = "backfill_progress"
+
+    name = Column(String(100), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)  # Highest job_offers.id processed
+    rows_processed = Column(Integer, nullable=False, default=0)
+    rows_changed = Column(Integer, nullable=False, default=0)  # Rows updated or deleted
+    started_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)  # NULL while the backfill is incomplete
+
+    def __repr__(self):
+        return f"<BackfillProgress(name='{self.name}', last_id={self.last_id}, finished_at='{self.finished_at}')>"
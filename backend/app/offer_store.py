@@ -0,0 +1,71 @@
+"""
+Shared persistence helpers for job offers.
+
+Used both by the scrapers' save functions and by the services (changeset,
+archive), so it depends only on the models: the scrapers must not import
+app.services.
+"""
+import logging
+from typing import List
+
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import JobOffer, JobOfferArchive
+
+# Columns copied between job_offers and job_offers_archive (the archive keeps job_offers.id as offer_id)
+OFFER_COLUMNS = [column.name for column in JobOffer.__table__.columns if column.name != 'id']
+
+logger = logging.getLogger(__name__)
+
+
+def restore_archived_offers(canonical_urls: List[str], source_urls: List[str], db: Session) -> int:
+    """
+    Move archived offers matching the given URLs back into job_offers.
+    
+    Called by writers for scraped URLs they can't find in job_offers. The
+    offers come back inactive, under their original id when it is still
+    free, so the caller's lookup finds them and reactivates them like any
+    inactive offer. Archived offers whose URL is in job_offers again are left
+    alone. The caller commits.
+    
+    Args:
+        canonical_urls: Canonical URLs to look up
+        source_urls: Source URLs to look up (for offers without canonical_url)
+        db: Database session
+    
+    Returns:
+        Number of restored offers
+    """
+    if not canonical_urls and not source_urls:
+        return 0
+    
+    in_hot_table = select(JobOffer.id).where(or_(
+        JobOffer.source_url == JobOfferArchive.source_url,
+        JobOffer.canonical_url == JobOfferArchive.canonical_url,
+    )).exists()
+    # SQLite may have reused an archived offer's id for a newer offer
+    id_taken = select(JobOffer.id).where(JobOffer.id == JobOfferArchive.offer_id).exists()
+    rows = db.execute(
+        select(JobOfferArchive.id, id_taken.label('id_taken')).where(
+            or_(JobOfferArchive.canonical_url.in_(canonical_urls), JobOfferArchive.source_url.in_(source_urls)),
+            ~in_hot_table,
+        )
+    ).all()
+    if not rows:
+        return 0
+    
+    columns = [getattr(JobOfferArchive, name) for name in OFFER_COLUMNS]
+    keep_id = [row.id for row in rows if not row.id_taken]
+    new_id = [row.id for row in rows if row.id_taken]
+    if keep_id:
+        db.execute(insert(JobOffer).from_select(
+            ['id'] + OFFER_COLUMNS, select(JobOfferArchive.offer_id, *columns).where(JobOfferArchive.id.in_(keep_id))
+        ))
+    if new_id:
+        db.execute(insert(JobOffer).from_select(
+            OFFER_COLUMNS, select(*columns).where(JobOfferArchive.id.in_(new_id))
+        ))
+    db.execute(delete(JobOfferArchive).where(JobOfferArchive.id.in_(keep_id + new_id)))
+    logger.info(f"Restored {len(rows)} offers from the archive")
+    return len(rows)
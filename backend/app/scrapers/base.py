@@ -1,24 +1,136 @@
 """
 Base scraper class with common functionality.
 """
+import asyncio
+import hashlib
+import json
 import re
+import socket
+import ssl
+import sys
+import time
 from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import List, Dict, Optional
 from urllib.parse import urljoin, urlparse
 
+import httpx
 import requests
 from bs4 import BeautifulSoup
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 
 from app.models import JobOffer, MedicalRole
+from app.offer_store import restore_archived_offers
+from app.scrapers.http_client import AsyncHttpClient, DEFAULT_HEADERS
 from app.scrapers.playwright_helper import PlaywrightHelper
+from app.scrapers.rate_limiter import THROTTLE_STATUSES, get_host_limiter
+from app.utils.content_hash import CONTENT_FIELDS, compute_content_hash, content_hash_columns, stored_content_hash
 from app.utils.summary import extract_summary
+from app.utils.urls import canonicalize_url
+
+
+# Jobs per prefetch query and upsert statement in save_or_update_to_db()
+BULK_CHUNK_SIZE = 500
+
+_PREFETCH_COLUMNS = (
+    JobOffer.source_url, JobOffer.canonical_url, JobOffer.status, JobOffer.source_id, JobOffer.external_job_url, *content_hash_columns(),
+)
+
+
+# Exceptions that mean the host failed the request (connection refused or
+# reset, read error, timeout) and count against its rate limiter
+_HOST_FAILURES = (
+    requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError,
+    httpx.TransportError,
+)
+
+
+def _is_host_failure(error: Exception, timeout_capped: bool) -> bool:
+    """
+    Whether a failed request should make the host's limiter back off.
+    
+    Local failures (DNS resolution, TLS setup) and timeouts shortened to meet
+    the scrape deadline say nothing about the host's load.
+    
+    Args:
+        error: Exception raised by the request
+        timeout_capped: True if the request timeout was cut short by the deadline
+    """
+    if not isinstance(error, _HOST_FAILURES):
+        return False
+    if timeout_capped and isinstance(error, (requests.exceptions.Timeout, httpx.TimeoutException)):
+        return False
+    
+    # requests and httpx wrap the underlying error, so walk the chain
+    seen = set()
+    pending = [error]
+    while pending:
+        cause = pending.pop()
+        if cause is None or id(cause) in seen:
+            continue
+        seen.add(id(cause))
+        if isinstance(cause, (socket.gaierror, ssl.SSLError)):
+            return False
+        pending.extend([cause.__cause__, cause.__context__, getattr(cause, 'reason', None)])
+        pending.extend(arg for arg in cause.args if isinstance(arg, BaseException))
+    return True
+
+
+def _upsert_job_offers(dialect_name: str):
+    """
+    INSERT ... ON CONFLICT (source_url) DO UPDATE for job_offers.
+    
+    Conflicting rows keep their id, created_at, first_seen_at, canonical_url
+    and (once set) source_id; summary and external_job_url are only
+    overwritten when a new one is given.
+    """
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    
+    table = JobOffer.__table__
+    stmt = insert(table)
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.source_url],
+        set_={
+            'title': excluded.title,
+            'facility_name': excluded.facility_name,
+            'city': excluded.city,
+            'role': excluded.role,
+            'description': excluded.description,
+            'content_hash': excluded.content_hash,
+            'summary': func.coalesce(excluded.summary, table.c.summary),
+            'scraped_at': excluded.scraped_at,
+            'last_seen_at': excluded.last_seen_at,
+            'status': excluded.status,
+            'source_id': func.coalesce(table.c.source_id, excluded.source_id),
+            'external_job_url': func.coalesce(excluded.external_job_url, table.c.external_job_url),
+        },
+    )
+
+
+class PageNotModified(Exception):
+    """Raised by fetch_page when the server reports the page as unchanged since the last refresh."""
+    
+    def __init__(self, url: str):
+        super().__init__(f"Page not modified: {url}")
+        self.url = url
 
 
 class BaseScraper(ABC):
     """Base class for all job offer scrapers."""
     
+    # Whether scrape() drives the shared Playwright browser. Playwright's sync API
+    # is bound to the thread that started it, so the refresh engine pins these
+    # sources to a dedicated worker.
+    uses_playwright: bool = False
+    
+    # Wall-clock budget for one scrape in seconds (None: the refresh engine's default)
+    timeout_seconds: Optional[float] = None
+    
     def __init__(self, base_url: str, facility_name: str, city: str = "Gdańsk", source_id: str = None):
         """
         Initialize scraper.
@@ -34,18 +146,45 @@ class BaseScraper(ABC):
         self.city = city
         self.source_id = source_id
         self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'pl-PL,pl;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        })
+        self.session.headers.update(DEFAULT_HEADERS)
+        
+        # Cache validators from the previous refresh, keyed by URL (set by the refresh engine)
+        self.validators: Dict[str, Dict] = {}
+        # Validators observed during this scrape, to be persisted after a successful refresh
+        self.fetched_validators: Dict[str, Dict] = {}
+        # Hash of the normalized job-list region, if the scraper can isolate one
+        self.listing_fingerprint: Optional[str] = None
+        # Response bytes downloaded during this scrape
+        self.bytes_fetched = 0
+        # time.monotonic() deadline of the current scrape, if any
+        self.deadline: Optional[float] = None
+        self._config_hash: Optional[str] = None
+    
+    def close(self):
+        """
+        Close the scraper's requests session and its keep-alive connections.
+        
+        Requests still in flight on another thread finish; their connections
+        are closed instead of going back to the pool.
+        """
+        self.session.close()
+    
+    def start_refresh(self, validators: Optional[Dict[str, Dict]] = None, deadline: Optional[float] = None):
+        """
+        Reset per-refresh state before a scrape.
+        
+        Pooled scraper instances are reused across refreshes, so results of
+        the previous scrape must not leak into the next one.
+        
+        Args:
+            validators: HTTP cache validators from previous refreshes, keyed by URL
+            deadline: time.monotonic() deadline of the scrape; fetches are cut short to meet it
+        """
+        self.validators = validators or {}
+        self.fetched_validators = {}
+        self.listing_fingerprint = None
+        self.bytes_fetched = 0
+        self.deadline = deadline
     
     def fetch_page(self, url: str, use_playwright: bool = False, wait_selector: Optional[str] = None) -> Optional[BeautifulSoup]:
         """
@@ -60,45 +199,236 @@ class BaseScraper(ABC):
             BeautifulSoup object or None if fetch fails
         """
         if use_playwright:
-            return PlaywrightHelper.fetch_page(url, wait_selector=wait_selector)
+            return self._count_rendered(PlaywrightHelper.fetch_page(url, wait_selector=wait_selector, deadline=self.deadline))
         
+        limiter = get_host_limiter(url)
         try:
-            # Add retry logic for 503 errors
-            import time
             max_retries = 3
-            retry_delay = 2  # seconds
             
             for attempt in range(max_retries):
-                response = self.session.get(url, timeout=15)
+                limiter.acquire(self.deadline)
+                started = time.monotonic()
+                status_code = None
+                retry_after = None
+                failed = False
+                timeout = None
+                try:
+                    timeout = self._request_timeout(15)
+                    response = self.session.get(url, timeout=timeout, headers=self._conditional_headers(url))
+                    status_code = response.status_code
+                    self.bytes_fetched += len(response.content)
+                    retry_after = response.headers.get('Retry-After')
+                except Exception as e:
+                    failed = _is_host_failure(e, timeout_capped=timeout is not None and timeout < 15)
+                    raise
+                finally:
+                    # Cancellation and our own deadline only return the slot
+                    limiter.release(status_code, time.monotonic() - started, retry_after, failed=failed)
                 
-                # If 503, wait and retry
-                if response.status_code == 503 and attempt < max_retries - 1:
-                    print(f"503 error for {url}, retrying in {retry_delay}s (attempt {attempt + 1}/{max_retries})...")
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
+                # Throttled: the host limiter has backed off, retry once it lets us through
+                if status_code in THROTTLE_STATUSES and attempt < max_retries - 1:
+                    print(f"{status_code} error for {url}, retrying after host backoff (attempt {attempt + 1}/{max_retries})...")
                     continue
                 
+                self._check_validators(url, response.status_code, response.headers, response.content)
                 response.raise_for_status()
                 
-                # Try to detect encoding, fallback to utf-8 with error handling
-                content = response.content
-                encoding = response.encoding or 'utf-8'
+                return BeautifulSoup(self._decode_content(response.content, response.encoding), 'lxml')
                 
-                # Try to decode with detected encoding, fallback to utf-8 with errors='replace'
+        except PageNotModified:
+            raise
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+    
+    async def async_fetch_page(self, url: str, use_playwright: bool = False, wait_selector: Optional[str] = None) -> Optional[BeautifulSoup]:
+        """
+        Async variant of fetch_page using the shared httpx connection pool.
+        
+        Args:
+            url: URL to fetch
+            use_playwright: If True, use Playwright for JavaScript-rendered pages
+            wait_selector: Optional CSS selector to wait for (Playwright only)
+            
+        Returns:
+            BeautifulSoup object or None if fetch fails
+        """
+        if use_playwright:
+            return self._count_rendered(await PlaywrightHelper.async_fetch_page(url, wait_selector=wait_selector, deadline=self.deadline))
+        
+        limiter = get_host_limiter(url)
+        try:
+            client = AsyncHttpClient.get_client()
+            max_retries = 3
+            
+            for attempt in range(max_retries):
+                await limiter.async_acquire(self.deadline)
+                started = time.monotonic()
+                status_code = None
+                retry_after = None
+                failed = False
+                timeout = None
                 try:
-                    text = content.decode(encoding)
-                except (UnicodeDecodeError, LookupError):
-                    try:
-                        text = content.decode('utf-8', errors='replace')
-                    except:
-                        text = content.decode('latin-1', errors='replace')
+                    timeout = self._request_timeout(15)
+                    response = await client.get(url, timeout=timeout, headers=self._conditional_headers(url))
+                    status_code = response.status_code
+                    self.bytes_fetched += len(response.content)
+                    retry_after = response.headers.get('Retry-After')
+                except Exception as e:
+                    failed = _is_host_failure(e, timeout_capped=timeout is not None and timeout < 15)
+                    raise
+                finally:
+                    # Cancellation and our own deadline only return the slot
+                    limiter.release(status_code, time.monotonic() - started, retry_after, failed=failed)
                 
-                return BeautifulSoup(text, 'lxml')
+                # Throttled: the host limiter has backed off, retry once it lets us through
+                if status_code in THROTTLE_STATUSES and attempt < max_retries - 1:
+                    print(f"{status_code} error for {url}, retrying after host backoff (attempt {attempt + 1}/{max_retries})...")
+                    continue
+                
+                self._check_validators(url, response.status_code, response.headers, response.content)
+                response.raise_for_status()
                 
+                # Use the same charset rules as requests so both paths parse identically
+                encoding = requests.utils.get_encoding_from_headers(response.headers)
+                text = self._decode_content(response.content, encoding)
+                # Parse off the event loop
+                return await asyncio.to_thread(BeautifulSoup, text, 'lxml')
+                
+        except PageNotModified:
+            raise
         except Exception as e:
             print(f"Error fetching {url}: {e}")
             return None
     
+    def _request_timeout(self, timeout: float) -> float:
+        """Cap a request timeout so it ends by the scrape deadline."""
+        if self.deadline is None:
+            return timeout
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Scrape deadline exceeded for {self.source_id}")
+        return min(timeout, remaining)
+    
+    def _count_rendered(self, soup: Optional[BeautifulSoup]) -> Optional[BeautifulSoup]:
+        """Add the size of a Playwright-rendered page to bytes_fetched."""
+        if soup is not None:
+            self.bytes_fetched += len(str(soup).encode('utf-8'))
+        return soup
+    
+    @property
+    def config_hash(self) -> str:
+        """
+        Hash of what turns this source's pages into offers.
+        
+        Stored validators only short-cut a fetch while it is unchanged, so a
+        changed parser re-parses pages the site hasn't changed. Defaults to
+        the scraper's module source; ConfigBasedScraper hashes its config.
+        """
+        if self._config_hash is None:
+            module = sys.modules[type(self).__module__]
+            with open(module.__file__, 'rb') as f:
+                self._config_hash = hashlib.sha256(f.read()).hexdigest()
+        return self._config_hash
+    
+    def _previous_validators(self, url: str) -> Dict:
+        """Stored validators of a URL, unless they were recorded under another configuration."""
+        previous = self.validators.get(url) or {}
+        if previous.get('config_hash') != self.config_hash:
+            return {}
+        return previous
+    
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from stored validators."""
+        headers = {}
+        previous = self._previous_validators(url)
+        if previous:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+        return headers
+    
+    def _check_validators(self, url: str, status_code: int, headers, content: bytes):
+        """
+        Record cache validators for a response and detect unchanged pages.
+        
+        Raises:
+            PageNotModified: On 304, or when the body hash matches the previous fetch
+        """
+        previous = self._previous_validators(url)
+        if status_code == 304:
+            self.fetched_validators[url] = dict(previous)
+            raise PageNotModified(url)
+        if status_code >= 300:
+            return
+        
+        content_hash = hashlib.sha256(content).hexdigest()
+        self.fetched_validators[url] = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'content_length': len(content),
+            'content_hash': content_hash,
+            'config_hash': self.config_hash,
+        }
+        
+        # Servers without validators: an identical body is just as unchanged
+        if previous.get('content_length') == len(content) and previous.get('content_hash') == content_hash:
+            raise PageNotModified(url)
+    
+    @staticmethod
+    def _decode_content(content: bytes, encoding: Optional[str]) -> str:
+        """Decode a response body, falling back to utf-8 / latin-1."""
+        # Try to decode with detected encoding, fallback to utf-8 with errors='replace'
+        try:
+            return content.decode(encoding or 'utf-8')
+        except (UnicodeDecodeError, LookupError):
+            try:
+                return content.decode('utf-8', errors='replace')
+            except:
+                return content.decode('latin-1', errors='replace')
+    
+    def fingerprint_listing(self, element, salt: str = '') -> str:
+        """
+        Hash the job-list region of a page, ignoring markup and whitespace.
+        
+        Args:
+            element: BeautifulSoup element containing the job list
+            salt: Extra text mixed into the hash (e.g. the scraper configuration)
+            
+        Returns:
+            Hex sha256 of the normalized text and link targets
+        """
+        text = ' '.join(element.get_text(' ', strip=True).split())
+        links = [a.get('href', '') for a in element.find_all('a', href=True)]
+        normalized = json.dumps([salt, text, links], ensure_ascii=False)
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    
+    def fingerprint_jobs(self, jobs: List[Dict]) -> str:
+        """
+        Hash an extracted job list, independent of item order.
+        
+        Args:
+            jobs: List of job offer dictionaries (as returned by scrape())
+            
+        Returns:
+            Hex sha256 of the job list
+        """
+        rows = sorted(
+            [
+                job['source_url'],
+                job.get('title'),
+                job.get('facility_name'),
+                job.get('city'),
+                job['role'].value if job.get('role') else None,
+                job.get('description'),
+                job.get('external_job_url'),
+            ]
+            for job in jobs
+        )
+        normalized = json.dumps(rows, ensure_ascii=False)
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    
     def normalize_url(self, url: str) -> str:
         """
         Normalize URL (make absolute if relative).
@@ -474,6 +804,18 @@ class BaseScraper(ABC):
         """
         pass
     
+    async def async_scrape(self) -> List[Dict]:
+        """
+        Async variant of scrape() for the event-loop refresh engine.
+        
+        Scrapers should override this to fetch with async_fetch_page; the
+        default runs the blocking scrape() on a worker thread.
+        
+        Returns:
+            List of job offer dictionaries (same format as scrape())
+        """
+        return await asyncio.to_thread(self.scrape)
+    
     def save_to_db(self, jobs: List[Dict], db: Session) -> int:
         """
         Save scraped jobs to database (with deduplication).
@@ -488,59 +830,105 @@ class BaseScraper(ABC):
         """
         return self.save_or_update_to_db(jobs, db, update_existing=False)
     
-    def save_or_update_to_db(self, jobs: List[Dict], db: Session, update_existing: bool = True) -> Dict[str, int]:
+    def prepare_job(self, job_data: Dict) -> Dict:
+        """
+        Clean a scraped job dictionary into the values stored in the database.
+        
+        Cleans title and facility name, extracts the city from title or
+        description when only the default city is known, and recovers a
+        description from text stripped off the title.
+        
+        Args:
+            job_data: Job dictionary as returned by scrape()
+            
+        Returns:
+            New dictionary with cleaned 'title', 'facility_name', 'city' and
+            'description' (other keys are copied unchanged)
+        """
+        job_data = dict(job_data)
+        
+        # Clean data before saving/updating
+        cleaned_title = self.clean_title(job_data['title'])
+        cleaned_facility = self.clean_facility_name(job_data['facility_name'])
+        
+        # Extract city from title or description if not explicitly set or if default
+        extracted_city = job_data.get('city', self.city)
+        
+        # If city is the default (Gdańsk) or seems generic, try to extract from title/description
+        if extracted_city == "Gdańsk" or not extracted_city:
+            # Try to extract city from original title (before cleaning)
+            city_from_title = self.extract_city(job_data['title'])
+            if city_from_title:
+                extracted_city = city_from_title
+            else:
+                # Try description if available
+                if job_data.get('description'):
+                    city_from_desc = self.extract_city(job_data['description'])
+                    if city_from_desc:
+                        extracted_city = city_from_desc
+        
+        # If description is missing but title had extra info, try to extract it
+        if not job_data.get('description') and job_data['title'] != cleaned_title:
+            # Extract the part that was removed from title as potential description
+            original_title = job_data['title']
+            # Find where the cleaned title ends in the original
+            if cleaned_title in original_title:
+                remaining = original_title[original_title.find(cleaned_title) + len(cleaned_title):].strip()
+                if remaining and len(remaining) > 10:
+                    # Clean up the remaining text for description
+                    remaining = re.sub(r'^(Miejsce\s+pracy|Termin\s+zgłoszenia|APLIKUJ|ROZMOWY).*', '', remaining, flags=re.IGNORECASE)
+                    if remaining and len(remaining) > 10:
+                        job_data['description'] = remaining[:1000]
+        
+        job_data['title'] = cleaned_title
+        job_data['facility_name'] = cleaned_facility
+        job_data['city'] = extracted_city
+        job_data['description'] = job_data.get('description')
+        return job_data
+    
+    def save_or_update_to_db(self, jobs: List[Dict], db: Session, update_existing: bool = True,
+                             changes: Optional[Dict[str, List[str]]] = None,
+                             bulk: bool = True) -> Dict[str, int]:
         """
         Save or update scraped jobs to database.
         
+        On SQLite and PostgreSQL, existing offers are prefetched with one IN
+        query per BULK_CHUNK_SIZE jobs and written with a single
+        INSERT ... ON CONFLICT (source_url) DO UPDATE per chunk. Other
+        databases (or bulk=False) use one SELECT per job.
+        
         Args:
             jobs: List of job dictionaries
             db: Database session
             update_existing: If True, update existing offers; if False, skip them
+            changes: Optional collector; source_urls of new and updated offers
+                     are appended to changes['new'] / changes['updated']
+            bulk: Use the bulk upsert path where the database supports it
             
         Returns:
             Dictionary with counts: {'new': int, 'updated': int, 'skipped': int}
         """
+        if bulk and db.get_bind().dialect.name in ('sqlite', 'postgresql'):
+            return self._bulk_save_or_update(jobs, db, update_existing, changes)
+        
         now = datetime.utcnow()
         result = {'new': 0, 'updated': 0, 'skipped': 0}
         
         for job_data in jobs:
-            # Check if job already exists (by source_url)
-            existing = db.query(JobOffer).filter(
-                JobOffer.source_url == job_data['source_url']
-            ).first()
+            # Check if job already exists (by canonical URL or source_url)
+            canonical_url = canonicalize_url(job_data['source_url'])
+            lookup = db.query(JobOffer).filter(
+                or_(JobOffer.canonical_url == canonical_url, JobOffer.source_url == job_data['source_url'])
+            ).order_by(JobOffer.id)
+            existing = lookup.first()
+            # An archived offer is moved back and then updated like an inactive one
+            if existing is None and restore_archived_offers([canonical_url], [job_data['source_url']], db):
+                existing = lookup.first()
             
-            # Clean data before saving/updating
-            cleaned_title = self.clean_title(job_data['title'])
-            cleaned_facility = self.clean_facility_name(job_data['facility_name'])
-            
-            # Extract city from title or description if not explicitly set or if default
-            extracted_city = job_data.get('city', self.city)
-            
-            # If city is the default (Gdańsk) or seems generic, try to extract from title/description
-            if extracted_city == "Gdańsk" or not extracted_city:
-                # Try to extract city from original title (before cleaning)
-                city_from_title = self.extract_city(job_data['title'])
-                if city_from_title:
-                    extracted_city = city_from_title
-                else:
-                    # Try description if available
-                    if job_data.get('description'):
-                        city_from_desc = self.extract_city(job_data['description'])
-                        if city_from_desc:
-                            extracted_city = city_from_desc
-            
-            # If description is missing but title had extra info, try to extract it
-            if not job_data.get('description') and job_data['title'] != cleaned_title:
-                # Extract the part that was removed from title as potential description
-                original_title = job_data['title']
-                # Find where the cleaned title ends in the original
-                if cleaned_title in original_title:
-                    remaining = original_title[original_title.find(cleaned_title) + len(cleaned_title):].strip()
-                    if remaining and len(remaining) > 10:
-                        # Clean up the remaining text for description
-                        remaining = re.sub(r'^(Miejsce\s+pracy|Termin\s+zgłoszenia|APLIKUJ|ROZMOWY).*', '', remaining, flags=re.IGNORECASE)
-                        if remaining and len(remaining) > 10:
-                            job_data['description'] = remaining[:1000]
+            job_data = self.prepare_job(job_data)
+            cleaned_title = job_data['title']
+            cleaned_facility = job_data['facility_name']
+            extracted_city = job_data['city']
             
             if existing:
                 if not update_existing:
@@ -570,6 +958,10 @@ class BaseScraper(ABC):
                     updated = True
                     content_changed = True
                 
+                content_hash = compute_content_hash(*(job_data[field] for field in CONTENT_FIELDS))
+                if existing.content_hash != content_hash:
+                    existing.content_hash = content_hash
+                
                 # Generate summary only if content changed (title or description)
                 if content_changed:
                     job_summary = extract_summary(
@@ -601,6 +993,8 @@ class BaseScraper(ABC):
                 
                 if updated:
                     result['updated'] += 1
+                    if changes is not None:
+                        changes.setdefault('updated', []).append(job_data['source_url'])
                 else:
                     result['skipped'] += 1
             else:
@@ -620,7 +1014,9 @@ class BaseScraper(ABC):
                     role=job_data['role'],
                     description=job_data.get('description'),
                     summary=job_summary,
+                    content_hash=compute_content_hash(*(job_data[field] for field in CONTENT_FIELDS)),
                     source_url=job_data['source_url'],
+                    canonical_url=canonical_url,
                     source_id=self.source_id,
                     external_job_url=job_data.get('external_job_url'),
                     scraped_at=now,
@@ -631,6 +1027,109 @@ class BaseScraper(ABC):
                 
                 db.add(job_offer)
                 result['new'] += 1
+                if changes is not None:
+                    changes.setdefault('new', []).append(job_data['source_url'])
+        
+        db.commit()
+        return result
+    
+    def _bulk_save_or_update(self, jobs: List[Dict], db: Session, update_existing: bool,
+                             changes: Optional[Dict[str, List[str]]]) -> Dict[str, int]:
+        """
+        Bulk variant of save_or_update_to_db() for SQLite and PostgreSQL.
+        
+        An existing offer is 'updated' if its content hash changed or it was
+        reactivated, and 'skipped' otherwise. Only new and changed offers get
+        a summary and go through the upsert; unchanged ones only have their
+        timestamps moved, by one UPDATE per chunk. Offers are matched by
+        canonical URL (falling back to source_url for rows stored without
+        one); jobs repeating a canonical URL count as skipped.
+        """
+        now = datetime.utcnow()
+        result = {'new': 0, 'updated': 0, 'skipped': 0}
+        
+        prepared = {}
+        for job_data in jobs:
+            canonical_url = canonicalize_url(job_data['source_url'])
+            if canonical_url in prepared:
+                result['skipped'] += 1
+                continue
+            prepared[canonical_url] = self.prepare_job(job_data)
+        
+        canonical_urls = list(prepared)
+        for start in range(0, len(canonical_urls), BULK_CHUNK_SIZE):
+            chunk = canonical_urls[start:start + BULK_CHUNK_SIZE]
+            urls = [prepared[canonical_url]['source_url'] for canonical_url in chunk]
+            # Archived offers are moved back first, so the upsert reactivates them
+            restore_archived_offers(chunk, urls, db)
+            existing = {}
+            for row in db.query(*_PREFETCH_COLUMNS).filter(
+                or_(JobOffer.canonical_url.in_(chunk), JobOffer.source_url.in_(urls))
+            ).order_by(JobOffer.id):
+                existing.setdefault(row.canonical_url or canonicalize_url(row.source_url), row)
+            
+            rows = []
+            seen = []
+            for canonical_url in chunk:
+                job_data = prepared[canonical_url]
+                row = existing.get(canonical_url)
+                # Existing offers keep their stored URL, which is also the upsert's conflict target
+                url = row.source_url if row is not None else job_data['source_url']
+                content_hash = compute_content_hash(*(job_data[field] for field in CONTENT_FIELDS))
+                changed = row is None or stored_content_hash(row) != content_hash
+                
+                if row is None:
+                    result['new'] += 1
+                    if changes is not None:
+                        changes.setdefault('new', []).append(url)
+                elif not update_existing:
+                    result['skipped'] += 1
+                    continue
+                elif changed or row.status == 'inactive':
+                    result['updated'] += 1
+                    if changes is not None:
+                        changes.setdefault('updated', []).append(url)
+                else:
+                    result['skipped'] += 1
+                    external_job_url = job_data.get('external_job_url')
+                    if (row.content_hash is not None
+                            and (row.source_id or not self.source_id)
+                            and (not external_job_url or external_job_url == row.external_job_url)):
+                        seen.append(url)
+                        continue
+                
+                rows.append({
+                    'title': job_data['title'],
+                    'facility_name': job_data['facility_name'],
+                    'city': job_data['city'],
+                    'role': job_data['role'],
+                    'description': job_data['description'],
+                    'content_hash': content_hash,
+                    # Generate summary only if content changed
+                    'summary': extract_summary(
+                        title=job_data['title'],
+                        description=job_data['description'],
+                        facility_name=job_data['facility_name'],
+                        city=job_data['city']
+                    ) if changed else None,
+                    'source_url': url,
+                    'canonical_url': canonical_url,
+                    'source_id': self.source_id,
+                    'external_job_url': job_data.get('external_job_url') or None,
+                    'scraped_at': now,
+                    'created_at': now,
+                    'first_seen_at': now,
+                    'last_seen_at': now,
+                    'status': 'active',
+                })
+            
+            if rows:
+                db.execute(_upsert_job_offers(db.get_bind().dialect.name), rows)
+            if seen:
+                db.query(JobOffer).filter(JobOffer.source_url.in_(seen)).update({
+                    JobOffer.scraped_at: now,
+                    JobOffer.last_seen_at: now,
+                }, synchronize_session=False)
         
         db.commit()
         return result
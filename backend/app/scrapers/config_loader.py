@@ -3,8 +3,9 @@ Configuration loader for source scrapers.
 """
 import json
 import os
+import threading
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 from app.scrapers.base import BaseScraper
 
@@ -18,6 +19,8 @@ class SourceConfig:
         self.base_url = config_dict.get('baseUrl')
         self.city = config_dict.get('city', 'Gdańsk')
         self.facility_name = config_dict.get('facilityName', self.source_name)
+        self.requires_playwright = config_dict.get('requiresPlaywright', False)
+        self.timeout_seconds = config_dict.get('timeoutSeconds')  # Per-source refresh budget (optional)
         
         # Selectors
         selectors = config_dict.get('selectors', {})
@@ -71,29 +74,69 @@ def get_configs_dir() -> Path:
     return Path(__file__).parent / 'configs'
 
 
+# Parsed configs keyed by source ID, with the file mtime they were read at
+_config_cache: Dict[str, Tuple[int, SourceConfig]] = {}
+# Config IDs with the directory mtime they were listed at
+_listing_cache: Optional[Tuple[int, List[str]]] = None
+_cache_lock = threading.Lock()
+
+
 def load_config(source_id: str) -> Optional[SourceConfig]:
-    """Load a source config by ID."""
+    """
+    Load a source config by ID.
+    
+    Parsed configs are cached and re-read only when the file's mtime changes,
+    so repeated calls return the same SourceConfig object.
+    """
     config_path = get_configs_dir() / f"{source_id}.json"
-    if not config_path.exists():
+    try:
+        mtime = config_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        with _cache_lock:
+            _config_cache.pop(source_id, None)
         return None
-    return SourceConfig.from_file(str(config_path))
+    
+    with _cache_lock:
+        cached = _config_cache.get(source_id)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    
+    config = SourceConfig.from_file(str(config_path))
+    with _cache_lock:
+        _config_cache[source_id] = (mtime, config)
+    return config
 
 
 def list_configs() -> list:
-    """List all available config IDs."""
+    """List all available config IDs (re-scanned only when the directory changes)."""
+    global _listing_cache
     configs_dir = get_configs_dir()
-    if not configs_dir.exists():
+    try:
+        mtime = configs_dir.stat().st_mtime_ns
+    except FileNotFoundError:
         return []
     
-    config_files = list(configs_dir.glob('*.json'))
-    return [f.stem for f in config_files]
+    with _cache_lock:
+        if _listing_cache and _listing_cache[0] == mtime:
+            return list(_listing_cache[1])
+    
+    config_ids = [f.stem for f in configs_dir.glob('*.json')]
+    with _cache_lock:
+        _listing_cache = (mtime, config_ids)
+    return list(config_ids)
 
 
 def save_config(config: SourceConfig):
     """Save a source config."""
+    global _listing_cache
     configs_dir = get_configs_dir()
     configs_dir.mkdir(exist_ok=True)
     
     config_path = configs_dir / f"{config.source_id}.json"
     config.save(str(config_path))
+    
+    # Don't rely on mtime resolution for a write we made ourselves
+    with _cache_lock:
+        _config_cache.pop(config.source_id, None)
+        _listing_cache = None
 
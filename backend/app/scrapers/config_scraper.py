@@ -1,6 +1,9 @@
 """
 Generic scraper that uses configuration files.
 """
+import asyncio
+import hashlib
+import json
 from typing import List, Dict, Optional
 from urllib.parse import urljoin
 
@@ -8,6 +11,7 @@ from bs4 import BeautifulSoup
 
 from app.scrapers.base import BaseScraper
 from app.scrapers.config_loader import SourceConfig
+from app.utils.urls import canonicalize_url
 
 
 class ConfigBasedScraper(BaseScraper):
@@ -20,6 +24,16 @@ class ConfigBasedScraper(BaseScraper):
             city=config.city
         )
         self.config = config
+        self.uses_playwright = config.requires_playwright
+        self.timeout_seconds = config.timeout_seconds
+    
+    @property
+    def config_hash(self) -> str:
+        """Hash of the source configuration (selectors, extraction and cleaning rules)."""
+        if self._config_hash is None:
+            config = json.dumps(self.config.to_dict(), sort_keys=True, ensure_ascii=False)
+            self._config_hash = hashlib.sha256(config.encode('utf-8')).hexdigest()
+        return self._config_hash
     
     def scrape(self) -> List[Dict]:
         """
@@ -28,11 +42,27 @@ class ConfigBasedScraper(BaseScraper):
         Returns:
             List of job offer dictionaries
         """
-        jobs = []
-        
         # Fetch page (use Playwright if needed)
-        use_playwright = self.config._config_dict.get('requiresPlaywright', False)
-        soup = self.fetch_page(self.base_url, use_playwright=use_playwright)
+        soup = self.fetch_page(self.base_url, use_playwright=self.uses_playwright)
+        return self.parse_jobs(soup)
+    
+    async def async_scrape(self) -> List[Dict]:
+        """Async variant of scrape()."""
+        soup = await self.async_fetch_page(self.base_url, use_playwright=self.uses_playwright)
+        return await asyncio.to_thread(self.parse_jobs, soup)
+    
+    def parse_jobs(self, soup: Optional[BeautifulSoup]) -> List[Dict]:
+        """
+        Extract job offers from a fetched listing page using configuration.
+        
+        Args:
+            soup: Parsed listing page (None if the fetch failed)
+            
+        Returns:
+            List of job offer dictionaries
+        """
+        jobs = []
+        self.listing_fingerprint = None
         
         if not soup:
             return jobs
@@ -44,6 +74,10 @@ class ConfigBasedScraper(BaseScraper):
                 containers = soup.select(self.config.job_list_container)
                 if len(containers) == 1:
                     container = containers[0]
+                    # Fingerprint the isolated job list; config changes invalidate it
+                    self.listing_fingerprint = self.fingerprint_listing(
+                        container, salt=json.dumps(self.config.to_dict(), sort_keys=True)
+                    )
                 elif len(containers) > 1:
                     # Multiple containers found - use the first one that has job links
                     # or combine them
@@ -90,36 +124,16 @@ class ConfigBasedScraper(BaseScraper):
             # For MVP, we'll skip pagination - can be added later
             pass
         
-        # Remove duplicates by source_url
+        # Remove duplicates by canonical URL (fragments, tracking params, etc. don't count)
         seen_urls = set()
         unique_jobs = []
         for job in jobs:
-            if job['source_url'] not in seen_urls:
-                seen_urls.add(job['source_url'])
+            canonical_url = canonicalize_url(job['source_url'])
+            if canonical_url not in seen_urls:
+                seen_urls.add(canonical_url)
                 unique_jobs.append(job)
         
-        # Additional deduplication: For sources that create hash-based URLs from the same base URL,
-        # group by base URL (without hash) and keep only one job per base URL
-        # This prevents duplicates like: base_url#hash1, base_url#hash2, etc.
-        import re
-        base_url_groups = {}
-        final_jobs = []
-        
-        for job in unique_jobs:
-            # Remove hash anchor from URL to get base URL
-            base_url = re.sub(r'#.*$', '', job['source_url'])
-            
-            # If we haven't seen this base URL, keep the job
-            if base_url not in base_url_groups:
-                base_url_groups[base_url] = job
-                final_jobs.append(job)
-            else:
-                # We've seen this base URL before - this is a duplicate
-                # Keep the first one we encountered (already in final_jobs)
-                # Skip this duplicate
-                pass
-        
-        return final_jobs
+        return unique_jobs
     
     def _extract_job(self, item) -> Optional[Dict]:
         """Extract job data from a job item element."""
@@ -3,7 +3,8 @@ Scraper for Copernicus Podmiot Leczniczy job offers.
 Source: https://copernicus.gda.pl/ogloszenia/kariera
 Note: This page is JavaScript-rendered, so we use Playwright.
 """
-from typing import List, Dict
+import asyncio
+from typing import List, Dict, Optional
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
@@ -14,6 +15,8 @@ from app.scrapers.base import BaseScraper
 class CopernicusScraper(BaseScraper):
     """Scraper for Copernicus job board."""
     
+    uses_playwright = True
+    
     def __init__(self):
         super().__init__(
             base_url="https://copernicus.gda.pl/ogloszenia/kariera",
@@ -28,9 +31,26 @@ class CopernicusScraper(BaseScraper):
         Returns:
             List of job offer dictionaries
         """
-        jobs = []
         # Use Playwright for JavaScript-rendered page
         soup = self.fetch_page(self.base_url, use_playwright=True, wait_selector="body")
+        return self.parse_jobs(soup)
+    
+    async def async_scrape(self) -> List[Dict]:
+        """Async variant of scrape()."""
+        soup = await self.async_fetch_page(self.base_url, use_playwright=True, wait_selector="body")
+        return await asyncio.to_thread(self.parse_jobs, soup)
+    
+    def parse_jobs(self, soup: Optional[BeautifulSoup]) -> List[Dict]:
+        """
+        Extract job offers from the rendered Copernicus listing page.
+        
+        Args:
+            soup: Parsed listing page (None if the fetch failed)
+            
+        Returns:
+            List of job offer dictionaries
+        """
+        jobs = []
         
         if not soup:
             print("Warning: Could not fetch Copernicus page with Playwright.")
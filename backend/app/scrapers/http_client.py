@@ -0,0 +1,60 @@
+"""
+Shared async HTTP client for scrapers.
+"""
+import asyncio
+from typing import Optional
+
+import httpx
+
+# Browser-like headers sent by every scraper request
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'pl-PL,pl;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Cache-Control': 'max-age=0'
+}
+
+
+class AsyncHttpClient:
+    """
+    Process-wide httpx.AsyncClient with a shared connection pool.
+    
+    httpx clients are bound to the event loop they first ran on, so a new
+    client is created whenever the running loop changes (e.g. on each
+    asyncio.run() of a refresh).
+    """
+    
+    _client: Optional[httpx.AsyncClient] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    # Connection pool limits shared by all sources in a refresh
+    limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    timeout = httpx.Timeout(15.0)
+    
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        """Get or create the client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if cls._client is None or cls._loop is not loop:
+            cls._client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                limits=cls.limits,
+                timeout=cls.timeout,
+                follow_redirects=True,
+            )
+            cls._loop = loop
+        return cls._client
+    
+    @classmethod
+    async def close_client(cls):
+        """Close the client and its pooled connections."""
+        if cls._client is not None and cls._loop is asyncio.get_running_loop():
+            await cls._client.aclose()
+        cls._client = None
+        cls._loop = None
@@ -2,7 +2,8 @@
 Scraper for Okręgowa Izba Pielęgniarek i Położnych w Gdańsku job offers.
 Source: https://praca.oipip.gda.pl/
 """
-from typing import List, Dict
+import asyncio
+from typing import List, Dict, Optional
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
@@ -28,8 +29,25 @@ class OipipGdanskScraper(BaseScraper):
         Returns:
             List of job offer dictionaries
         """
-        jobs = []
         soup = self.fetch_page(self.base_url)
+        return self.parse_jobs(soup)
+    
+    async def async_scrape(self) -> List[Dict]:
+        """Async variant of scrape()."""
+        soup = await self.async_fetch_page(self.base_url)
+        return await asyncio.to_thread(self.parse_jobs, soup)
+    
+    def parse_jobs(self, soup: Optional[BeautifulSoup]) -> List[Dict]:
+        """
+        Extract job offers from the OIPiP Gdańsk listing page.
+        
+        Args:
+            soup: Parsed listing page (None if the fetch failed)
+            
+        Returns:
+            List of job offer dictionaries
+        """
+        jobs = []
         
         if not soup:
             return jobs
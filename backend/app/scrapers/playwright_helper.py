@@ -1,16 +1,54 @@
 """
 Playwright helper for JavaScript-rendered pages.
 """
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional
-from playwright.sync_api import sync_playwright, Browser, Page, TimeoutError as PlaywrightTimeoutError
+from playwright.sync_api import sync_playwright, Browser, Page, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
 
+from app.scrapers.rate_limiter import HostLimiter, get_host_limiter
+
+# Relaunch the browser after this many pages, so a long refresh doesn't accumulate Chromium memory
+PLAYWRIGHT_MAX_PAGES = int(os.getenv("PLAYWRIGHT_MAX_PAGES", "20"))
+
+# Chromium network errors that are local, not the host's fault
+_LOCAL_NET_ERRORS = ('net::ERR_NAME_NOT_RESOLVED', 'net::ERR_INTERNET_DISCONNECTED', 'net::ERR_CERT', 'net::ERR_SSL')
+
+
+def _is_host_failure(error: PlaywrightError) -> bool:
+    """Whether a navigation error should make the host's limiter back off (timeouts never do)."""
+    if isinstance(error, PlaywrightTimeoutError):
+        return False
+    message = str(error)
+    return 'net::ERR_' in message and not any(local in message for local in _LOCAL_NET_ERRORS)
+
 
 class PlaywrightHelper:
-    """Helper class for using Playwright to fetch JavaScript-rendered pages."""
+    """
+    Helper class for using Playwright to fetch JavaScript-rendered pages.
+    
+    Playwright's sync API is bound to the thread that started it, so every
+    browser operation runs on one dedicated thread. Callers on any thread (or
+    in an event loop) are routed to it.
+    """
     
     _browser: Optional[Browser] = None
     _playwright = None
+    _pages_served = 0  # Pages opened by the current browser
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+    
+    @classmethod
+    def _submit(cls, func, *args, **kwargs) -> Future:
+        """Run a function on the dedicated browser thread."""
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='playwright')
+        return cls._executor.submit(func, *args, **kwargs)
     
     @classmethod
     def get_browser(cls) -> Browser:
@@ -18,11 +56,17 @@ class PlaywrightHelper:
         if cls._browser is None:
             cls._playwright = sync_playwright().start()
             cls._browser = cls._playwright.chromium.launch(headless=True)
+            cls._pages_served = 0
         return cls._browser
     
     @classmethod
     def close_browser(cls):
         """Close the browser instance."""
+        if cls._executor is not None:
+            cls._submit(cls._close_browser).result()
+    
+    @classmethod
+    def _close_browser(cls):
         if cls._browser:
             cls._browser.close()
             cls._browser = None
@@ -31,7 +75,8 @@ class PlaywrightHelper:
             cls._playwright = None
     
     @classmethod
-    def fetch_page(cls, url: str, wait_timeout: int = 30000, wait_selector: Optional[str] = None) -> Optional[BeautifulSoup]:
+    def fetch_page(cls, url: str, wait_timeout: int = 30000, wait_selector: Optional[str] = None,
+                   deadline: Optional[float] = None) -> Optional[BeautifulSoup]:
         """
         Fetch and parse a JavaScript-rendered page using Playwright.
         
@@ -39,35 +84,100 @@ class PlaywrightHelper:
             url: URL to fetch
             wait_timeout: Maximum time to wait for page load (ms)
             wait_selector: Optional CSS selector to wait for before parsing
+            deadline: Optional time.monotonic() deadline; every wait is cut short to meet it
             
         Returns:
             BeautifulSoup object or None if fetch fails
         """
+        # Wait for the host's limiter here, so a host cooling down doesn't hold up the browser thread
+        limiter = get_host_limiter(url)
+        try:
+            limiter.acquire(deadline)
+        except TimeoutError as e:
+            print(f"Error fetching {url} with Playwright: {e}")
+            return None
+        return cls._submit_fetch(limiter, url, wait_timeout, wait_selector, deadline).result()
+    
+    @classmethod
+    async def async_fetch_page(cls, url: str, wait_timeout: int = 30000, wait_selector: Optional[str] = None,
+                               deadline: Optional[float] = None) -> Optional[BeautifulSoup]:
+        """
+        Async variant of fetch_page; awaits the browser thread without blocking the event loop.
+        
+        Cancelling the await drops the fetch if it has not started yet; a fetch
+        already running on the browser thread ends by its deadline.
+        """
+        limiter = get_host_limiter(url)
+        try:
+            await limiter.async_acquire(deadline)
+        except TimeoutError as e:
+            print(f"Error fetching {url} with Playwright: {e}")
+            return None
+        return await asyncio.wrap_future(cls._submit_fetch(limiter, url, wait_timeout, wait_selector, deadline))
+    
+    @classmethod
+    def _submit_fetch(cls, limiter: HostLimiter, url: str, wait_timeout: int, wait_selector: Optional[str],
+                      deadline: Optional[float]) -> Future:
+        """Queue a fetch holding a slot of limiter; _fetch_page returns the slot."""
+        future = cls._submit(cls._fetch_page, limiter, url, wait_timeout, wait_selector, deadline)
+        
+        def release_if_cancelled(done: Future):
+            # A fetch cancelled before it started never reaches _fetch_page
+            if done.cancelled():
+                limiter.release(None, 0.0)
+        
+        future.add_done_callback(release_if_cancelled)
+        return future
+    
+    @classmethod
+    def _fetch_page(cls, limiter: HostLimiter, url: str, wait_timeout: int, wait_selector: Optional[str],
+                    deadline: Optional[float] = None) -> Optional[BeautifulSoup]:
+        def budget(timeout_ms: int) -> int:
+            """Cap a wait so it ends by the deadline."""
+            if deadline is None:
+                return timeout_ms
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                raise PlaywrightTimeoutError(f"Deadline exceeded while fetching {url}")
+            return min(timeout_ms, remaining_ms)
+        
         page = None
         try:
-            browser = cls.get_browser()
-            page = browser.new_page()
-            
-            # Set longer timeout for slow pages
-            page.set_default_timeout(wait_timeout)
-            
-            # Navigate to page with more lenient wait condition
+            # The caller took a slot of the host's limiter; it is returned once navigation ends
+            started = time.monotonic()
+            response = None
+            failed = False
             try:
-                page.goto(url, wait_until="domcontentloaded", timeout=wait_timeout)
-            except PlaywrightTimeoutError:
-                # Try with load instead
+                browser = cls.get_browser()
+                page = browser.new_page()
+                
+                # Set longer timeout for slow pages
+                page.set_default_timeout(budget(wait_timeout))
+                
+                # Navigate to page with more lenient wait condition
+                started = time.monotonic()
                 try:
-                    page.goto(url, wait_until="load", timeout=wait_timeout)
+                    response = page.goto(url, wait_until="domcontentloaded", timeout=budget(wait_timeout))
                 except PlaywrightTimeoutError:
-                    print(f"Warning: Page load timeout for {url}, continuing anyway")
+                    # Try with load instead
+                    try:
+                        response = page.goto(url, wait_until="load", timeout=budget(wait_timeout))
+                    except PlaywrightTimeoutError:
+                        print(f"Warning: Page load timeout for {url}, continuing anyway")
+            except PlaywrightError as e:
+                failed = _is_host_failure(e)
+                raise
+            finally:
+                # A slow render or our deadline only returns the slot
+                limiter.release(response.status if response else None, time.monotonic() - started, failed=failed)
             
             # Wait a bit for JavaScript to execute
-            page.wait_for_timeout(2000)
+            page.wait_for_timeout(budget(2000))
             
             # Wait for specific selector if provided
             if wait_selector:
                 try:
-                    page.wait_for_selector(wait_selector, timeout=10000)
+                    page.wait_for_selector(wait_selector, timeout=budget(10000))
                 except PlaywrightTimeoutError:
                     print(f"Warning: Selector '{wait_selector}' not found, continuing anyway")
             
@@ -92,4 +202,7 @@ class PlaywrightHelper:
                     page.close()
                 except:
                     pass
+                cls._pages_served += 1
+                if cls._pages_served >= PLAYWRIGHT_MAX_PAGES:
+                    cls._close_browser()
 
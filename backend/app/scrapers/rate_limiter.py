@@ -0,0 +1,206 @@
+"""
+Process-wide per-host rate limiting for scraper requests.
+
+Every request made by BaseScraper.fetch_page / async_fetch_page and
+PlaywrightHelper goes through the HostLimiter of its host. A limiter combines
+a token bucket (requests per second) with a cap on requests in flight, and
+adapts both AIMD-style: it backs off on 429/503 responses, connection and
+read errors and latency spikes, and ramps up again while the host stays
+healthy. Requests we give up on ourselves (deadline, cancellation) and
+local errors (DNS, TLS setup) only return their slot.
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Initial / maximum / minimum request rate per host (requests per second)
+SCRAPER_HOST_RATE = float(os.getenv("SCRAPER_HOST_RATE", "1.0"))
+SCRAPER_HOST_MAX_RATE = float(os.getenv("SCRAPER_HOST_MAX_RATE", "4.0"))
+SCRAPER_HOST_MIN_RATE = float(os.getenv("SCRAPER_HOST_MIN_RATE", "0.1"))
+
+# Maximum concurrent requests per host
+SCRAPER_HOST_MAX_IN_FLIGHT = int(os.getenv("SCRAPER_HOST_MAX_IN_FLIGHT", "4"))
+
+# Second-level labels that are not registrable on their own (e.g. "com.pl")
+_GENERIC_SECOND_LEVEL = {'com', 'org', 'net', 'edu', 'gov', 'co', 'ac', 'med', 'info', 'biz'}
+
+# Status codes that mean "slow down"
+THROTTLE_STATUSES = (429, 503)
+
+
+def host_key(url: str) -> str:
+    """
+    Get the rate-limiting key for a URL.
+    
+    Subdomains of one site share a limiter (www.luxmed.pl and
+    szpital-gdansk.luxmed.pl, or the *.olsztyn.pl hospitals), since they
+    usually sit behind the same server or WAF.
+    
+    Args:
+        url: Request URL
+    
+    Returns:
+        Registrable domain of the URL's host (e.g. 'luxmed.pl')
+    """
+    hostname = (urlparse(url).hostname or '').lower()
+    labels = hostname.split('.')
+    if labels[-1].isdigit():
+        # IPv4 address
+        return hostname
+    if len(labels) >= 3 and labels[-2] in _GENERIC_SECOND_LEVEL:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+class HostLimiter:
+    """Adaptive token bucket and in-flight limit for a single host."""
+    
+    # Backoff after a throttling response when the server sends no Retry-After
+    initial_backoff = 2.0  # seconds
+    max_backoff = 60.0  # seconds
+    
+    # A response slower than this multiple of the average latency counts as a spike
+    latency_spike_factor = 3.0
+    
+    def __init__(self, rate: float = SCRAPER_HOST_RATE, max_in_flight: int = SCRAPER_HOST_MAX_IN_FLIGHT):
+        self.rate = rate
+        self.max_in_flight = max_in_flight
+        self.in_flight_limit = max(1, max_in_flight // 2)
+        self.in_flight = 0
+        self.tokens = 1.0
+        self.latency_avg: Optional[float] = None
+        self.backoff = self.initial_backoff
+        self.cooldown_until = 0.0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _try_acquire(self) -> float:
+        """Take a slot if available; otherwise return how long to wait (seconds)."""
+        with self._lock:
+            now = time.monotonic()
+            burst = max(1.0, self.rate)
+            self.tokens = min(burst, self.tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            
+            if now < self.cooldown_until:
+                return self.cooldown_until - now
+            if self.in_flight >= self.in_flight_limit:
+                return 0.05
+            if self.tokens < 1.0:
+                return (1.0 - self.tokens) / self.rate
+            
+            self.tokens -= 1.0
+            self.in_flight += 1
+            return 0.0
+    
+    def _next_wait(self, deadline: Optional[float]) -> float:
+        """Take a slot (returns 0) or return how long to sleep before trying again."""
+        wait = self._try_acquire()
+        if wait <= 0:
+            return 0.0
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if wait > remaining:
+                # No slot before the deadline (e.g. the host is cooling down)
+                raise TimeoutError("Deadline exceeded while waiting for the host rate limiter")
+        return min(wait, 1.0)
+    
+    def acquire(self, deadline: Optional[float] = None):
+        """
+        Block until a request may be sent to this host.
+        
+        Args:
+            deadline: Optional time.monotonic() deadline; TimeoutError is raised
+                      (without taking a slot) if no slot frees up by then
+        """
+        while True:
+            wait = self._next_wait(deadline)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+    
+    async def async_acquire(self, deadline: Optional[float] = None):
+        """Wait (without blocking the event loop) until a request may be sent; see acquire()."""
+        while True:
+            wait = self._next_wait(deadline)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+    
+    def release(self, status_code: Optional[int], latency: float, retry_after: Optional[str] = None,
+                failed: bool = False):
+        """
+        Return a slot and adapt the limits to the outcome of the request.
+        
+        Args:
+            status_code: HTTP status of the response (None if there is none)
+            latency: Request duration in seconds
+            retry_after: Value of the Retry-After header, if any
+            failed: True if the host failed the request (connection or read
+                    error). Without a response and without failed, the slot
+                    is returned and the limits are left alone.
+        """
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            
+            if failed or status_code in THROTTLE_STATUSES:
+                # Multiplicative decrease and a cooldown before the next request
+                self.rate = max(SCRAPER_HOST_MIN_RATE, self.rate / 2)
+                self.in_flight_limit = max(1, self.in_flight_limit // 2)
+                delay = _parse_retry_after(retry_after)
+                if delay is None:
+                    delay = self.backoff
+                    self.backoff = min(self.max_backoff, self.backoff * 2)
+                self.cooldown_until = max(self.cooldown_until, time.monotonic() + delay)
+                return
+            if status_code is None:
+                # Cancelled, out of time or failed locally: says nothing about the host
+                return
+            
+            self.backoff = self.initial_backoff
+            if self.latency_avg is not None and latency > self.latency_avg * self.latency_spike_factor:
+                # Host is struggling: ease off without a hard cooldown
+                self.rate = max(SCRAPER_HOST_MIN_RATE, self.rate * 0.75)
+                self.in_flight_limit = max(1, self.in_flight_limit - 1)
+            else:
+                # Healthy: additive increase
+                self.rate = min(SCRAPER_HOST_MAX_RATE, self.rate + 0.25)
+                self.in_flight_limit = min(self.max_in_flight, self.in_flight_limit + 1)
+            
+            self.latency_avg = latency if self.latency_avg is None else 0.8 * self.latency_avg + 0.2 * latency
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds (HTTP dates are ignored)."""
+    if not value:
+        return None
+    try:
+        return min(HostLimiter.max_backoff, max(0.0, float(value)))
+    except ValueError:
+        return None
+
+
+_limiters: Dict[str, HostLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_host_limiter(url: str) -> HostLimiter:
+    """
+    Get the process-wide limiter for the host of a URL.
+    
+    Args:
+        url: Request URL
+    
+    Returns:
+        HostLimiter shared by all requests to that host
+    """
+    key = host_key(url)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = HostLimiter()
+            _limiters[key] = limiter
+        return limiter
@@ -1,14 +1,20 @@
 """
 Scraper registry - manages all available scrapers.
+
+Scraper instances are pooled: each source keeps one long-lived instance (with
+its warm keep-alive session) that is rebuilt only when the source's config
+file changes on disk.
 """
-from typing import Dict, Type
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Type
 
 from app.scrapers.base import BaseScraper
 from app.scrapers.oipip_gdansk import OipipGdanskScraper
 from app.scrapers.szpitalepomorskie import SzpitalePomorskieScraper
 from app.scrapers.copernicus import CopernicusScraper
 from app.scrapers.uck import UckScraper
-from app.scrapers.config_loader import load_config, list_configs
+from app.scrapers.config_loader import SourceConfig, load_config, list_configs
 from app.scrapers.config_scraper import ConfigBasedScraper
 
 
@@ -21,10 +27,47 @@ HARDCODED_SCRAPERS: Dict[str, Type[BaseScraper]] = {
 }
 
 
+class _PoolEntry:
+    """A pooled scraper and the config object it was built from."""
+    
+    def __init__(self, scraper: BaseScraper, config: Optional[SourceConfig]):
+        self.scraper = scraper
+        self.config = config
+        self.lock = threading.Lock()  # Held while the scraper is checked out
+        self.retired = False  # Dropped from the pool; closed once no longer checked out
+    
+    def retire(self):
+        """Close the scraper now, or when its current checkout ends."""
+        self.retired = True
+        if self.lock.acquire(blocking=False):
+            try:
+                self.scraper.close()
+            finally:
+                self.lock.release()
+
+
+_pool: Dict[str, _PoolEntry] = {}
+_pool_lock = threading.Lock()
+
+
+def _get_pool_entry(name: str) -> _PoolEntry:
+    """Get the pooled entry for a scraper, rebuilding it if its config changed."""
+    config = load_config(name)  # Cached; a new object only when the file changed
+    with _pool_lock:
+        entry = _pool.get(name)
+        if entry is None or entry.config is not config:
+            if entry is not None:
+                entry.retire()
+            entry = _PoolEntry(_build_scraper(name, config), config)
+            _pool[name] = entry
+        return entry
+
+
 def get_scraper(name: str) -> BaseScraper:
     """
-    Get scraper instance by name.
-    Tries config-based scrapers first, then falls back to hardcoded scrapers.
+    Get the pooled scraper instance by name.
+    
+    The instance is shared; concurrent callers should use checkout_scraper().
     
     Args:
         name: Scraper name (config ID or hardcoded scraper name)
@@ -32,11 +75,77 @@ def get_scraper(name: str) -> BaseScraper:
     Returns:
         Scraper instance with source_id set
         
+    Raises:
+        ValueError: If scraper name not found
+    """
+    return _get_pool_entry(name).scraper
+
+
+@contextmanager
+def checkout_scraper(name: str) -> Iterator[BaseScraper]:
+    """
+    Check out a scraper for exclusive use.
+    
+    Yields the pooled instance, or a fresh unpooled one if the pooled
+    instance is already checked out elsewhere (closed afterwards).
+    
+    Args:
+        name: Scraper name (config ID or hardcoded scraper name)
+        
+    Raises:
+        ValueError: If scraper name not found
+    """
+    entry = _get_pool_entry(name)
+    if not entry.lock.acquire(blocking=False):
+        scraper = _build_scraper(name, entry.config)
+        try:
+            yield scraper
+        finally:
+            scraper.close()
+        return
+    try:
+        yield entry.scraper
+    finally:
+        entry.lock.release()
+        # Retired (discarded or replaced) while checked out: close it now
+        if entry.retired:
+            entry.retire()
+
+
+def discard_scraper(name: str, scraper: BaseScraper):
+    """
+    Remove a scraper from the pool so it is not handed out again.
+    
+    Used when a scrape was abandoned and the instance may still be in use
+    by work that could not be cancelled (e.g. a thread). The instance is
+    closed once its checkout ends (an unpooled one is closed by
+    checkout_scraper()); requests of that work still finish.
+    """
+    with _pool_lock:
+        entry = _pool.get(name)
+        if entry is not None and entry.scraper is scraper:
+            del _pool[name]
+            entry.retire()
+
+
+def clear_scraper_pool():
+    """Drop all pooled scrapers and close their sessions."""
+    with _pool_lock:
+        entries = list(_pool.values())
+        _pool.clear()
+    for entry in entries:
+        entry.retire()
+
+
+def _build_scraper(name: str, config: Optional[SourceConfig]) -> BaseScraper:
+    """
+    Build a new scraper instance.
+    Uses the config-based scraper if a config exists, then falls back to hardcoded scrapers.
+    
     Raises:
         ValueError: If scraper name not found
     """
     # Try config-based scraper first
-    config = load_config(name)
     if config:
         scraper = ConfigBasedScraper(config)
         scraper.source_id = name  # Set source_id
@@ -2,7 +2,8 @@
 Scraper for Szpitale Pomorskie job offers.
 Source: https://www.szpitalepomorskie.eu/category/oferty-pracy/
 """
-from typing import List, Dict
+import asyncio
+from typing import List, Dict, Optional
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
@@ -13,6 +14,8 @@ from app.scrapers.base import BaseScraper
 class SzpitalePomorskieScraper(BaseScraper):
     """Scraper for Szpitale Pomorskie job board."""
     
+    uses_playwright = True
+    
     def __init__(self):
         super().__init__(
             base_url="https://www.szpitalepomorskie.eu/category/oferty-pracy/",
@@ -27,7 +30,6 @@ class SzpitalePomorskieScraper(BaseScraper):
         Returns:
             List of job offer dictionaries
         """
-        jobs = []
         # Try with Playwright first (handles JavaScript and anti-bot measures better)
         soup = self.fetch_page(self.base_url, use_playwright=True)
         
@@ -35,6 +37,27 @@ class SzpitalePomorskieScraper(BaseScraper):
         if not soup:
             soup = self.fetch_page(self.base_url, use_playwright=False)
         
+        return self.parse_jobs(soup)
+    
+    async def async_scrape(self) -> List[Dict]:
+        """Async variant of scrape()."""
+        soup = await self.async_fetch_page(self.base_url, use_playwright=True)
+        if not soup:
+            soup = await self.async_fetch_page(self.base_url, use_playwright=False)
+        return await asyncio.to_thread(self.parse_jobs, soup)
+    
+    def parse_jobs(self, soup: Optional[BeautifulSoup]) -> List[Dict]:
+        """
+        Extract job offers from the Szpitale Pomorskie listing page.
+        
+        Args:
+            soup: Parsed listing page (None if the fetch failed)
+            
+        Returns:
+            List of job offer dictionaries
+        """
+        jobs = []
+        
         if not soup:
             return jobs
         
@@ -4,7 +4,8 @@ Source: https://uck.pl/kariera/oferty.html
 Note: This site may require JavaScript, so we'll try BeautifulSoup first,
       and can fall back to Playwright if needed.
 """
-from typing import List, Dict
+import asyncio
+from typing import List, Dict, Optional
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
@@ -29,8 +30,25 @@ class UckScraper(BaseScraper):
         Returns:
             List of job offer dictionaries
         """
-        jobs = []
         soup = self.fetch_page(self.base_url)
+        return self.parse_jobs(soup)
+    
+    async def async_scrape(self) -> List[Dict]:
+        """Async variant of scrape()."""
+        soup = await self.async_fetch_page(self.base_url)
+        return await asyncio.to_thread(self.parse_jobs, soup)
+    
+    def parse_jobs(self, soup: Optional[BeautifulSoup]) -> List[Dict]:
+        """
+        Extract job offers from the UCK listing page.
+        
+        Args:
+            soup: Parsed listing page (None if the fetch failed)
+            
+        Returns:
+            List of job offer dictionaries
+        """
+        jobs = []
         
         if not soup:
             return jobs
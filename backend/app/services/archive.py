@@ -0,0 +1,139 @@
+"""
+Archive tier for inactive job offers.
+
+Refreshes only mark vanished offers inactive, so job_offers would grow
+forever and every active-only query and index scan would pay for the dead
+rows. The archival job moves offers that have been inactive for longer than
+ARCHIVE_AFTER_DAYS into job_offers_archive, in chunks, and then compacts the
+database (VACUUM and ANALYZE on SQLite, ANALYZE on PostgreSQL).
+
+Writers look up scraped URLs they don't know in the archive
+(app.offer_store.restore_archived_offers), so an archived offer that
+reappears is moved back and reactivated instead of being stored again.
+
+Usage:
+    python -m app.services.archive [--older-than-days DAYS] [--chunk-size N] [--no-compact]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, get_engine, init_db
+from app.models import JobOffer, JobOfferArchive
+from app.offer_store import OFFER_COLUMNS
+
+# Inactive offers not seen for this many days are archived
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+
+# Offers moved per statement (and per commit)
+ARCHIVE_CHUNK_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+def archive_inactive_offers(older_than_days: int, chunk_size: int, db: Session) -> int:
+    """
+    Move offers inactive for longer than older_than_days into job_offers_archive.
+    
+    Each chunk is copied with one INSERT ... SELECT, deleted with one DELETE
+    and committed, so the job can be interrupted at any point.
+    
+    Args:
+        older_than_days: Archive offers last seen (or, for legacy offers,
+                         scraped) more than this many days ago
+        chunk_size: Offers per chunk
+        db: Database session
+    
+    Returns:
+        Number of archived offers
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    archived = 0
+    
+    while True:
+        ids = db.execute(
+            select(JobOffer.id).where(
+                JobOffer.status == 'inactive',
+                func.coalesce(JobOffer.last_seen_at, JobOffer.scraped_at) < cutoff,
+            ).order_by(JobOffer.id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            break
+        
+        db.execute(insert(JobOfferArchive).from_select(
+            ['offer_id'] + OFFER_COLUMNS + ['archived_at'],
+            select(JobOffer.id, *(getattr(JobOffer, name) for name in OFFER_COLUMNS), literal(datetime.utcnow()))
+            .where(JobOffer.id.in_(ids)),
+        ))
+        db.execute(delete(JobOffer).where(JobOffer.id.in_(ids)))
+        db.commit()
+        archived += len(ids)
+        logger.info(f"Archived {archived} offers (up to id {ids[-1]})")
+    
+    return archived
+
+
+def compact_database():
+    """
+    Reclaim space and refresh planner statistics after archiving.
+    
+    On SQLite, VACUUM rewrites the file without the freed pages (it needs a
+    moment without other writers; a busy database is skipped with a
+    warning) and ANALYZE updates the statistics. On PostgreSQL, autovacuum
+    reclaims space, so only ANALYZE runs.
+    """
+    engine = get_engine()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if engine.dialect.name == 'sqlite':
+            try:
+                conn.exec_driver_sql("VACUUM")
+            except Exception as e:
+                logger.warning(f"VACUUM skipped: {e}")
+            conn.exec_driver_sql("ANALYZE")
+        else:
+            conn.exec_driver_sql(f"ANALYZE {JobOffer.__tablename__}")
+            conn.exec_driver_sql(f"ANALYZE {JobOfferArchive.__tablename__}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Move old inactive job offers into job_offers_archive.")
+    parser.add_argument(
+        "--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS,
+        help=f"archive offers inactive for longer than this (default: {ARCHIVE_AFTER_DAYS}, ARCHIVE_AFTER_DAYS)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=ARCHIVE_CHUNK_SIZE, help="offers per commit")
+    parser.add_argument("--no-compact", action="store_true", help="skip VACUUM/ANALYZE afterwards")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    init_db()
+    db = SessionLocal()
+    started = time.perf_counter()
+    try:
+        archived = archive_inactive_offers(args.older_than_days, args.chunk_size, db)
+    except Exception:
+        db.rollback()
+        logger.exception("Archiving failed")
+        sys.exit(1)
+    finally:
+        db.close()
+    logger.info(f"Archived {archived} offers inactive for more than {args.older_than_days} days "
+                f"in {time.perf_counter() - started:.1f}s")
+    
+    if archived and not args.no_compact:
+        started = time.perf_counter()
+        compact_database()
+        logger.info(f"Compacted the database in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
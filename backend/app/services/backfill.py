@@ -0,0 +1,196 @@
+"""
+Chunked, resumable backfills over job offers.
+
+Maintenance scripts describe a backfill as a row function; run_backfill()
+walks job_offers in id order in chunks (keyset pagination, so each chunk is
+one indexed query and no cursor has to survive a commit), applies the row
+function to each row, optionally in a process pool, and writes the chunk's
+updates and deletes in bulk. Each chunk is committed together with its
+progress cursor (backfill_progress), so an interrupted backfill resumes
+after the last committed chunk.
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import BackfillProgress, JobOffer
+
+# Rows per chunk (and per commit)
+DEFAULT_CHUNK_SIZE = 500
+
+# Returned by a row function to delete the row
+DELETE = 'delete'
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillStats:
+    """Counters of a backfill run."""
+    
+    def __init__(self, name: str, dry_run: bool):
+        self.name = name
+        self.dry_run = dry_run
+        self.resumed_after_id = 0
+        self.rows = 0
+        self.updated = 0
+        self.deleted = 0
+        self.chunks = 0
+        self.seconds = 0.0
+    
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+    
+    def __str__(self):
+        verb = "would change" if self.dry_run else "changed"
+        return (f"{self.name}: {self.rows} rows in {self.chunks} chunks, {verb} {self.updated} updated / "
+                f"{self.deleted} deleted, {self.seconds:.1f}s ({self.rows_per_second:.0f} rows/s)")
+
+
+def add_backfill_arguments(parser: argparse.ArgumentParser):
+    """Add the common backfill options (--chunk-size, --workers, --dry-run, --restart)."""
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows per chunk and commit')
+    parser.add_argument('--workers', type=int, default=1, help='processes for the row function (1: in-process)')
+    parser.add_argument('--dry-run', action='store_true', help='report changes without writing them')
+    parser.add_argument('--restart', action='store_true', help='ignore the saved progress and start from the first row')
+
+
+def _load_cursor(name: str, restart: bool, db: Session) -> BackfillProgress:
+    """Progress row of a backfill, reset unless an unfinished run can be resumed."""
+    now = datetime.utcnow()
+    progress = db.get(BackfillProgress, name)
+    if progress is None:
+        progress = BackfillProgress(name=name, last_id=0, rows_processed=0, rows_changed=0,
+                                    started_at=now, updated_at=now)
+        db.add(progress)
+    elif restart or progress.finished_at is not None:
+        progress.last_id = 0
+        progress.rows_processed = 0
+        progress.rows_changed = 0
+        progress.started_at = now
+        progress.updated_at = now
+        progress.finished_at = None
+    return progress
+
+
+def _apply_chunk(rows, results, dry_run: bool, db: Session):
+    """Write a chunk's results (bulk UPDATE by primary key and one DELETE); returns the counts."""
+    updates = []
+    deletes = []
+    for row, result in zip(rows, results):
+        if result == DELETE:
+            deletes.append(row.id)
+        elif result:
+            updates.append(dict(result, id=row.id))
+    if dry_run:
+        return len(updates), len(deletes)
+    if updates:
+        db.execute(update(JobOffer), updates)
+    if deletes:
+        db.execute(delete(JobOffer).where(JobOffer.id.in_(deletes)))
+    return len(updates), len(deletes)
+
+
+def run_backfill(
+    name: str,
+    columns: Sequence,
+    row_func: Callable,
+    filters: Sequence = (),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+    dry_run: bool = False,
+    restart: bool = False,
+    report: Optional[Callable] = None,
+) -> BackfillStats:
+    """
+    Apply row_func to every job offer matching filters, chunk by chunk.
+    
+    Args:
+        name: Backfill name, the key of its saved progress
+        columns: JobOffer columns to select (id is always included)
+        row_func: Called with each row (a Row with the selected columns);
+            returns a dict of column values to update, DELETE, or None to
+            leave the row alone. With workers > 1 it runs in other
+            processes, so it must be a module-level function.
+        filters: WHERE conditions on JobOffer
+        chunk_size: Rows per chunk and commit
+        workers: Processes for row_func (1: run it in this process)
+        dry_run: Only count the changes; progress is neither used nor saved
+        restart: Start from the first row even if an unfinished run saved progress
+        report: Called in this process as report(row, result) for every
+            row that is updated or deleted (e.g. to print examples)
+    
+    Returns:
+        BackfillStats of this run
+    """
+    stats = BackfillStats(name, dry_run)
+    columns = [JobOffer.id] + [column for column in columns if column is not JobOffer.id]
+    db = SessionLocal()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    started = time.perf_counter()
+    
+    try:
+        # A dry run always starts from the first row and leaves saved progress alone
+        progress = None if dry_run else _load_cursor(name, restart, db)
+        last_id = progress.last_id if progress else 0
+        stats.resumed_after_id = last_id
+        if last_id:
+            logger.info(f"{name}: resuming after id {last_id} ({progress.rows_processed} rows done)")
+        db.commit()
+        
+        while True:
+            chunk_started = time.perf_counter()
+            rows = db.execute(
+                select(*columns).where(JobOffer.id > last_id, *filters).order_by(JobOffer.id).limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            
+            if executor:
+                results = list(executor.map(row_func, rows, chunksize=max(1, len(rows) // (workers * 4))))
+            else:
+                results = [row_func(row) for row in rows]
+            updated, deleted = _apply_chunk(rows, results, dry_run, db)
+            if report:
+                for row, result in zip(rows, results):
+                    if result:
+                        report(row, result)
+            
+            last_id = rows[-1].id
+            stats.rows += len(rows)
+            stats.updated += updated
+            stats.deleted += deleted
+            stats.chunks += 1
+            if not dry_run:
+                progress.last_id = last_id
+                progress.rows_processed += len(rows)
+                progress.rows_changed += updated + deleted
+                progress.updated_at = datetime.utcnow()
+                db.commit()
+            
+            chunk_seconds = time.perf_counter() - chunk_started
+            stats.seconds = time.perf_counter() - started
+            logger.info(
+                f"{name}: chunk {stats.chunks} up to id {last_id}: {len(rows)} rows, {updated} updated, "
+                f"{deleted} deleted ({len(rows) / chunk_seconds:.0f} rows/s, {stats.rows_per_second:.0f} overall)"
+            )
+        
+        if not dry_run:
+            progress.finished_at = datetime.utcnow()
+            db.commit()
+        stats.seconds = time.perf_counter() - started
+        return stats
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if executor:
+            executor.shutdown()
+        db.close()
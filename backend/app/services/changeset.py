@@ -0,0 +1,258 @@
+"""
+In-memory changeset diff for refreshing one source.
+
+Instead of querying the database once per scraped offer, a refresh loads a
+compact snapshot of the source's active offers in one query (canonical URL,
+id, status and the stored content_hash). It then computes the offers to
+insert, update and reactivate with set operations, and applies them in a
+handful of bulk statements. Round trips per source no longer grow with the
+number of offers, which matters against a remote Postgres. Offers are
+matched by canonical URL, so variants of an offer's URL don't create
+duplicates.
+
+Stale offers are inactivated by a single UPDATE: every offer in the scrape
+has just been stamped with a new last_seen_at, so the source's active offers
+last seen before the refresh started are exactly the ones that disappeared.
+Neither the stale rows nor the current URLs pass through Python.
+
+Functions take the database session as their last argument; nothing is
+committed here.
+"""
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.orm import Session
+
+from app.models import JobOffer
+from app.offer_store import restore_archived_offers
+from app.scrapers.base import BaseScraper
+from app.utils.content_hash import CONTENT_FIELDS, compute_content_hash, content_hash_columns, stored_content_hash
+from app.utils.summary import extract_summary
+from app.utils.urls import canonicalize_url
+
+# Rows per IN list / executemany batch (stays below SQLite's variable limit)
+CHUNK_SIZE = 500
+
+def _chunks(items: List, size: int = CHUNK_SIZE) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class SnapshotRow:
+    """Compact view of an existing offer."""
+
+    __slots__ = ('id', 'canonical_url', 'source_id', 'status', 'external_job_url', 'content_hash', 'hash_stored')
+
+    def __init__(self, row):
+        self.id = row.id
+        # Rows stored before canonical_url existed (or left without one as duplicates) are matched by their URL
+        self.canonical_url = row.canonical_url or canonicalize_url(row.source_url)
+        self.source_id = row.source_id
+        self.status = row.status
+        self.external_job_url = row.external_job_url
+        self.content_hash = stored_content_hash(row)
+        self.hash_stored = row.content_hash is not None  # False for rows written before content_hash existed
+
+
+_SNAPSHOT_COLUMNS = (
+    JobOffer.id, JobOffer.source_url, JobOffer.canonical_url, JobOffer.source_id, JobOffer.status,
+    JobOffer.external_job_url, *content_hash_columns(),
+)
+
+
+def load_snapshot(scraper: BaseScraper, db: Session) -> Dict[str, SnapshotRow]:
+    """
+    Load the active offers of a source in a single query.
+
+    Inactive offers are not part of the snapshot, so it grows with the
+    source's current listing rather than its history; build_changeset()
+    looks up scraped URLs missing from it separately.
+
+    Args:
+        scraper: Scraper of the source
+        db: Database session
+
+    Returns:
+        Dictionary mapping canonical URL to SnapshotRow (the oldest row, if
+        several legacy rows share a canonical URL)
+    """
+    query = db.query(*_SNAPSHOT_COLUMNS).filter(
+        JobOffer.source_id == scraper.source_id,
+        JobOffer.status == 'active'
+    ).order_by(JobOffer.id.desc())
+    return {snapshot_row.canonical_url: snapshot_row for snapshot_row in map(SnapshotRow, query)}
+
+
+class Changeset:
+    """Writes needed to bring the stored offers of a source in line with a scrape."""
+
+    def __init__(self, source_id: str, refresh_start_time: datetime):
+        self.source_id = source_id
+        self.refresh_start_time = refresh_start_time  # Active offers last seen before it are stale
+        self.inserts: List[Dict] = []  # Full rows of new offers
+        self.updates: List[Dict] = []  # Changed columns by primary key ('id')
+        self.seen_ids: List[int] = []  # Unchanged offers, only their timestamps move
+        self.new_urls: List[str] = []
+        self.updated_urls: List[str] = []  # Changed or reactivated offers
+        self.reactivated_urls: List[str] = []
+        self.now = datetime.utcnow()
+
+
+def build_changeset(scraper: BaseScraper, current_jobs: List[Dict], refresh_start_time: datetime,
+                    db: Session) -> Changeset:
+    """
+    Diff the scraped offers of a source against its stored offers.
+
+    Reads from the database: one snapshot query, plus two queries per
+    CHUNK_SIZE URLs missing from it to find inactive offers, archived offers
+    and offers stored under another source (or without a source_id). The
+    only writes move matching archived offers back into job_offers (as
+    inactive offers, reactivated by the changeset). Scraped offers sharing a
+    canonical URL are stored once (the first one wins).
+
+    Args:
+        scraper: Scraper that produced the offers
+        current_jobs: Offers returned by scraper.scrape()
+        refresh_start_time: When the refresh started; active offers last
+                            seen before it are inactivated
+        db: Database session
+
+    Returns:
+        Changeset to pass to apply_changeset()
+    """
+    changeset = Changeset(scraper.source_id, refresh_start_time)
+    now = changeset.now
+    snapshot = load_snapshot(scraper, db)
+
+    jobs = {}
+    for job in current_jobs:
+        jobs.setdefault(canonicalize_url(job['source_url']), job)
+
+    # Scraped offers missing from the snapshot may be inactive or archived
+    # (to be reactivated), stored under another source, or stored before
+    # canonical_url existed
+    unknown = [canonical_url for canonical_url in jobs if canonical_url not in snapshot]
+    for chunk in _chunks(unknown):
+        urls = [jobs[canonical_url]['source_url'] for canonical_url in chunk]
+        restore_archived_offers(chunk, urls, db)
+        query = db.query(*_SNAPSHOT_COLUMNS).filter(
+            or_(JobOffer.canonical_url.in_(chunk), JobOffer.source_url.in_(urls))
+        ).order_by(JobOffer.id)
+        for snapshot_row in map(SnapshotRow, query):
+            snapshot.setdefault(snapshot_row.canonical_url, snapshot_row)
+
+    for canonical_url, job_data in jobs.items():
+        url = job_data['source_url']
+        job = scraper.prepare_job(job_data)
+        content_hash = compute_content_hash(*(job[field] for field in CONTENT_FIELDS))
+        row = snapshot.get(canonical_url)
+
+        if row is None:
+            changeset.inserts.append({
+                'title': job['title'],
+                'facility_name': job['facility_name'],
+                'city': job['city'],
+                'role': job['role'],
+                'description': job['description'],
+                'content_hash': content_hash,
+                'summary': extract_summary(
+                    title=job['title'],
+                    description=job['description'],
+                    facility_name=job['facility_name'],
+                    city=job['city']
+                ),
+                'source_url': url,
+                'canonical_url': canonical_url,
+                'source_id': scraper.source_id,
+                'external_job_url': job.get('external_job_url'),
+                'scraped_at': now,
+                'created_at': now,
+                'first_seen_at': now,
+                'last_seen_at': now,
+                'status': 'active',
+            })
+            changeset.new_urls.append(url)
+            continue
+
+        values = {}
+        if row.content_hash != content_hash:
+            # Summary regeneration and the content write only happen for changed offers
+            values.update({field: job[field] for field in CONTENT_FIELDS})
+            values['content_hash'] = content_hash
+            values['summary'] = extract_summary(
+                title=job['title'],
+                description=job['description'],
+                facility_name=job['facility_name'],
+                city=job['city']
+            )
+        if row.status == 'inactive':
+            values['status'] = 'active'
+            changeset.reactivated_urls.append(url)
+        if values:
+            changeset.updated_urls.append(url)
+
+        # Not counted as updates
+        if not row.hash_stored:
+            values['content_hash'] = content_hash
+        if not row.source_id and scraper.source_id:
+            values['source_id'] = scraper.source_id
+        if job.get('external_job_url') and row.external_job_url != job['external_job_url']:
+            values['external_job_url'] = job['external_job_url']
+
+        if values:
+            values.update({'id': row.id, 'scraped_at': now, 'last_seen_at': now})
+            changeset.updates.append(values)
+        else:
+            changeset.seen_ids.append(row.id)
+
+    return changeset
+
+
+def apply_changeset(changeset: Changeset, db: Session,
+                    changes: Optional[Dict[str, List[str]]] = None) -> Dict[str, int]:
+    """
+    Write a changeset with bulk statements (one per CHUNK_SIZE rows and kind of change).
+
+    Offers of the source that are still active but were not stamped by
+    this write (last_seen_at before the refresh started) are inactivated
+    with one UPDATE.
+
+    Args:
+        changeset: Result of build_changeset()
+        db: Database session (not committed)
+        changes: Optional collector for the source_urls of new, updated,
+                 reactivated and inactivated offers
+
+    Returns:
+        Dictionary with counts: {'new': int, 'updated': int, 'inactivated': int}
+    """
+    for chunk in _chunks(changeset.inserts):
+        db.execute(insert(JobOffer), chunk)
+    for chunk in _chunks(changeset.updates):
+        db.execute(update(JobOffer), chunk)
+    for chunk in _chunks(changeset.seen_ids):
+        db.query(JobOffer).filter(JobOffer.id.in_(chunk)).update({
+            JobOffer.scraped_at: changeset.now,
+            JobOffer.last_seen_at: changeset.now,
+        }, synchronize_session=False)
+
+    # Mark stale offers as inactive
+    stale = db.query(JobOffer).filter(
+        JobOffer.source_id == changeset.source_id,
+        JobOffer.status == 'active',
+        JobOffer.last_seen_at < changeset.refresh_start_time
+    )
+    if changes is not None:
+        inactivated_urls = [url for (url,) in stale.with_entities(JobOffer.source_url)]
+        changes.setdefault('new', []).extend(changeset.new_urls)
+        changes.setdefault('updated', []).extend(changeset.updated_urls)
+        changes.setdefault('reactivated', []).extend(changeset.reactivated_urls)
+        changes.setdefault('inactivated', []).extend(inactivated_urls)
+    inactivated = stale.update({JobOffer.status: 'inactive'}, synchronize_session=False)
+
+    return {
+        'new': len(changeset.new_urls),
+        'updated': len(changeset.updated_urls),
+        'inactivated': inactivated,
+    }
@@ -1,237 +1,583 @@
 """
 Job offer refresh service.
 """
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import partial
+from typing import Callable, Dict, List, Optional
 from sqlalchemy.orm import Session
 
-from app.database import SessionLocal
+from app.database import SessionLocal, get_engine, is_sqlite
 from app.models import JobOffer
-from app.scrapers.registry import get_scraper, list_scrapers
+from app.scrapers.base import BaseScraper, PageNotModified
+from app.scrapers.registry import checkout_scraper, discard_scraper, list_scrapers
 from app.scrapers.playwright_helper import PlaywrightHelper
+from app.services.changeset import apply_changeset, build_changeset
+from app.services.refresh_queue import SOURCE_LEASE_SECONDS, acquire_source_lease, release_source_lease
+from app.services.refresh_runs import (
+    find_resumable_run, finish_run, mark_source_finished, mark_source_running, reset_sources, resume_run, start_run,
+)
+from app.services.refresh_worker import process_tree_rss_mb
+from app.services.source_schedule import record_source_refresh
+from app.services.source_state import load_fingerprints, load_validators, save_fingerprint, save_validators
+
+# Maximum number of sources refreshed concurrently (1 = sequential)
+REFRESH_MAX_CONCURRENCY = int(os.getenv("REFRESH_MAX_CONCURRENCY", "16"))
+
+# Default wall-clock budget for scraping one source (seconds); configs override it with "timeoutSeconds"
+REFRESH_SOURCE_TIMEOUT = float(os.getenv("REFRESH_SOURCE_TIMEOUT", "120"))
+
+# With a time budget, no source is started later than this many seconds before the deadline
+REFRESH_SOURCE_RESERVE = float(os.getenv("REFRESH_SOURCE_RESERVE", "60"))
+
+# SQLite allows one writer at a time, and a transaction that reads before it
+# writes fails with "database is locked" instead of waiting for another
+# writer, so concurrent sources may scrape in parallel but take turns writing.
+_sqlite_write_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
 
 
 class RefreshResult:
     """Result of a refresh operation."""
     
     def __init__(self):
-        self.status = 'success'  # 'success', 'partial', 'failed'
+        self.status = 'success'  # 'success', 'partial', 'failed', 'incomplete'
+        self.run_id: Optional[int] = None
+        self.dry_run = False
         self.sources_processed = 0
         self.sources_failed = 0
+        self.sources_pending = 0  # Left for a resumed run (time budget exhausted)
+        self.sources_timed_out = 0  # Subset of sources_failed that exceeded their per-source budget
+        self.sources_skipped = 0  # Left pending because another run held the source's lease
+        self.stop_reason: Optional[str] = None  # Why sources were left pending: 'time_budget' | 'memory' | 'stopped'
         self.new_offers = 0
         self.updated_offers = 0
         self.inactivated_offers = 0
+        self.fingerprint_hits = 0
+        self.fingerprint_misses = 0
         self.errors: List[Dict[str, str]] = []
         self.source_results: Dict[str, Dict] = {}
     
+    def add_source_result(self, source_id: str, source_result: Dict):
+        """Record the outcome of a single source."""
+        self.sources_processed += 1
+        self.new_offers += source_result['new']
+        self.updated_offers += source_result['updated']
+        self.inactivated_offers += source_result['inactivated']
+        self.source_results[source_id] = source_result
+        
+        if source_result.get('fingerprint') == 'hit':
+            self.fingerprint_hits += 1
+        elif source_result.get('fingerprint') == 'miss':
+            self.fingerprint_misses += 1
+        
+        if source_result.get('timed_out'):
+            self.sources_timed_out += 1
+        
+        if source_result.get('error'):
+            self.sources_failed += 1
+            self.errors.append({
+                'source': source_id,
+                'message': source_result['error']
+            })
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary for API response."""
         return {
             'status': self.status,
+            'run_id': self.run_id,
+            'dry_run': self.dry_run,
             'sources_processed': self.sources_processed,
             'sources_failed': self.sources_failed,
+            'sources_pending': self.sources_pending,
+            'sources_timed_out': self.sources_timed_out,
+            'sources_skipped': self.sources_skipped,
+            'stop_reason': self.stop_reason,
             'new_offers': self.new_offers,
             'updated_offers': self.updated_offers,
             'inactivated_offers': self.inactivated_offers,
+            'fingerprint_hits': self.fingerprint_hits,
+            'fingerprint_misses': self.fingerprint_misses,
             'errors': self.errors,
             'source_results': self.source_results,
         }
 
 
-def refresh_all_sources() -> RefreshResult:
+def refresh_all_sources(max_concurrency: Optional[int] = None, resume: bool = False,
+                        time_budget: Optional[float] = None,
+                        sources: Optional[List[str]] = None,
+                        max_memory_mb: Optional[float] = None,
+                        dry_run: bool = False,
+                        run_id: Optional[int] = None,
+                        on_run_started: Optional[Callable[[int], None]] = None,
+                        stop: Optional[threading.Event] = None) -> RefreshResult:
     """
     Refresh job offers from all configured sources.
     
+    Blocking entry point for the API, the scheduler and the CLI; runs
+    refresh_all_sources_async() on the refresh event loop.
+    
+    Args:
+        max_concurrency: Maximum number of sources in flight
+                         (default: REFRESH_MAX_CONCURRENCY)
+        resume: Continue the latest unfinished run instead of starting a new one
+        time_budget: Seconds after which the run stops and leaves the
+                     remaining sources pending (default: no limit)
+        sources: Refresh only these sources (default: all configured sources)
+        max_memory_mb: Stop starting sources once this process and its
+                       children (the browser) use more memory (default: no limit)
+        dry_run: Scrape and compute the changes without writing anything
+                 (see dry_run_sources_async)
+        run_id: Continue this run (e.g. of a refresh job taken over from
+                another worker) instead of the latest unfinished one
+        on_run_started: Called with the run id once the run is created or resumed
+        stop: Once set, no further source is started; sources in flight
+              finish and the rest stay pending
+    
+    Returns:
+        RefreshResult with summary of the operation
+    """
+    if dry_run:
+        return _run_in_refresh_loop(dry_run_sources_async(sources, max_concurrency=max_concurrency))
+    return _run_in_refresh_loop(refresh_all_sources_async(
+        max_concurrency=max_concurrency, resume=resume, time_budget=time_budget, sources=sources,
+        max_memory_mb=max_memory_mb, run_id=run_id, on_run_started=on_run_started, stop=stop,
+    ))
+
+
+_refresh_loop: Optional[asyncio.AbstractEventLoop] = None
+_refresh_loop_lock = threading.Lock()
+
+
+def _run_in_refresh_loop(coro):
+    """
+    Run a coroutine on the long-lived refresh event loop and wait for it.
+    
+    The loop (and with it the shared httpx client and its keep-alive
+    connections) survives between refreshes, so scheduled runs in the
+    same process start warm.
+    """
+    global _refresh_loop
+    with _refresh_loop_lock:
+        if _refresh_loop is None:
+            _refresh_loop = asyncio.new_event_loop()
+            threading.Thread(target=_refresh_loop.run_forever, name="refresh-loop", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _refresh_loop).result()
+
+
+async def refresh_all_sources_async(max_concurrency: Optional[int] = None, resume: bool = False,
+                                    time_budget: Optional[float] = None,
+                                    sources: Optional[List[str]] = None,
+                                    max_memory_mb: Optional[float] = None,
+                                    run_id: Optional[int] = None,
+                                    on_run_started: Optional[Callable[[int], None]] = None,
+                                    stop: Optional[threading.Event] = None) -> RefreshResult:
+    """
+    Refresh job offers from all configured sources in one event loop.
+    
+    All HTTP fetches share one connection pool. Playwright sources are
+    serialized on the browser thread, and database writes run in worker
+    threads, each with its own session.
+    
+    Progress is checkpointed per source in refresh_runs/refresh_source_runs,
+    and every finished source updates its adaptive schedule (source_schedules).
+    With a time budget, no source is started later than
+    REFRESH_SOURCE_RESERVE seconds before the deadline, and sources still in
+    flight at the deadline are cancelled; both stay pending for --resume.
+    With a memory cap, no source is started once the process tree exceeds
+    it; the caller can then continue the run in a fresh process. Once stop
+    is set, no source is started either.
+    
+    Args:
+        max_concurrency: Maximum number of sources in flight
+                         (default: REFRESH_MAX_CONCURRENCY)
+        resume: Continue the latest unfinished run instead of starting a new one
+        time_budget: Seconds after which the run stops (default: no limit)
+        sources: Refresh only these sources (default: all configured sources)
+        max_memory_mb: Memory cap in MB for this process and its children (default: no limit)
+        run_id: Continue this run instead of the latest unfinished one
+                (a new run is started if it does not exist)
+        on_run_started: Called (in a worker thread) with the run id once the
+                        run is created or resumed
+        stop: Event that stops the run at the next source boundary
+    
     Returns:
         RefreshResult with summary of the operation
     """
     result = RefreshResult()
-    refresh_start_time = datetime.utcnow()
+    deadline = time.monotonic() + time_budget if time_budget else None
     
-    # Get all available scrapers
-    scraper_names = list_scrapers()
+    if run_id is not None:
+        resumable = await asyncio.to_thread(_run_db_step, resume_run, run_id)
+    elif resume:
+        resumable = await asyncio.to_thread(_run_db_step, find_resumable_run)
+    else:
+        resumable = None
+    if resumable:
+        run_id, refresh_start_time, scraper_names = resumable
+        logger.info(f"Resuming refresh run {run_id} with {len(scraper_names)} unfinished sources")
+    else:
+        # Get the requested sources, or all available scrapers
+        scraper_names = sources if sources is not None else list_scrapers()
+        
+        if sources is not None and not sources:
+            # Nothing requested (e.g. no source due); not an error
+            return result
+        
+        if not scraper_names:
+            result.status = 'failed'
+            result.errors.append({'source': 'system', 'message': 'No scrapers configured'})
+            return result
+        
+        run_id, refresh_start_time = await asyncio.to_thread(_run_db_step, start_run, scraper_names)
     
-    if not scraper_names:
-        result.status = 'failed'
-        result.errors.append({'source': 'system', 'message': 'No scrapers configured'})
-        return result
+    result.run_id = run_id
+    if on_run_started is not None:
+        await asyncio.to_thread(on_run_started, run_id)
+    in_flight = asyncio.Semaphore(max(1, max_concurrency or REFRESH_MAX_CONCURRENCY))
+    validators = await asyncio.to_thread(_run_db_step, load_validators)
+    fingerprints = await asyncio.to_thread(_run_db_step, load_fingerprints)
     
-    db = SessionLocal()
+    started_sources: List[str] = []
+    # Keyed on the run, not the process, so a resumed or taken-over run gets its own leases back
+    lease_holder = f"run{run_id}"
+    
+    async def run_source(source_id: str) -> Optional[Dict]:
+        async with in_flight:
+            if deadline is not None and time.monotonic() > deadline - REFRESH_SOURCE_RESERVE:
+                result.stop_reason = 'time_budget'
+                return None  # Out of time; stays pending
+            if stop is not None and stop.is_set():
+                result.stop_reason = 'stopped'
+                return None  # Stopped by the caller; stays pending
+            # (a fresh process always makes progress, even if its baseline is over the cap)
+            if max_memory_mb and started_sources and (process_tree_rss_mb() or 0) > max_memory_mb:
+                result.stop_reason = 'memory'
+                return None  # Over the memory cap; stays pending for a fresh process
+            
+            # At most one refresh per source in flight, across runs and workers
+            if not await asyncio.to_thread(_run_db_step, acquire_source_lease, source_id, lease_holder):
+                result.sources_skipped += 1
+                return None  # Another run is refreshing it; stays pending
+            
+            started_sources.append(source_id)
+            renewal = asyncio.ensure_future(_renew_source_lease(source_id, lease_holder))
+            try:
+                await asyncio.to_thread(_run_db_step, mark_source_running, run_id, source_id)
+                started = time.monotonic()
+                try:
+                    source_result = await refresh_source(source_id, refresh_start_time, validators, fingerprints)
+                except Exception as e:
+                    source_result = {'error': str(e), 'new': 0, 'updated': 0, 'inactivated': 0}
+                source_result['duration'] = round(time.monotonic() - started, 3)
+                await asyncio.to_thread(_run_db_step, mark_source_finished, run_id, source_id, source_result)
+                await asyncio.to_thread(_run_db_step, record_source_refresh, source_id, source_result, datetime.utcnow())
+                return source_result
+            finally:
+                renewal.cancel()
+                await asyncio.to_thread(_run_db_step, release_source_lease, source_id, lease_holder)
     
+    tasks = {asyncio.ensure_future(run_source(source_id)): source_id for source_id in scraper_names}
     try:
-        # Process each source
-        for source_id in scraper_names:
+        timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+        # (a resumed run may have no unfinished sources left)
+        done, not_done = await asyncio.wait(tasks, timeout=timeout) if tasks else (set(), set())
+        
+        # Budget exhausted: interrupt sources still in flight and put them back to pending
+        if not_done:
+            result.stop_reason = 'time_budget'
+        for task in not_done:
+            task.cancel()
+        await asyncio.gather(*not_done, return_exceptions=True)
+        await asyncio.to_thread(_run_db_step, reset_sources, run_id, [tasks[task] for task in not_done])
+        
+        for task, source_id in tasks.items():
+            outcome = None if task in not_done else task.result()
+            if outcome is None:
+                result.sources_pending += 1
+            else:
+                result.add_source_result(source_id, outcome)
+        
+        result.status = await asyncio.to_thread(_run_db_step, finish_run, run_id)
+    
+    finally:
+        # The HTTP client stays open for the next run; the browser is too heavy to keep
+        await asyncio.to_thread(PlaywrightHelper.close_browser)
+    
+    return result
+
+
+async def _renew_source_lease(source_id: str, holder: str):
+    """Keep renewing a source lease while the source is refreshed (cancel to stop)."""
+    while True:
+        await asyncio.sleep(SOURCE_LEASE_SECONDS / 3)
+        if not await asyncio.to_thread(_run_db_step, acquire_source_lease, source_id, holder):
+            logger.warning(f"Lost the lease on source {source_id} to another refresh")
+
+
+async def dry_run_sources_async(sources: Optional[List[str]] = None,
+                                max_concurrency: Optional[int] = None) -> RefreshResult:
+    """
+    Measure a refresh without writing to the database.
+    
+    Every source is scraped in full (no conditional requests or fingerprint
+    short-cuts) and its offers are applied in a transaction that is rolled
+    back. No run, lease, validator, fingerprint or schedule is recorded.
+    
+    Args:
+        sources: Sources to measure (default: all configured sources)
+        max_concurrency: Maximum number of sources in flight
+                         (default: REFRESH_MAX_CONCURRENCY)
+    
+    Returns:
+        RefreshResult whose source_results hold the would-be new/updated/
+        inactivated source_urls ('changes') and timings of each source
+    """
+    result = RefreshResult()
+    result.dry_run = True
+    refresh_start_time = datetime.utcnow()
+    scraper_names = sources if sources is not None else list_scrapers()
+    in_flight = asyncio.Semaphore(max(1, max_concurrency or REFRESH_MAX_CONCURRENCY))
+    
+    async def run_source(source_id: str) -> Dict:
+        async with in_flight:
+            started = time.monotonic()
             try:
-                source_result = refresh_source(source_id, db, refresh_start_time)
-                result.sources_processed += 1
-                result.new_offers += source_result['new']
-                result.updated_offers += source_result['updated']
-                result.inactivated_offers += source_result['inactivated']
-                result.source_results[source_id] = source_result
-                
-                if source_result.get('error'):
-                    result.sources_failed += 1
-                    result.errors.append({
-                        'source': source_id,
-                        'message': source_result['error']
-                    })
+                source_result = await refresh_source(source_id, refresh_start_time, dry_run=True)
             except Exception as e:
-                result.sources_failed += 1
-                result.sources_processed += 1
-                error_msg = str(e)
-                result.errors.append({
-                    'source': source_id,
-                    'message': error_msg
-                })
-                result.source_results[source_id] = {
-                    'error': error_msg,
-                    'new': 0,
-                    'updated': 0,
-                    'inactivated': 0
-                }
-        
-        # Determine overall status
-        if result.sources_failed == 0:
-            result.status = 'success'
-        elif result.sources_failed < result.sources_processed:
-            result.status = 'partial'
-        else:
-            result.status = 'failed'
+                source_result = {'error': str(e), 'new': 0, 'updated': 0, 'inactivated': 0}
+            source_result['duration'] = round(time.monotonic() - started, 3)
+            return source_result
     
+    try:
+        outcomes = await asyncio.gather(*(run_source(source_id) for source_id in scraper_names))
     finally:
-        db.close()
-        PlaywrightHelper.close_browser()
+        await asyncio.to_thread(PlaywrightHelper.close_browser)
     
+    for source_id, outcome in zip(scraper_names, outcomes):
+        result.add_source_result(source_id, outcome)
+    
+    if result.sources_failed == 0:
+        result.status = 'success'
+    elif result.sources_failed < result.sources_processed:
+        result.status = 'partial'
+    else:
+        result.status = 'failed'
     return result
 
 
-def refresh_source(source_id: str, db: Session, refresh_start_time: datetime) -> Dict:
+async def refresh_source(source_id: str, refresh_start_time: datetime,
+                         validators: Optional[Dict[str, Dict]] = None,
+                         fingerprints: Optional[Dict[str, str]] = None,
+                         dry_run: bool = False) -> Dict:
     """
     Refresh job offers from a single source.
     
+    If the listing page is unchanged since the last refresh (HTTP 304, or an
+    identical body), parsing and upserting are skipped and only last_seen_at
+    of the source's active offers is bumped. The same happens when the
+    normalized job list hashes to the stored listing fingerprint.
+    
+    Scraping is limited to the source's wall-clock budget (the scraper's
+    timeout_seconds, default REFRESH_SOURCE_TIMEOUT). A source that exceeds
+    it is cancelled and reported as timed out, and its offers are left untouched.
+    
+    In dry-run mode the scraped offers are applied in a transaction that is
+    rolled back; the result lists the source_urls that would be new,
+    updated and inactivated.
+    
     Args:
         source_id: Source identifier
-        db: Database session
         refresh_start_time: When the refresh started (for marking stale offers)
+        validators: HTTP cache validators from previous refreshes, keyed by URL
+        fingerprints: Listing fingerprints from previous refreshes, keyed by source_id
+        dry_run: Compute the changes without writing them
         
     Returns:
-        Dictionary with results: {'new': int, 'updated': int, 'inactivated': int, 'error': str (optional)}
+        Dictionary with results: {'new': int, 'updated': int, 'inactivated': int,
+        'outcome': str, 'items': int, 'bytes_fetched': int, 'scrape_seconds': float,
+        'changes': dict and 'diff_seconds': float (dry run only),
+        'unchanged': bool (optional), 'fingerprint': 'hit' | 'miss' (optional),
+        'timed_out': bool (optional), 'error': str (optional)}
     """
+    # Check out the pooled scraper instance (warm session, parsed config)
+    with checkout_scraper(source_id) as scraper:
+        result = await _refresh_with_scraper(scraper, source_id, refresh_start_time, validators, fingerprints, dry_run)
+        result['bytes_fetched'] = scraper.bytes_fetched
+        return result
+
+
+async def _refresh_with_scraper(scraper: BaseScraper, source_id: str, refresh_start_time: datetime,
+                                validators: Optional[Dict[str, Dict]],
+                                fingerprints: Optional[Dict[str, str]],
+                                dry_run: bool = False) -> Dict:
+    """Scrape a checked-out scraper and apply the result (see refresh_source)."""
     result = {
         'new': 0,
         'updated': 0,
         'inactivated': 0,
+        'items': 0,
     }
     
+    # Scrape current offers (no database access), within the source's budget
+    timeout = scraper.timeout_seconds or REFRESH_SOURCE_TIMEOUT
+    deadline = time.monotonic() + timeout
+    scraper.start_refresh(validators, deadline)
+    
     try:
-        # Get scraper instance
-        scraper = get_scraper(source_id)
-        
-        # Scrape current offers
-        current_jobs = scraper.scrape()
-        
-        if not current_jobs:
-            # No jobs found - don't mark existing as inactive (might be temporary)
-            return result
-        
-        # Deduplicate: Remove jobs with same base URL (without hash anchors)
-        # This prevents duplicates from sources that create hash-based URLs
-        import re
-        base_url_seen = set()
-        deduplicated_jobs = []
-        for job in current_jobs:
-            base_url = re.sub(r'#.*$', '', job['source_url'])
-            if base_url not in base_url_seen:
-                base_url_seen.add(base_url)
-                deduplicated_jobs.append(job)
-        
-        current_jobs = deduplicated_jobs
-        
-        # Clean up existing duplicates for this source before saving new ones
-        # Find all active jobs from this source
-        existing_jobs = db.query(JobOffer).filter(
-            JobOffer.source_id == source_id,
-            JobOffer.status == 'active'
-        ).all()
-        
-        # Group by base URL and remove duplicates
-        base_url_groups = {}
-        for job in existing_jobs:
-            base_url = re.sub(r'#.*$', '', job.source_url)
-            if base_url not in base_url_groups:
-                base_url_groups[base_url] = [job]
-            else:
-                base_url_groups[base_url].append(job)
-        
-        # Delete duplicates (keep the oldest one)
-        duplicates_deleted = 0
-        for base_url, jobs in base_url_groups.items():
-            if len(jobs) > 1:
-                # Sort by ID to keep the oldest
-                jobs_sorted = sorted(jobs, key=lambda j: j.id)
-                keep_job = jobs_sorted[0]
-                delete_jobs = jobs_sorted[1:]
-                
-                for job in delete_jobs:
-                    db.delete(job)
-                    duplicates_deleted += 1
-        
-        if duplicates_deleted > 0:
-            db.commit()
-        
-        # Save or update offers
-        save_result = scraper.save_or_update_to_db(current_jobs, db, update_existing=True)
-        result['new'] = save_result['new']
-        result['updated'] = save_result['updated']
-        
-        # Mark stale offers as inactive
-        # Get all source_urls from current scrape
-        current_urls = {job['source_url'] for job in current_jobs}
-        
-        # Find offers from this source that weren't seen in current scrape
-        # Also include offers with null source_id that match this source's URL pattern
-        from sqlalchemy import or_
-        
-        # Build query for offers from this source
-        source_query = db.query(JobOffer).filter(
-            JobOffer.last_seen_at < refresh_start_time,
+        current_jobs = await asyncio.wait_for(scraper.async_scrape(), timeout)
+        result['scrape_seconds'] = round(timeout - (deadline - time.monotonic()), 3)
+    except PageNotModified:
+        await asyncio.to_thread(_run_db_step, mark_source_unchanged, scraper, refresh_start_time)
+        result['unchanged'] = True
+        result['outcome'] = 'not_modified'
+        return result
+    except asyncio.TimeoutError:
+        current_jobs = None
+    
+    # Fetches cut short by the deadline return nothing; that is a timeout, not an empty listing
+    if current_jobs is None or time.monotonic() >= deadline:
+        # Work that could not be cancelled (a thread) may still hold the instance
+        discard_scraper(source_id, scraper)
+        result['timed_out'] = True
+        result['outcome'] = 'timed_out'
+        result['error'] = f"Timed out after {timeout:g}s"
+        return result
+    
+    if not current_jobs:
+        # No jobs found - don't mark existing as inactive (might be temporary)
+        result['outcome'] = 'empty'
+        return result
+    
+    result['items'] = len(current_jobs)
+    
+    if dry_run:
+        # Apply in a transaction that is rolled back, recording what would change
+        changes: Dict[str, List[str]] = {}
+        started = time.monotonic()
+        result.update(await asyncio.to_thread(
+            _run_dry_db_step, partial(apply_scraped_jobs, changes=changes), scraper, current_jobs, refresh_start_time,
+        ))
+        result['diff_seconds'] = round(time.monotonic() - started, 3)
+        result['changes'] = {key: changes.get(key, []) for key in ('new', 'updated', 'inactivated')}
+        result['outcome'] = 'dry_run'
+        return result
+    
+    # Hardcoded scrapers don't isolate a listing region; hash what they extracted
+    if scraper.listing_fingerprint is None:
+        scraper.listing_fingerprint = scraper.fingerprint_jobs(current_jobs)
+    
+    if (fingerprints or {}).get(source_id) == scraper.listing_fingerprint:
+        await asyncio.to_thread(_run_db_step, mark_source_unchanged, scraper, refresh_start_time)
+        result['fingerprint'] = 'hit'
+        result['outcome'] = 'fingerprint_hit'
+        return result
+    
+    result.update(await asyncio.to_thread(_run_db_step, apply_scraped_jobs, scraper, current_jobs, refresh_start_time))
+    result['fingerprint'] = 'miss'
+    result['outcome'] = 'applied'
+    return result
+
+
+def _run_db_step(func, *args):
+    """
+    Run func(*args, db) with a fresh session.
+    
+    Called on worker threads; on SQLite the steps take turns writing.
+    """
+    db = SessionLocal()
+    try:
+        with _sqlite_write_lock if is_sqlite else nullcontext():
+            return func(*args, db)
+    finally:
+        db.close()
+
+
+def _run_dry_db_step(func, *args):
+    """
+    Run func(*args, db) in a transaction that is always rolled back.
+    
+    The session joins an outer transaction in "rollback_only" mode, so
+    commits inside func only flush and nothing is ever persisted.
+    """
+    with _sqlite_write_lock if is_sqlite else nullcontext():
+        with get_engine().connect() as connection:
+            transaction = connection.begin()
+            db = Session(bind=connection, join_transaction_mode="rollback_only")
+            try:
+                return func(*args, db)
+            finally:
+                db.close()
+                transaction.rollback()
+
+
+def mark_source_unchanged(scraper: BaseScraper, refresh_start_time: datetime, db: Session):
+    """
+    Record that a source's listing has not changed since the last refresh.
+    
+    Bumps last_seen_at of the source's active offers in one UPDATE, so they
+    are not treated as stale, and refreshes the stored validators.
+    
+    Args:
+        scraper: Scraper instance that fetched the listing
+        refresh_start_time: When the refresh started
+        db: Database session
+    """
+    try:
+        db.query(JobOffer).filter(
+            JobOffer.source_id == scraper.source_id,
             JobOffer.status == 'active'
-        )
-        
-        # Filter by source_id if set, or by URL pattern if source_id is null
-        if source_id:
-            source_query = source_query.filter(
-                or_(
-                    JobOffer.source_id == source_id,
-                    JobOffer.source_id.is_(None)  # Also check offers without source_id
-                )
-            )
-        
-        stale_offers = source_query.all()
-        
-        inactivated_count = 0
-        scraper = get_scraper(source_id)  # Get scraper once for URL pattern matching
+        ).update({JobOffer.last_seen_at: refresh_start_time}, synchronize_session=False)
+        save_validators(db, scraper.fetched_validators)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def apply_scraped_jobs(scraper: BaseScraper, current_jobs: List[Dict], refresh_start_time: datetime,
+                       db: Session, changes: Optional[Dict[str, List[str]]] = None) -> Dict:
+    """
+    Write the scraped offers of one source to the database.
+    
+    The offers are diffed in memory against a snapshot of the source's
+    stored offers (app/services/changeset.py), so the number of queries
+    does not grow with the number of offers. Offers, validators and the
+    listing fingerprint are committed together.
+    
+    Args:
+        scraper: Scraper instance that produced the offers
+        current_jobs: Offers returned by scraper.scrape()
+        refresh_start_time: When the refresh started (for marking stale offers)
+        db: Database session
+        changes: Optional collector for the source_urls of new, updated,
+                 reactivated and inactivated offers (see apply_changeset)
         
-        for offer in stale_offers:
-            # Only mark inactive if:
-            # 1. Not in current scrape
-            # 2. Belongs to this source (by source_id or URL pattern)
-            if offer.source_url not in current_urls:
-                # Check if this offer belongs to this source
-                belongs_to_source = False
-                
-                if offer.source_id == source_id:
-                    belongs_to_source = True
-                elif offer.source_id is None:
-                    # Try to match by URL pattern
-                    if scraper.base_url in offer.source_url:
-                        belongs_to_source = True
-                
-                if belongs_to_source:
-                    offer.status = 'inactive'
-                    inactivated_count += 1
+    Returns:
+        Dictionary with results: {'new': int, 'updated': int, 'inactivated': int}
+    """
+    source_id = scraper.source_id
+    result = {
+        'new': 0,
+        'updated': 0,
+        'inactivated': 0,
+    }
+    
+    try:
+        # Diff against a snapshot of the stored offers, then write in bulk
+        changeset = build_changeset(scraper, current_jobs, refresh_start_time, db)
+        result.update(apply_changeset(changeset, db, changes))
         
-        result['inactivated'] = inactivated_count
+        # Remember validators and the listing fingerprint only once the offers are safely stored
+        save_validators(db, scraper.fetched_validators)
+        if scraper.listing_fingerprint:
+            save_fingerprint(db, source_id, scraper.listing_fingerprint)
         db.commit()
         
     except Exception as e:
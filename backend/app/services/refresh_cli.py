@@ -4,10 +4,50 @@ CLI entry point for running refresh from cron jobs.
 This script is designed to be called by Koyeb cron jobs or other
 scheduled task systems. It runs the refresh process and exits with
 appropriate exit codes for monitoring.
+
+Usage:
+    python -m app.services.refresh_cli [--resume] [--time-budget SECONDS] [--due-only]
+                                       [--sources a,b] [--dry-run] [--max-memory-mb MB]
+    python -m app.services.refresh_cli --daemon | --drain [--poll-interval SECONDS]
+                                       [--max-memory-mb MB]
+
+With --resume, the latest run that was interrupted or ran out of time is
+continued with only its unfinished sources (a new run is started if there is
+none). With --time-budget, the run stops before the budget is used up and
+leaves the remaining sources pending for the next --resume. With --due-only,
+a new run includes only the sources whose adaptive refresh interval has
+elapsed, so the cron job can run often without re-scraping static sources.
+With --sources, a new run includes only the listed sources.
+
+With --dry-run, the selected sources are scraped and the would-be new,
+updated and inactivated offers are printed as JSON with per-source timings;
+nothing is written to the database.
+
+With --max-memory-mb, the worker stops starting sources once it and its
+browser processes exceed the cap, then replaces itself with a fresh process
+(exec) that resumes the run with the remaining time budget.
+
+With --daemon, the CLI consumes the refresh job queue (refresh_jobs, filled by
+POST /api/admin/refresh) forever; --drain does the same until the queue is
+empty. Workers claim jobs with a lease, so only one job runs at a time and a
+job whose worker died is taken over once the lease expires.
 """
+import argparse
+import json
+import os
 import sys
 import logging
-from app.services.refresh import refresh_all_sources
+import threading
+import time
+from datetime import datetime
+
+from app.database import SessionLocal
+from app.scrapers.registry import list_scrapers
+from app.services.refresh import RefreshResult, refresh_all_sources
+from app.services.refresh_queue import (
+    REFRESH_JOB_LEASE_SECONDS, claim_job, finish_job, renew_job_lease, set_job_run, worker_id,
+)
+from app.services.source_schedule import due_sources
 
 # Configure logging for CLI usage
 logging.basicConfig(
@@ -17,34 +57,221 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Refresh job offers from all configured sources.")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue the latest unfinished run instead of starting a new one",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=float(os.getenv("REFRESH_TIME_BUDGET", "0")) or None,
+        metavar="SECONDS",
+        help="stop cleanly after this many seconds, leaving unfinished sources for --resume "
+             "(default: REFRESH_TIME_BUDGET or no limit)",
+    )
+    parser.add_argument(
+        "--due-only",
+        action="store_true",
+        help="refresh only sources whose adaptive refresh interval has elapsed",
+    )
+    parser.add_argument(
+        "--sources",
+        type=lambda value: [name.strip() for name in value.split(",") if name.strip()],
+        metavar="A,B",
+        help="refresh only these sources (comma-separated)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="scrape and print the changes as JSON without writing to the database",
+    )
+    parser.add_argument(
+        "--max-memory-mb",
+        type=float,
+        default=float(os.getenv("REFRESH_MAX_MEMORY_MB", "0")) or None,
+        metavar="MB",
+        help="recycle the worker process once it and its browser use more memory "
+             "(default: REFRESH_MAX_MEMORY_MB or no limit)",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--daemon",
+        action="store_true",
+        help="consume the refresh job queue forever",
+    )
+    mode.add_argument(
+        "--drain",
+        action="store_true",
+        help="consume the refresh job queue until it is empty, then exit",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        metavar="SECONDS",
+        help="how often the daemon checks for queued jobs (default: 5)",
+    )
+    return parser.parse_args(argv)
+
+
+def recycle_process(args: argparse.Namespace, started: float):
+    """Replace this process with a fresh worker that resumes the current run."""
+    if args.daemon or args.drain:
+        # Queue workers keep their pid, and with it their job lease
+        argv = [sys.executable, "-m", "app.services.refresh_cli", "--daemon" if args.daemon else "--drain",
+                "--poll-interval", str(args.poll_interval)]
+    else:
+        argv = [sys.executable, "-m", "app.services.refresh_cli", "--resume"]
+        if args.time_budget:
+            argv += ["--time-budget", str(max(1.0, args.time_budget - (time.monotonic() - started)))]
+    if args.max_memory_mb:
+        argv += ["--max-memory-mb", str(args.max_memory_mb)]
+    
+    logger.info("Memory cap reached - restarting the worker to resume the run")
+    logging.shutdown()
+    os.execv(sys.executable, argv)
+
+
+def log_result(result: RefreshResult):
+    """Log the summary and errors of a refresh."""
+    logger.info(
+        f"Refresh completed. "
+        f"Run: {result.run_id}, "
+        f"Status: {result.status}, "
+        f"Sources: {result.sources_processed} processed, {result.sources_failed} failed, "
+        f"{result.sources_pending} pending ({result.sources_skipped} leased by another run), "
+        f"New: {result.new_offers}, Updated: {result.updated_offers}, "
+        f"Inactivated: {result.inactivated_offers}"
+    )
+    
+    for error in result.errors:
+        logger.warning(
+            f"Refresh error for {error.get('source', 'unknown')}: "
+            f"{error.get('message', 'Unknown error')}"
+        )
+
+
+def _run_db(func, *args):
+    """Run func(*args, db) with a short-lived session."""
+    db = SessionLocal()
+    try:
+        return func(*args, db)
+    finally:
+        db.close()
+
+
+def run_queue_worker(args: argparse.Namespace, started: float):
+    """Consume the refresh job queue (--daemon / --drain)."""
+    worker = worker_id()
+    logger.info(f"Refresh queue worker {worker} started")
+    
+    while True:
+        job = _run_db(claim_job, worker)
+        if job is None:
+            if args.drain:
+                logger.info("Refresh queue is empty - exiting")
+                return
+            time.sleep(args.poll_interval)
+            continue
+        
+        logger.info(f"Processing {'dry-run ' if job['dry_run'] else ''}refresh job {job['id']} "
+                    f"(sources: {job['sources'] or 'all'})"
+                    + (f", taking over run {job['run_id']}" if job['resumed'] and job['run_id'] else ""))
+        
+        # Keep the job lease alive while the refresh runs; once it is lost,
+        # another worker may take the job over, so stop at the next source
+        finished = threading.Event()
+        lease_lost = threading.Event()
+        
+        def heartbeat():
+            while not finished.wait(REFRESH_JOB_LEASE_SECONDS / 3):
+                if not _run_db(renew_job_lease, job['id'], worker):
+                    logger.warning(f"Lost the lease on refresh job {job['id']} - stopping after the sources in flight")
+                    lease_lost.set()
+                    return
+        
+        def record_run(run_id):
+            _run_db(set_job_run, job['id'], worker, run_id)
+        
+        threading.Thread(target=heartbeat, name="refresh-job-heartbeat", daemon=True).start()
+        try:
+            # A job taken over continues the run its previous worker started
+            result = refresh_all_sources(run_id=job['run_id'], sources=job['sources'],
+                                         max_memory_mb=args.max_memory_mb, dry_run=job['dry_run'],
+                                         on_run_started=record_run, stop=lease_lost)
+        except Exception as e:
+            logger.error(f"Refresh job {job['id']} failed: {str(e)}", exc_info=True)
+            if not lease_lost.is_set():
+                _run_db(finish_job, job['id'], worker, 'failed', None, str(e), None)
+            continue
+        finally:
+            finished.set()
+        
+        log_result(result)
+        if lease_lost.is_set():
+            # The job belongs to whoever takes it over now
+            continue
+        if result.status == 'incomplete' and result.stop_reason == 'memory':
+            # The job stays leased to this pid and is resumed by the new process
+            recycle_process(args, started)
+        _run_db(finish_job, job['id'], worker, 'failed' if result.status == 'failed' else 'done', result.run_id, None,
+                result.to_dict() if result.dry_run else None)
+
+
+def main(argv=None):
     """Main entry point for refresh CLI."""
+    args = parse_args(argv)
+    started = time.monotonic()
+    
+    if args.daemon or args.drain:
+        try:
+            run_queue_worker(args, started)
+            sys.exit(0)
+        except Exception as e:
+            logger.error(f"Fatal error in refresh queue worker: {str(e)}", exc_info=True)
+            sys.exit(1)
+    
+    if args.dry_run:
+        try:
+            result = refresh_all_sources(sources=args.sources, dry_run=True)
+        except Exception as e:
+            logger.error(f"Fatal error during dry run: {str(e)}", exc_info=True)
+            sys.exit(1)
+        print(json.dumps(result.to_dict(), indent=2, default=str))
+        sys.exit(1 if result.status == 'failed' else 0)
+    
     logger.info("Starting scheduled job offer refresh (CLI)...")
     
     try:
-        result = refresh_all_sources()
-        
-        # Log summary
-        logger.info(
-            f"Refresh completed. "
-            f"Status: {result.status}, "
-            f"Sources: {result.sources_processed} processed, {result.sources_failed} failed, "
-            f"New: {result.new_offers}, Updated: {result.updated_offers}, "
-            f"Inactivated: {result.inactivated_offers}"
-        )
+        sources = args.sources
+        if args.due_only:
+            db = SessionLocal()
+            try:
+                sources = due_sources(sources or list_scrapers(), datetime.utcnow(), db)
+            finally:
+                db.close()
+            logger.info(f"{len(sources)} sources due for refresh")
+            if not sources and not args.resume:
+                sys.exit(0)
         
-        # Log errors if any
-        if result.errors:
-            for error in result.errors:
-                logger.warning(
-                    f"Refresh error for {error.get('source', 'unknown')}: "
-                    f"{error.get('message', 'Unknown error')}"
-                )
+        result = refresh_all_sources(resume=args.resume, time_budget=args.time_budget, sources=sources,
+                                     max_memory_mb=args.max_memory_mb)
+        
+        log_result(result)
         
         # Exit with appropriate code
         if result.status == 'failed':
             logger.error("Refresh failed - exiting with error code")
             sys.exit(1)
+        elif result.status == 'incomplete' and result.stop_reason == 'memory':
+            recycle_process(args, started)
+        elif result.status == 'incomplete':
+            logger.warning("Time budget exhausted - run again with --resume to finish the remaining sources")
+            sys.exit(0)
         elif result.status == 'partial':
             logger.warning("Refresh partially succeeded - some sources failed")
             sys.exit(0)  # Partial success is still success
@@ -0,0 +1,303 @@
+"""
+DB-backed refresh job queue and per-source leases.
+
+Refresh requests (API, cron retries, the admin UI) are written to
+refresh_jobs instead of starting refreshes directly. Requests arriving while
+a job is still queued are coalesced into it. refresh_cli workers claim jobs
+with a compare-and-set UPDATE and keep a lease on them, so only one refresh
+job runs at a time and a job whose worker died is taken over once its lease
+expires.
+
+Independently, the refresh engine takes a lease on each source before
+refreshing it (source_leases), so at most one refresh per source is ever in
+flight, whoever started it.
+
+Functions take the database session as their last argument and commit
+their own changes.
+"""
+import json
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from app.models import RefreshJob, SourceLease
+
+# How long a worker owns a job without renewing its lease (seconds)
+REFRESH_JOB_LEASE_SECONDS = float(os.getenv("REFRESH_JOB_LEASE_SECONDS", "300"))
+
+# How long a source lease lasts without renewal (seconds); renewed every third of it while the source runs
+SOURCE_LEASE_SECONDS = float(os.getenv("SOURCE_LEASE_SECONDS", "1800"))
+
+
+def worker_id() -> str:
+    """Identifier of this worker process (stable across exec-based recycling)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _merge_sources(first: Optional[str], second: Optional[List[str]]) -> Optional[str]:
+    """Union of two source selections; None (all sources) absorbs everything."""
+    if first is None or second is None:
+        return None
+    return json.dumps(sorted(set(json.loads(first)) | set(second)))
+
+
+def enqueue_refresh(sources: Optional[List[str]], dry_run: bool, db: Session) -> Tuple[int, bool]:
+    """
+    Request a refresh, coalescing it into an already queued job of the same kind.
+
+    Args:
+        sources: Sources to refresh (None: all sources)
+        dry_run: Compute the changes without writing them
+        db: Database session
+
+    Returns:
+        Tuple of (job id, whether the request was coalesced into an existing job)
+    """
+    job = db.query(RefreshJob).filter(
+        RefreshJob.status == 'queued',
+        _same_kind(dry_run)
+    ).order_by(RefreshJob.id).first()
+    if job is not None:
+        job.sources = _merge_sources(job.sources, sources)
+        job.request_count += 1
+        db.commit()
+        return job.id, True
+
+    job = RefreshJob(
+        status='queued',
+        sources=json.dumps(sorted(set(sources))) if sources is not None else None,
+        dry_run=dry_run,
+        requested_at=datetime.utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    return job.id, False
+
+
+def claim_job(worker: str, db: Session) -> Optional[Dict]:
+    """
+    Claim the next refresh job for a worker.
+
+    A running job whose lease expired (or that this worker already holds,
+    e.g. after recycling) is taken over first. Otherwise the oldest queued
+    job is claimed, unless another worker holds a live lease on a running
+    job. Other queued jobs are coalesced into the claimed one.
+
+    Args:
+        worker: Worker identifier (see worker_id())
+        db: Database session
+
+    Returns:
+        {'id': int, 'sources': list or None, 'dry_run': bool, 'resumed': bool,
+        'run_id': int or None}, or None if there is nothing to do. A job
+        taken over is 'resumed', with the refresh run its previous worker
+        started (if it recorded one, see set_job_run()).
+    """
+    now = datetime.utcnow()
+    lease_expires_at = now + timedelta(seconds=REFRESH_JOB_LEASE_SECONDS)
+
+    abandoned = db.query(RefreshJob).filter(
+        RefreshJob.status == 'running',
+        (RefreshJob.leased_by == worker) | (RefreshJob.lease_expires_at < now)
+    ).order_by(RefreshJob.id).first()
+
+    if abandoned is not None:
+        claimed = db.query(RefreshJob).filter(
+            RefreshJob.id == abandoned.id,
+            RefreshJob.status == 'running',
+            (RefreshJob.leased_by == worker) | (RefreshJob.lease_expires_at < now)
+        ).update({
+            RefreshJob.leased_by: worker,
+            RefreshJob.lease_expires_at: lease_expires_at,
+        }, synchronize_session=False)
+        db.commit()
+        if not claimed:
+            return None
+        db.refresh(abandoned)
+        return {'id': abandoned.id, 'sources': _load_sources(abandoned),
+                'dry_run': bool(abandoned.dry_run), 'resumed': not abandoned.dry_run, 'run_id': abandoned.run_id}
+
+    job = db.query(RefreshJob).filter(RefreshJob.status == 'queued').order_by(RefreshJob.id).first()
+    if job is None:
+        return None
+
+    running = aliased(RefreshJob)
+    claimed = db.query(RefreshJob).filter(
+        RefreshJob.id == job.id,
+        RefreshJob.status == 'queued',
+        ~exists().where(running.status == 'running', running.lease_expires_at >= now)
+    ).update({
+        RefreshJob.status: 'running',
+        RefreshJob.leased_by: worker,
+        RefreshJob.lease_expires_at: lease_expires_at,
+        RefreshJob.started_at: now,
+    }, synchronize_session=False)
+    if not claimed:
+        db.rollback()
+        return None
+
+    # Fold requests of the same kind queued in the meantime into the claimed job
+    db.refresh(job)
+    for other in db.query(RefreshJob).filter(
+        RefreshJob.status == 'queued',
+        RefreshJob.id != job.id,
+        _same_kind(bool(job.dry_run))
+    ):
+        job.sources = _merge_sources(job.sources, _load_sources(other))
+        job.request_count += other.request_count
+        other.status = 'coalesced'
+        other.finished_at = now
+    db.commit()
+    return {'id': job.id, 'sources': _load_sources(job), 'dry_run': bool(job.dry_run), 'resumed': False,
+            'run_id': None}
+
+
+def _load_sources(job: RefreshJob) -> Optional[List[str]]:
+    return json.loads(job.sources) if job.sources is not None else None
+
+
+def _same_kind(dry_run: bool):
+    """Filter on jobs that may be coalesced with a (dry) run request."""
+    if dry_run:
+        return RefreshJob.dry_run.is_(True)
+    return (RefreshJob.dry_run.is_(False)) | (RefreshJob.dry_run.is_(None))
+
+
+def renew_job_lease(job_id: int, worker: str, db: Session) -> bool:
+    """
+    Extend a worker's lease on a running job.
+
+    Returns:
+        False if the worker no longer holds the job
+    """
+    renewed = db.query(RefreshJob).filter(
+        RefreshJob.id == job_id,
+        RefreshJob.status == 'running',
+        RefreshJob.leased_by == worker
+    ).update({
+        RefreshJob.lease_expires_at: datetime.utcnow() + timedelta(seconds=REFRESH_JOB_LEASE_SECONDS),
+    }, synchronize_session=False)
+    db.commit()
+    return bool(renewed)
+
+
+def set_job_run(job_id: int, worker: str, run_id: int, db: Session):
+    """
+    Record the refresh run a worker started for a job, so a worker taking
+    the job over resumes that run.
+
+    Args:
+        job_id: Job id
+        worker: Worker holding the job
+        run_id: refresh_runs id
+        db: Database session
+    """
+    db.query(RefreshJob).filter(
+        RefreshJob.id == job_id,
+        RefreshJob.leased_by == worker
+    ).update({RefreshJob.run_id: run_id}, synchronize_session=False)
+    db.commit()
+
+
+def finish_job(job_id: int, worker: str, status: str, run_id: Optional[int], error: Optional[str],
+               result: Optional[Dict], db: Session):
+    """
+    Mark a job finished and release its lease.
+
+    Args:
+        job_id: Job id
+        worker: Worker holding the job
+        status: 'done' or 'failed'
+        run_id: refresh_runs id of the job's run, if one was started
+        error: Error message for failed jobs
+        result: Result to keep with the job (dry runs)
+        db: Database session
+    """
+    db.query(RefreshJob).filter(
+        RefreshJob.id == job_id,
+        RefreshJob.leased_by == worker
+    ).update({
+        RefreshJob.status: status,
+        RefreshJob.finished_at: datetime.utcnow(),
+        RefreshJob.lease_expires_at: None,
+        RefreshJob.run_id: run_id,
+        RefreshJob.error: error,
+        RefreshJob.result: json.dumps(result) if result is not None else None,
+    }, synchronize_session=False)
+    db.commit()
+
+
+def get_job(job_id: int, db: Session) -> Optional[Dict]:
+    """
+    Status of a refresh job.
+
+    Returns:
+        Dictionary with the job state, its run id and (for dry runs) its
+        result, or None if the job does not exist
+    """
+    job = db.query(RefreshJob).filter(RefreshJob.id == job_id).first()
+    if job is None:
+        return None
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'sources': _load_sources(job),
+        'dry_run': bool(job.dry_run),
+        'request_count': job.request_count,
+        'requested_at': job.requested_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'run_id': job.run_id,
+        'error': job.error,
+        'result': json.loads(job.result) if job.result is not None else None,
+    }
+
+
+def acquire_source_lease(source_id: str, holder: str, db: Session) -> bool:
+    """
+    Take the lease on a source unless someone else holds a live one.
+
+    Args:
+        source_id: Source identifier
+        holder: Lease holder (one per refresh run)
+        db: Database session
+
+    Returns:
+        True if the caller now holds the lease
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=SOURCE_LEASE_SECONDS)
+
+    taken = db.query(SourceLease).filter(
+        SourceLease.source_id == source_id,
+        (SourceLease.expires_at < now) | (SourceLease.holder == holder)
+    ).update({
+        SourceLease.holder: holder,
+        SourceLease.expires_at: expires_at,
+    }, synchronize_session=False)
+    if taken:
+        db.commit()
+        return True
+
+    # No lease row yet: the primary key makes concurrent inserts race safely
+    try:
+        db.add(SourceLease(source_id=source_id, holder=holder, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+def release_source_lease(source_id: str, holder: str, db: Session):
+    """Release a source lease held by holder."""
+    db.query(SourceLease).filter(
+        SourceLease.source_id == source_id,
+        SourceLease.holder == holder
+    ).delete(synchronize_session=False)
+    db.commit()
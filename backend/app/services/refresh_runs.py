@@ -0,0 +1,246 @@
+"""
+Persisted refresh runs with per-source checkpoints.
+
+Every refresh creates a RefreshRun with one RefreshSourceRun per source.
+Sources move from 'pending' to 'running' to 'done' or 'failed' as they are
+processed, so a run that was killed or ran out of time can be resumed with
+only its unfinished sources.
+
+All functions take the database session as their last argument and commit
+their own changes.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models import RefreshRun, RefreshSourceRun
+
+# Source states that still need to be (re)processed when a run is resumed
+UNFINISHED_STATES = ('pending', 'running')
+
+
+def start_run(source_ids: List[str], db: Session) -> Tuple[int, datetime]:
+    """
+    Create a new run with all sources pending.
+    
+    Args:
+        source_ids: Sources to refresh
+        db: Database session
+    
+    Returns:
+        Tuple of (run id, run start time)
+    """
+    run = RefreshRun(status='running', started_at=datetime.utcnow())
+    db.add(run)
+    db.flush()
+    db.add_all(RefreshSourceRun(run_id=run.id, source_id=source_id, state='pending')
+               for source_id in source_ids)
+    db.commit()
+    return run.id, run.started_at
+
+
+def find_resumable_run(db: Session) -> Optional[Tuple[int, datetime, List[str]]]:
+    """
+    Find the latest run that did not finish and mark it running again.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        Tuple of (run id, run start time, unfinished source ids),
+        or None if the latest run finished
+    """
+    run = db.query(RefreshRun).order_by(RefreshRun.id.desc()).first()
+    if run is None or run.status not in ('running', 'incomplete'):
+        return None
+    return _resume(run, db)
+
+
+def resume_run(run_id: int, db: Session) -> Optional[Tuple[int, datetime, List[str]]]:
+    """
+    Continue a specific run (e.g. the run of a refresh job taken over from a dead worker).
+    
+    Args:
+        run_id: Run id
+        db: Database session
+    
+    Returns:
+        Tuple of (run id, run start time, unfinished source ids; empty if the
+        run already finished), or None if the run does not exist
+    """
+    run = db.get(RefreshRun, run_id)
+    if run is None:
+        return None
+    return _resume(run, db)
+
+
+def _resume(run: RefreshRun, db: Session) -> Tuple[int, datetime, List[str]]:
+    """Mark a run running again and list its unfinished sources."""
+    source_ids = [
+        row.source_id
+        for row in db.query(RefreshSourceRun).filter(
+            RefreshSourceRun.run_id == run.id,
+            RefreshSourceRun.state.in_(UNFINISHED_STATES)
+        ).order_by(RefreshSourceRun.id)
+    ]
+    run.status = 'running'
+    db.commit()
+    return run.id, run.started_at, source_ids
+
+
+def mark_source_running(run_id: int, source_id: str, db: Session):
+    """Checkpoint that a source has started."""
+    db.query(RefreshSourceRun).filter(
+        RefreshSourceRun.run_id == run_id,
+        RefreshSourceRun.source_id == source_id
+    ).update({
+        RefreshSourceRun.state: 'running',
+        RefreshSourceRun.started_at: datetime.utcnow(),
+        RefreshSourceRun.finished_at: None,
+        RefreshSourceRun.error: None,
+    }, synchronize_session=False)
+    db.commit()
+
+
+def mark_source_finished(run_id: int, source_id: str, source_result: Dict, db: Session):
+    """
+    Checkpoint the outcome of a source.
+    
+    Args:
+        run_id: Run id
+        source_id: Source identifier
+        source_result: Result dictionary of refresh_source()
+        db: Database session
+    """
+    db.query(RefreshSourceRun).filter(
+        RefreshSourceRun.run_id == run_id,
+        RefreshSourceRun.source_id == source_id
+    ).update({
+        RefreshSourceRun.state: 'failed' if source_result.get('error') else 'done',
+        RefreshSourceRun.finished_at: datetime.utcnow(),
+        RefreshSourceRun.error: source_result.get('error'),
+        RefreshSourceRun.new_offers: source_result['new'],
+        RefreshSourceRun.updated_offers: source_result['updated'],
+        RefreshSourceRun.inactivated_offers: source_result['inactivated'],
+        RefreshSourceRun.outcome: source_result.get('outcome'),
+        RefreshSourceRun.duration_seconds: source_result.get('duration'),
+        RefreshSourceRun.bytes_fetched: source_result.get('bytes_fetched'),
+        RefreshSourceRun.items_scraped: source_result.get('items'),
+    }, synchronize_session=False)
+    db.commit()
+
+
+def reset_sources(run_id: int, source_ids: List[str], db: Session):
+    """Put sources that were interrupted back to pending."""
+    if not source_ids:
+        return
+    db.query(RefreshSourceRun).filter(
+        RefreshSourceRun.run_id == run_id,
+        RefreshSourceRun.source_id.in_(source_ids)
+    ).update({
+        RefreshSourceRun.state: 'pending',
+        RefreshSourceRun.started_at: None,
+    }, synchronize_session=False)
+    db.commit()
+
+
+def finish_run(run_id: int, db: Session) -> str:
+    """
+    Set the final status and counters of a run from all its sources.
+    
+    Counters cover every attempt of the run, including resumed ones.
+    
+    Args:
+        run_id: Run id
+        db: Database session
+    
+    Returns:
+        Run status: 'incomplete' if any source is unfinished, otherwise
+        'success', 'partial' or 'failed'
+    """
+    sources = db.query(RefreshSourceRun).filter(RefreshSourceRun.run_id == run_id).all()
+    finished = [source for source in sources if source.state not in UNFINISHED_STATES]
+    failed = sum(1 for source in finished if source.state == 'failed')
+    
+    if len(finished) < len(sources):
+        status = 'incomplete'
+    elif failed == 0:
+        status = 'success'
+    elif failed < len(sources):
+        status = 'partial'
+    else:
+        status = 'failed'
+    
+    db.query(RefreshRun).filter(RefreshRun.id == run_id).update({
+        RefreshRun.status: status,
+        RefreshRun.finished_at: datetime.utcnow(),
+        RefreshRun.sources_processed: len(finished),
+        RefreshRun.sources_failed: failed,
+        RefreshRun.sources_pending: len(sources) - len(finished),
+        RefreshRun.sources_timed_out: sum(1 for source in finished if source.outcome == 'timed_out'),
+        RefreshRun.new_offers: sum(source.new_offers for source in finished),
+        RefreshRun.updated_offers: sum(source.updated_offers for source in finished),
+        RefreshRun.inactivated_offers: sum(source.inactivated_offers for source in finished),
+        RefreshRun.fingerprint_hits: sum(1 for source in finished if source.outcome == 'fingerprint_hit'),
+        RefreshRun.fingerprint_misses: sum(1 for source in finished if source.outcome == 'applied'),
+        RefreshRun.bytes_fetched: sum(source.bytes_fetched or 0 for source in finished),
+    }, synchronize_session=False)
+    db.commit()
+    return status
+
+
+def get_run_report(db: Session, run_id: Optional[int] = None) -> Optional[Dict]:
+    """
+    Build the status report of a run.
+    
+    Args:
+        db: Database session
+        run_id: Run id (default: the latest run)
+    
+    Returns:
+        Dictionary with the run counters and per-source timings (slowest
+        first), or None if the run does not exist
+    """
+    query = db.query(RefreshRun)
+    run = query.filter(RefreshRun.id == run_id).first() if run_id is not None else query.order_by(RefreshRun.id.desc()).first()
+    if run is None:
+        return None
+    
+    sources = db.query(RefreshSourceRun).filter(RefreshSourceRun.run_id == run.id).all()
+    sources.sort(key=lambda source: source.duration_seconds or 0, reverse=True)
+    
+    return {
+        'run_id': run.id,
+        'status': run.status,
+        'started_at': run.started_at.isoformat(),
+        'finished_at': run.finished_at.isoformat() if run.finished_at else None,
+        'duration_seconds': (run.finished_at - run.started_at).total_seconds() if run.finished_at else None,
+        'sources_processed': run.sources_processed,
+        'sources_failed': run.sources_failed,
+        'sources_pending': run.sources_pending,
+        'sources_timed_out': run.sources_timed_out,
+        'new_offers': run.new_offers,
+        'updated_offers': run.updated_offers,
+        'inactivated_offers': run.inactivated_offers,
+        'fingerprint_hits': run.fingerprint_hits,
+        'fingerprint_misses': run.fingerprint_misses,
+        'bytes_fetched': run.bytes_fetched,
+        'sources': [
+            {
+                'source_id': source.source_id,
+                'state': source.state,
+                'outcome': source.outcome,
+                'started_at': source.started_at.isoformat() if source.started_at else None,
+                'finished_at': source.finished_at.isoformat() if source.finished_at else None,
+                'duration_seconds': source.duration_seconds,
+                'bytes_fetched': source.bytes_fetched,
+                'items_scraped': source.items_scraped,
+                'new_offers': source.new_offers,
+                'updated_offers': source.updated_offers,
+                'inactivated_offers': source.inactivated_offers,
+                'error': source.error,
+            }
+            for source in sources
+        ],
+    }
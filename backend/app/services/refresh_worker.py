@@ -0,0 +1,119 @@
+"""
+Out-of-process refresh workers.
+
+Refreshes run in a separate `refresh_cli` process, so parsing and the
+Playwright browser never compete with API requests for the GIL or memory.
+The API only starts a worker and reads results from refresh_runs.
+"""
+import logging
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Directory containing the `app` package (working directory of worker processes)
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+_worker: Optional[subprocess.Popen] = None
+_worker_lock = threading.Lock()
+# A worker requested while one was running starts when it exits (with these arguments)
+_follow_up_pending = False
+_follow_up_args: Optional[List[str]] = None
+
+
+def start_refresh_worker(args: Optional[List[str]] = None) -> Optional[int]:
+    """
+    Start a refresh worker process unless one started by this process is still running.
+    
+    A running --drain worker may already have found the queue empty and be
+    about to exit without seeing the job just queued, so in that case one
+    more worker is started as soon as it exits. Requests arriving meanwhile
+    share that follow-up worker; the job lease keeps workers from running
+    a job twice.
+    
+    Args:
+        args: Extra refresh_cli arguments
+    
+    Returns:
+        PID of the new worker, or None if a worker is already running
+        (a follow-up worker is then started once it exits)
+    """
+    global _follow_up_pending, _follow_up_args
+    with _worker_lock:
+        if _worker is not None and _worker.poll() is None:
+            if not _follow_up_pending:
+                _follow_up_pending = True
+                _follow_up_args = args
+                threading.Thread(target=_start_follow_up, args=(_worker,), name="refresh-worker-follow-up",
+                                 daemon=True).start()
+            return None
+        return _spawn_worker(args)
+
+
+def _start_follow_up(previous: subprocess.Popen):
+    """Wait for a worker to exit, then start the follow-up worker requested meanwhile."""
+    global _follow_up_pending
+    previous.wait()
+    with _worker_lock:
+        if _worker is not previous and _worker.poll() is None:
+            # A newer worker started meanwhile; it may be exiting too, so follow it instead
+            threading.Thread(target=_start_follow_up, args=(_worker,), name="refresh-worker-follow-up",
+                             daemon=True).start()
+            return
+        _follow_up_pending = False
+        _spawn_worker(_follow_up_args)
+
+
+def _spawn_worker(args: Optional[List[str]]) -> int:
+    """Start a refresh_cli process (call with _worker_lock held)."""
+    global _worker
+    command = [sys.executable, "-m", "app.services.refresh_cli", *(args or [])]
+    _worker = subprocess.Popen(command, cwd=BACKEND_DIR, start_new_session=True)
+    logger.info(f"Started refresh worker (pid {_worker.pid}): {' '.join(command[1:])}")
+    return _worker.pid
+
+
+def process_tree_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """
+    Resident memory of a process and all its descendants (e.g. Chromium), in MB.
+    
+    Reads /proc, so it is only available on Linux.
+    
+    Args:
+        pid: Root process (default: the current process)
+    
+    Returns:
+        Total RSS in MB, or None if /proc is not available
+    """
+    root = pid or os.getpid()
+    if not os.path.exists(f"/proc/{root}/statm"):
+        return None
+    
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields after it are fixed
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+    
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+        stack.extend(children.get(current, []))
+    return total / (1024 * 1024)
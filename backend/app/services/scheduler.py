@@ -2,23 +2,32 @@
 Automatic job offer refresh scheduler.
 
 This module handles scheduled automatic refreshes of job offers.
-Refreshes run daily at 2 AM Polish time (Europe/Warsaw timezone).
+Every SCHEDULER_TICK_MINUTES the scheduler refreshes the sources that are
+due according to their adaptive intervals (see app/services/source_schedule.py):
+busy boards every few hours, static pages every few days.
 """
 import logging
+import os
 from datetime import datetime
 from typing import Optional
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 import pytz
 
+from app.database import SessionLocal
+from app.scrapers.registry import list_scrapers
 from app.services.refresh import refresh_all_sources
+from app.services.source_schedule import due_sources
 
 logger = logging.getLogger(__name__)
 
 # Polish timezone
 POLISH_TZ = pytz.timezone('Europe/Warsaw')
 
+# How often to check for due sources (minutes)
+SCHEDULER_TICK_MINUTES = float(os.getenv("SCHEDULER_TICK_MINUTES", "15"))
+
 # Global scheduler instance
 _scheduler: Optional[BackgroundScheduler] = None
 
@@ -27,14 +36,24 @@ def run_refresh_job():
     """
     Execute the scheduled refresh job.
     
-    This function is called by the scheduler and handles the refresh
-    process with proper error handling and logging.
+    This function is called by the scheduler and refreshes the sources
+    that are due, with proper error handling and logging.
     """
-    logger.info("Starting scheduled job offer refresh...")
     start_time = datetime.now(POLISH_TZ)
     
     try:
-        result = refresh_all_sources()
+        db = SessionLocal()
+        try:
+            sources = due_sources(list_scrapers(), datetime.utcnow(), db)
+        finally:
+            db.close()
+        
+        if not sources:
+            logger.debug("No sources due for refresh")
+            return
+        
+        logger.info(f"Starting scheduled job offer refresh of {len(sources)} due sources...")
+        result = refresh_all_sources(sources=sources)
         
         end_time = datetime.now(POLISH_TZ)
         duration = (end_time - start_time).total_seconds()
@@ -59,8 +78,8 @@ def start_scheduler():
     """
     Start the background scheduler for automatic job offer refreshes.
     
-    The scheduler runs refresh_all_sources() daily at 2 AM Polish time.
-    This function should be called during application startup.
+    The scheduler checks for due sources every SCHEDULER_TICK_MINUTES and
+    refreshes them. This function should be called during application startup.
     """
     global _scheduler
     
@@ -73,12 +92,12 @@ def start_scheduler():
     # Create background scheduler
     _scheduler = BackgroundScheduler(timezone=POLISH_TZ)
     
-    # Schedule refresh job: daily at 2:00 AM Polish time
+    # Schedule refresh job: refresh due sources on every tick
     _scheduler.add_job(
         func=run_refresh_job,
-        trigger=CronTrigger(hour=2, minute=0, timezone=POLISH_TZ),
-        id='daily_refresh',
-        name='Daily Job Offer Refresh',
+        trigger=IntervalTrigger(minutes=SCHEDULER_TICK_MINUTES, timezone=POLISH_TZ),
+        id='adaptive_refresh',
+        name='Adaptive Job Offer Refresh',
         replace_existing=True,
         max_instances=1,  # Prevent overlapping runs
     )
@@ -87,7 +106,7 @@ def start_scheduler():
     _scheduler.start()
     
     # Log next run time
-    next_run = _scheduler.get_job('daily_refresh').next_run_time
+    next_run = _scheduler.get_job('adaptive_refresh').next_run_time
     if next_run:
         logger.info(f"Scheduler started. Next refresh scheduled for: {next_run.strftime('%Y-%m-%d %H:%M:%S %Z')}")
     else:
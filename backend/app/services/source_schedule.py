@@ -0,0 +1,128 @@
+"""
+Adaptive per-source refresh intervals.
+
+Each refresh that applied (or confirmed) a source's listing is an
+observation of how many offers changed (new + updated + inactivated) since
+the previous one. The smoothed
+change rate sets the source's next interval so that a refresh finds about
+SCHEDULE_TARGET_CHANGES changes: busy boards are refreshed every few hours,
+static pages only every few days, always within the min/max bounds.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.models import SourceSchedule
+
+# Bounds and starting point of a source's refresh interval (hours)
+SCHEDULE_MIN_INTERVAL_HOURS = float(os.getenv("SCHEDULE_MIN_INTERVAL_HOURS", "2"))
+SCHEDULE_MAX_INTERVAL_HOURS = float(os.getenv("SCHEDULE_MAX_INTERVAL_HOURS", "168"))
+SCHEDULE_DEFAULT_INTERVAL_HOURS = float(os.getenv("SCHEDULE_DEFAULT_INTERVAL_HOURS", "24"))
+
+# Offer changes a refresh should find on average
+SCHEDULE_TARGET_CHANGES = float(os.getenv("SCHEDULE_TARGET_CHANGES", "1"))
+
+# Weight of the newest observation in the smoothed change rate
+_RATE_SMOOTHING = 0.3
+
+# Outcomes of refresh_source() that observed the listing; an empty listing, a
+# timeout or an error says nothing about how often the source changes
+_OBSERVED_OUTCOMES = ('applied', 'not_modified', 'fingerprint_hit')
+
+
+def _clamp_interval(hours: float) -> float:
+    return min(SCHEDULE_MAX_INTERVAL_HOURS, max(SCHEDULE_MIN_INTERVAL_HOURS, hours))
+
+
+def record_source_refresh(source_id: str, source_result: Dict, refreshed_at: datetime, db: Session):
+    """
+    Update a source's change rate and next due time after it was refreshed.
+    
+    Only observed outcomes (_OBSERVED_OUTCOMES) update the change rate and
+    interval. Failed and timed-out sources keep them and are retried after
+    the minimum interval; an empty listing keeps them and its due time
+    follows the current interval.
+    
+    Args:
+        source_id: Source identifier
+        source_result: Result dictionary of refresh_source()
+        refreshed_at: When the source was refreshed
+        db: Database session
+    """
+    schedule = db.get(SourceSchedule, source_id)
+    if schedule is None:
+        schedule = SourceSchedule(source_id=source_id, interval_hours=SCHEDULE_DEFAULT_INTERVAL_HOURS,
+                                  next_due_at=refreshed_at)
+        db.add(schedule)
+    
+    if source_result.get('error'):
+        schedule.next_due_at = refreshed_at + timedelta(hours=SCHEDULE_MIN_INTERVAL_HOURS)
+        db.commit()
+        return
+    if source_result.get('outcome') not in _OBSERVED_OUTCOMES:
+        # last_refreshed_at stays at the last observation, so the next one spans this period too
+        schedule.next_due_at = refreshed_at + timedelta(hours=schedule.interval_hours)
+        db.commit()
+        return
+    
+    if schedule.last_refreshed_at is not None:
+        hours = max((refreshed_at - schedule.last_refreshed_at).total_seconds() / 3600, 1 / 60)
+        changes = source_result['new'] + source_result['updated'] + source_result['inactivated']
+        observed_rate = changes / hours
+        if schedule.change_rate is None:
+            schedule.change_rate = observed_rate
+        else:
+            schedule.change_rate = (1 - _RATE_SMOOTHING) * schedule.change_rate + _RATE_SMOOTHING * observed_rate
+        
+        # Back off at most 2x per refresh, so one quiet period doesn't park a source for a week
+        interval = schedule.interval_hours * 2
+        if schedule.change_rate > 0:
+            interval = min(interval, SCHEDULE_TARGET_CHANGES / schedule.change_rate)
+        schedule.interval_hours = _clamp_interval(interval)
+    
+    schedule.last_refreshed_at = refreshed_at
+    schedule.next_due_at = refreshed_at + timedelta(hours=schedule.interval_hours)
+    db.commit()
+
+
+def due_sources(source_ids: List[str], now: datetime, db: Session) -> List[str]:
+    """
+    Select the sources whose refresh is due.
+    
+    Sources without a schedule (never refreshed) are always due.
+    
+    Args:
+        source_ids: Candidate sources
+        now: Current time (UTC)
+        db: Database session
+    
+    Returns:
+        Due sources, in the order given
+    """
+    next_due = {row.source_id: row.next_due_at for row in db.query(SourceSchedule).all()}
+    return [source_id for source_id in source_ids
+            if source_id not in next_due or next_due[source_id] <= now]
+
+
+def load_schedules(db: Session) -> List[Dict]:
+    """
+    Load all source schedules, soonest due first.
+    
+    Args:
+        db: Database session
+    
+    Returns:
+        List of schedule dictionaries
+    """
+    return [
+        {
+            'source_id': row.source_id,
+            'change_rate': row.change_rate,
+            'interval_hours': row.interval_hours,
+            'last_refreshed_at': row.last_refreshed_at.isoformat() if row.last_refreshed_at else None,
+            'next_due_at': row.next_due_at.isoformat(),
+        }
+        for row in db.query(SourceSchedule).order_by(SourceSchedule.next_due_at)
+    ]
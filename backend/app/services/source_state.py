@@ -0,0 +1,86 @@
+"""
+Persisted per-source state carried between refresh runs.
+"""
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy.orm import Session
+
+from app.models import SourceFingerprint, SourceValidator
+
+
+def load_validators(db: Session) -> Dict[str, Dict]:
+    """
+    Load HTTP cache validators for all source URLs.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Dictionary mapping URL to its validators
+        ({'etag', 'last_modified', 'content_length', 'content_hash', 'config_hash'})
+    """
+    return {
+        row.url: {
+            'etag': row.etag,
+            'last_modified': row.last_modified,
+            'content_length': row.content_length,
+            'content_hash': row.content_hash,
+            'config_hash': row.config_hash,
+        }
+        for row in db.query(SourceValidator).all()
+    }
+
+
+def save_validators(db: Session, validators: Dict[str, Dict]):
+    """
+    Insert or update validators observed during a refresh.
+    
+    The caller commits.
+    
+    Args:
+        db: Database session
+        validators: Dictionary mapping URL to its validators
+    """
+    now = datetime.utcnow()
+    for url, values in validators.items():
+        db.merge(SourceValidator(
+            url=url,
+            etag=values.get('etag'),
+            last_modified=values.get('last_modified'),
+            content_length=values.get('content_length'),
+            content_hash=values.get('content_hash'),
+            config_hash=values.get('config_hash'),
+            updated_at=now,
+        ))
+
+
+def load_fingerprints(db: Session) -> Dict[str, str]:
+    """
+    Load listing fingerprints for all sources.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Dictionary mapping source_id to its listing hash
+    """
+    return {row.source_id: row.listing_hash for row in db.query(SourceFingerprint).all()}
+
+
+def save_fingerprint(db: Session, source_id: str, listing_hash: str):
+    """
+    Insert or update the listing fingerprint of a source.
+    
+    The caller commits.
+    
+    Args:
+        db: Database session
+        source_id: Source identifier
+        listing_hash: Hash of the normalized listing
+    """
+    db.merge(SourceFingerprint(
+        source_id=source_id,
+        listing_hash=listing_hash,
+        updated_at=datetime.utcnow(),
+    ))
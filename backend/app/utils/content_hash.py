@@ -0,0 +1,58 @@
+"""
+Content hash of job offers.
+
+The hash covers the cleaned title, facility name, city, role and
+description, i.e. everything a summary is generated from. It is stored in
+job_offers.content_hash, so writers can detect unchanged offers by comparing
+one value instead of every field, and skip the summary regeneration and the
+row write.
+"""
+
+import hashlib
+from typing import Optional
+
+from sqlalchemy import case
+
+from app.models import JobOffer
+
+# Cleaned fields covered by the hash (in hashing order)
+CONTENT_FIELDS = ('title', 'facility_name', 'city', 'role', 'description')
+
+
+def compute_content_hash(title: str, facility_name: str, city: str, role, description: Optional[str]) -> str:
+    """
+    Compute the content hash of an offer.
+    
+    Args:
+        title: Cleaned title
+        facility_name: Cleaned facility name
+        city: City
+        role: MedicalRole (or its value)
+        description: Description, if any
+    
+    Returns:
+        Hex sha256 of the fields
+    """
+    role = role.value if hasattr(role, 'value') else role
+    parts = (title, facility_name, city, role, description)
+    return hashlib.sha256('\x1f'.join(part or '' for part in parts).encode('utf-8')).hexdigest()
+
+
+def content_hash_columns():
+    """
+    Columns to select for stored_content_hash().
+    
+    The content fields themselves are only returned for rows stored before
+    content_hash existed, so the usual query stays compact.
+    """
+    return (JobOffer.content_hash,) + tuple(
+        case((JobOffer.content_hash.is_(None), getattr(JobOffer, field)), else_=None).label(field)
+        for field in CONTENT_FIELDS
+    )
+
+
+def stored_content_hash(row) -> str:
+    """Content hash of a row selected with content_hash_columns()."""
+    if row.content_hash is not None:
+        return row.content_hash
+    return compute_content_hash(*(getattr(row, field) for field in CONTENT_FIELDS))
@@ -0,0 +1,63 @@
+"""
+URL canonicalization for job offers.
+
+Sources link to the same offer in several ways: with fragments (including
+the synthetic '#<title hash>' anchors of listing-only offers), tracking
+parameters, upper-case hosts, explicit default ports or trailing slashes.
+The canonical form collapses these variants; it is stored in
+job_offers.canonical_url, whose unique index keeps such duplicates out of
+the database.
+"""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def is_tracking_param(name: str) -> bool:
+    """Whether a query parameter is a known tracking parameter."""
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of an offer URL.
+    
+    Lower-cases scheme and host, drops default ports, the fragment, tracking
+    query parameters and trailing slashes of the path. Remaining query
+    parameters keep their order (and encoding, unless a tracking parameter
+    was removed).
+    
+    Args:
+        url: Offer URL
+    
+    Returns:
+        Canonical URL (the input unchanged if it can't be parsed)
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username or parts.password:
+        host = f"{parts.netloc.rsplit('@', 1)[0]}@{host}"
+    
+    path = parts.path.rstrip('/') or '/'
+    query = parts.query
+    params = parse_qsl(query, keep_blank_values=True)
+    if any(is_tracking_param(name) for name, _ in params):
+        query = urlencode([(name, value) for name, value in params if not is_tracking_param(name)])
+    return urlunsplit((scheme, host, path, query, ''))
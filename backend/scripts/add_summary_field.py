@@ -5,23 +5,41 @@ Migration script to add summary field to existing job offers.
 This script:
 1. Adds the summary column to the database (if it doesn't exist)
 2. Generates summaries for all existing job offers that don't have one
+
+Summaries are generated as a chunked, resumable backfill
+(app/services/backfill.py); use --workers to spread extract_summary over
+several processes.
 """
+import argparse
+import logging
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import text
-from app.database import SessionLocal, engine, init_db
-from app.models import JobOffer, Base
+from sqlalchemy import inspect, text
+from app.database import SessionLocal, get_engine, init_db
+from app.models import JobOffer
+from app.services.backfill import add_backfill_arguments, run_backfill
 from app.utils.summary import extract_summary
 
-def migrate():
+def summarize(job):
+    """Row function: summary of a job offer."""
+    return {
+        'summary': extract_summary(
+            title=job.title,
+            description=job.description,
+            facility_name=job.facility_name,
+            city=job.city
+        )
+    }
+
+def migrate(args):
     """Add summary column and generate summaries for existing jobs."""
     db = SessionLocal()
     
     try:
         # Check if summary column exists
-        inspector = __import__('sqlalchemy').inspect(engine)
+        inspector = inspect(get_engine())
         columns = [col['name'] for col in inspector.get_columns('job_offers')]
         
         if 'summary' not in columns:
@@ -31,41 +49,34 @@ def migrate():
             print("✅ Summary column added")
         else:
             print("✅ Summary column already exists")
-        
-        # Generate summaries for jobs that don't have one
-        jobs_without_summary = db.query(JobOffer).filter(
-            (JobOffer.summary.is_(None)) | (JobOffer.summary == '')
-        ).all()
-        
-        print(f"\nFound {len(jobs_without_summary)} jobs without summaries")
-        
-        updated = 0
-        for job in jobs_without_summary:
-            summary = extract_summary(
-                title=job.title,
-                description=job.description,
-                facility_name=job.facility_name,
-                city=job.city
-            )
-            job.summary = summary
-            updated += 1
-            
-            if updated % 50 == 0:
-                db.commit()
-                print(f"  Processed {updated} jobs...")
-        
-        db.commit()
-        print(f"\n✅ Generated summaries for {updated} jobs")
-        
+    
     except Exception as e:
         db.rollback()
         print(f"❌ Error: {e}")
         raise
     finally:
         db.close()
+    
+    # Generate summaries for jobs that don't have one
+    stats = run_backfill(
+        'add_summary_field',
+        [JobOffer.title, JobOffer.description, JobOffer.facility_name, JobOffer.city],
+        summarize,
+        filters=[(JobOffer.summary.is_(None)) | (JobOffer.summary == '')],
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        dry_run=args.dry_run,
+        restart=args.restart,
+    )
+    print(f"\n✅ Generated summaries: {stats}")
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Add and backfill job offer summaries')
+    add_backfill_arguments(parser)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     print("Starting summary migration...")
     init_db()
-    migrate()
+    migrate(args)
     print("\n✅ Migration complete!")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent request throughput of the job offer read endpoints.
+
+Compares the async endpoints in app/api/jobs.py (AsyncSession, the query
+awaits the database) with the previous implementation (async endpoints on
+the sync Session, every query blocks the event loop). Both are served
+in-process by one event loop, like one uvicorn worker, and hit with
+--concurrency requests in flight.
+
+Usage:
+    python scripts/benchmark_api_concurrency.py [--requests 1000] [--concurrency 10] [--database-url URL]
+
+Without --database-url, a temporary SQLite database is used. The gap between
+the two grows with database latency, so run it against the remote PostgreSQL
+database to see production numbers (locally, aiosqlite's thread hop makes the
+async endpoints slower on SQLite, and they are about even on PostgreSQL).
+Keep --concurrency at or below the pool size plus overflow (15). Above that,
+the sync endpoints stall: they block the event loop waiting for a pooled
+connection that is only returned after a response is sent. Only rows with
+source_id 'benchmark' are written (and deleted afterwards).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCHMARK_SOURCE = 'benchmark'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint and implementation")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight (at most 15)")
+    parser.add_argument("--offers", type=int, default=2000, help="benchmark offers to insert")
+    parser.add_argument("--database-url", help="database to benchmark (default: temporary SQLite file)")
+    return parser.parse_args()
+
+
+def insert_benchmark_rows(count):
+    from app.database import SessionLocal
+    from app.models import JobOffer, MedicalRole
+    
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        db.add_all([
+            JobOffer(
+                title=f"Lekarz specjalista chorób wewnętrznych {i}",
+                facility_name="Szpital Benchmarkowy",
+                city="Sopot",
+                role=MedicalRole.LEKARZ,
+                description=f"Umowa o pracę, pełny etat, oddział {i % 40}. " * 20,
+                summary="Umowa o pracę, pełny etat.",
+                source_url=f"https://benchmark.invalid/oferty/{i}",
+                source_id=BENCHMARK_SOURCE,
+                status='active',
+                scraped_at=now,
+            )
+            for i in range(count)
+        ])
+        db.commit()
+        return [job_id for (job_id,) in db.query(JobOffer.id).filter(JobOffer.source_id == BENCHMARK_SOURCE)]
+    finally:
+        db.close()
+
+
+def delete_benchmark_rows():
+    from app.database import SessionLocal
+    from app.models import JobOffer
+    
+    db = SessionLocal()
+    try:
+        db.query(JobOffer).filter(JobOffer.source_id == BENCHMARK_SOURCE).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def build_app():
+    """App with the async endpoints under /api/jobs and the previous sync-session ones under /sync/jobs."""
+    from fastapi import Depends, FastAPI, HTTPException
+    from sqlalchemy.orm import Session
+    
+    from app.api import jobs
+    from app.database import get_db
+    from app.models import JobOffer
+    
+    app = FastAPI()
+    app.include_router(jobs.router)
+    
+    @app.get("/sync/jobs")
+    async def list_jobs_sync(limit: int = 100, offset: int = 0, db: Session = Depends(get_db)):
+        query = db.query(JobOffer).filter(JobOffer.status == 'active')
+        total = query.count()
+        rows = query.order_by(JobOffer.created_at.desc()).limit(limit).offset(offset).all()
+        return {"total": total, "results": [jobs.serialize_job(job, jobs.FIELD_PRESETS["card"]) for job in rows]}
+    
+    @app.get("/sync/jobs/{job_id}")
+    async def get_job_sync(job_id: int, db: Session = Depends(get_db)):
+        job = db.query(JobOffer).filter(JobOffer.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job offer not found")
+        return jobs.serialize_job(job, jobs.LIST_FIELDS)
+    
+    return app
+
+
+async def run_load(client, paths, concurrency):
+    """Request every path with at most `concurrency` in flight; returns (seconds, latencies)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    
+    async def request(path):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(request(path) for path in paths))
+    return time.perf_counter() - started, latencies
+
+
+async def benchmark(args, job_ids):
+    import httpx
+    
+    from app.database import async_engine
+    
+    workloads = [
+        ("list", lambda prefix, i: f"{prefix}?limit=100&offset={(i * 100) % max(len(job_ids), 1)}"),
+        ("detail", lambda prefix, i: f"{prefix}/{job_ids[i % len(job_ids)]}"),
+    ]
+    implementations = [("sync Session", "/sync/jobs"), ("AsyncSession", "/api/jobs")]
+    
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        print(f"{'endpoint':>8} {'implementation':>15} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for workload, make_path in workloads:
+            for name, prefix in implementations:
+                paths = [make_path(prefix, i) for i in range(args.requests)]
+                # Warm up connection pools
+                await run_load(client, paths[:args.concurrency], args.concurrency)
+                seconds, latencies = await run_load(client, paths, args.concurrency)
+                latencies.sort()
+                p50 = statistics.median(latencies) * 1000
+                p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+                print(f"{workload:>8} {name:>15} {args.requests / seconds:>8.0f} {p50:>8.1f} {p95:>8.1f}")
+    await async_engine.dispose()
+
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    
+    from app.database import init_db
+    
+    init_db()
+    delete_benchmark_rows()
+    job_ids = insert_benchmark_rows(args.offers)
+    print(f"Database: {os.environ['DATABASE_URL'].split('@')[-1]}")
+    print(f"{args.requests} requests per run, {args.concurrency} in flight, {len(job_ids)} benchmark offers")
+    try:
+        asyncio.run(benchmark(args, job_ids))
+    finally:
+        delete_benchmark_rows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark BaseScraper.save_or_update_to_db: bulk upsert vs. per-job path.
+
+For every size, both paths run an insert pass (all offers new) and an update
+pass (every tenth offer changed, the rest unchanged) on offers of a dedicated
+benchmark source, which is deleted before and after each pass.
+
+Usage:
+    python scripts/benchmark_save_or_update.py [--sizes 10000 100000] [--database-url URL]
+
+Without --database-url, a temporary SQLite database is used. Only rows with
+source_id 'benchmark' are touched, so a PostgreSQL database can be used too.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCHMARK_SOURCE = 'benchmark'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="numbers of offers")
+    parser.add_argument("--database-url", help="database to benchmark (default: temporary SQLite file)")
+    parser.add_argument("--skip-per-job", action="store_true", help="only run the bulk path")
+    return parser.parse_args()
+
+
+def make_jobs(count, changed_every=None):
+    from app.models import MedicalRole
+    
+    jobs = []
+    for i in range(count):
+        changed = changed_every and i % changed_every == 0
+        jobs.append({
+            'title': f"Lekarz specjalista chorób wewnętrznych {i}" + (" (zmiana)" if changed else ""),
+            'facility_name': "Szpital Benchmarkowy",
+            'city': "Sopot",
+            'role': MedicalRole.LEKARZ,
+            'description': f"Umowa o pracę, pełny etat, oddział {i % 40}. " * 5,
+            'source_url': f"https://benchmark.invalid/oferty/{i}",
+        })
+    return jobs
+
+
+def run_pass(scraper, jobs, bulk):
+    from app.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = scraper.save_or_update_to_db(jobs, db, bulk=bulk)
+        return time.perf_counter() - started, result
+    finally:
+        db.close()
+
+
+def delete_benchmark_rows():
+    from app.database import SessionLocal
+    from app.models import JobOffer
+    
+    db = SessionLocal()
+    try:
+        db.query(JobOffer).filter(JobOffer.source_id == BENCHMARK_SOURCE).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    
+    from app.database import init_db
+    from app.scrapers.base import BaseScraper
+    
+    class BenchmarkScraper(BaseScraper):
+        def scrape(self):
+            return []
+    
+    init_db()
+    scraper = BenchmarkScraper("https://benchmark.invalid/oferty", "Szpital Benchmarkowy", "Sopot", BENCHMARK_SOURCE)
+    paths = [("bulk", True)] if args.skip_per_job else [("per-job", False), ("bulk", True)]
+    
+    print(f"Database: {os.environ['DATABASE_URL'].split('@')[-1]}")
+    print(f"{'offers':>8} {'path':>8} {'insert s':>10} {'update s':>10} {'offers/s':>10}  counts (update pass)")
+    for size in args.sizes:
+        new_jobs = make_jobs(size)
+        changed_jobs = make_jobs(size, changed_every=10)
+        for name, bulk in paths:
+            delete_benchmark_rows()
+            insert_seconds, _ = run_pass(scraper, new_jobs, bulk)
+            update_seconds, counts = run_pass(scraper, changed_jobs, bulk)
+            throughput = 2 * size / (insert_seconds + update_seconds)
+            print(f"{size:>8} {name:>8} {insert_seconds:>10.2f} {update_seconds:>10.2f} {throughput:>10.0f}  {counts}")
+    delete_benchmark_rows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Check that the API and refresh queries are served by the job_offers indexes.
+
+Runs EXPLAIN (PostgreSQL) or EXPLAIN QUERY PLAN (SQLite) for each query
+shape and fails if the expected index is not used, or if the database has
+to sort rows for ORDER BY. Run it after changing JobOffer indexes or these
+queries, so an index can't silently stop being used.
+
+Usage:
+    python scripts/check_query_plans.py [--database-url URL]
+
+Without --database-url, a temporary SQLite database is created. The check
+only reads, so it can run against a PostgreSQL database (sequential scans
+are disabled for the session, so small tables still show index plans).
+
+Exit code 0 if all plans match, 1 otherwise.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime
+from enum import Enum
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check query plans of job_offers queries.")
+    parser.add_argument("--database-url", help="database to check (default: temporary SQLite file)")
+    return parser.parse_args()
+
+
+# Indexes serving the active offers, by role and by source (see JobOffer.__table_args__)
+INDEXES = {
+    'sqlite': (
+        "ix_job_offers_status_created_at",
+        "ix_job_offers_status_role_created_at",
+        "ix_job_offers_source_id_status_last_seen_at",
+    ),
+    'postgresql': (
+        "ix_job_offers_active_created_at",
+        "ix_job_offers_active_role_created_at",
+        "ix_job_offers_active_source_id_last_seen_at",
+    ),
+}
+
+
+def query_shapes(dialect_name):
+    """
+    Query shapes to check: (name, statement, expected index, whether ORDER BY must come from the index).
+    
+    The statements mirror app/api/jobs.py and app/services/changeset.py.
+    tests/test_query_plans.py asserts the same plans.
+    """
+    from app.models import JobOffer, MedicalRole
+    from sqlalchemy import func, select
+    
+    by_status, by_role, by_source = INDEXES[dialect_name]
+    active = JobOffer.status == 'active'
+    return [
+        (
+            "list_jobs",
+            select(JobOffer).where(active).order_by(JobOffer.created_at.desc()).limit(100).offset(200),
+            by_status,
+            True,
+        ),
+        (
+            "list_jobs by role",
+            select(JobOffer).where(active, JobOffer.role == MedicalRole.LEKARZ)
+            .order_by(JobOffer.created_at.desc()).limit(100).offset(0),
+            by_role,
+            True,
+        ),
+        (
+            "count by role",
+            select(func.count()).select_from(JobOffer).where(active, JobOffer.role == MedicalRole.LEKARZ),
+            by_role,
+            False,
+        ),
+        (
+            "refresh snapshot",
+            select(JobOffer.id, JobOffer.source_url).where(JobOffer.source_id == 'uck', active),
+            by_source,
+            False,
+        ),
+        (
+            "stale offers",
+            # (the refresh start time: most of a source's active offers were last seen before it)
+            select(JobOffer.id).where(
+                JobOffer.source_id == 'uck', active, JobOffer.last_seen_at < datetime.utcnow()
+            ),
+            by_source,
+            False,
+        ),
+    ]
+
+
+def explain(conn, statement):
+    """Plan of a statement as a list of lines."""
+    from sqlalchemy import text
+    
+    compiled = statement.compile()
+    # Bind enums by name, as SQLAlchemy's Enum type stores them
+    params = {key: value.name if isinstance(value, Enum) else value for key, value in compiled.params.items()}
+    if conn.dialect.name == 'sqlite':
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}"), params)
+        return [row[-1] for row in rows]
+    rows = conn.execute(text(f"EXPLAIN {compiled}"), params)
+    return [row[0] for row in rows]
+
+
+def check_plan(dialect_name, plan, index_name, sorted_by_index):
+    """Problems with a plan (empty if it is fine)."""
+    joined = "\n".join(plan)
+    problems = []
+    if index_name not in joined:
+        problems.append(f"does not use {index_name}")
+    if sorted_by_index:
+        sorts = "USE TEMP B-TREE FOR ORDER BY" in joined if dialect_name == 'sqlite' else "Sort" in joined
+        if sorts:
+            problems.append("sorts rows instead of reading them in index order")
+    return problems
+
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "plans.db")
+    
+    from sqlalchemy import text
+    from app.database import engine, init_db
+    
+    if not args.database_url:
+        init_db()
+    
+    failures = 0
+    with engine.connect() as conn:
+        if conn.dialect.name == 'postgresql':
+            conn.execute(text("SET enable_seqscan = off"))
+        print(f"Database: {conn.dialect.name}")
+        for name, statement, index_name, sorted_by_index in query_shapes(conn.dialect.name):
+            plan = explain(conn, statement)
+            problems = check_plan(conn.dialect.name, plan, index_name, sorted_by_index)
+            print(f"{'FAIL' if problems else 'ok':>4}  {name}: {'; '.join(problems) or index_name}")
+            if problems:
+                failures += 1
+                for line in plan:
+                    print(f"        {line}")
+        conn.rollback()
+    
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
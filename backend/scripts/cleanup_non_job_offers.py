@@ -9,13 +9,15 @@ Removes:
 - Non-medical jobs (developer, PHP, etc.)
 - Other non-job content
 """
+import logging
 import sys
 import os
 import re
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import SessionLocal, init_db
+from app.database import init_db
 from app.models import JobOffer
+from app.services.backfill import DEFAULT_CHUNK_SIZE, DELETE, add_backfill_arguments, run_backfill
 
 # Patterns that indicate non-job offers
 NON_JOB_PATTERNS = [
@@ -59,9 +61,9 @@ NON_JOB_PATTERNS = [
     r'\bjunior\s+developer\b',
 ]
 
-def is_non_job_offer(job: JobOffer) -> bool:
+def is_non_job_offer(job) -> bool:
     """
-    Check if a job offer is actually a non-job offer.
+    Check if a job offer (or a row with its title and description) is actually a non-job offer.
     
     Returns:
         True if this should be removed, False otherwise
@@ -86,70 +88,68 @@ def is_non_job_offer(job: JobOffer) -> bool:
     
     return False
 
-def cleanup_non_job_offers(dry_run: bool = False):
+def classify_job(job):
+    """Row function: DELETE for non-job offers."""
+    return DELETE if is_non_job_offer(job) else None
+
+def cleanup_non_job_offers(dry_run: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1,
+                           restart: bool = False):
     """
     Remove non-job offers from the database.
     
+    Active offers are checked as a chunked, resumable backfill
+    (app/services/backfill.py), deleting each chunk's non-job offers in one
+    statement.
+    
     Args:
         dry_run: If True, only report what would be deleted without actually deleting
+        chunk_size: Offers per chunk (and per commit)
+        workers: Processes for the pattern checks
+        restart: Start from the first offer even if an interrupted run saved progress
     """
     init_db()
-    db = SessionLocal()
-    
-    try:
-        # Get all active jobs
-        all_jobs = db.query(JobOffer).filter(JobOffer.status == 'active').all()
-        
-        to_delete = []
-        for job in all_jobs:
-            if is_non_job_offer(job):
-                to_delete.append(job)
-        
-        print(f"Found {len(to_delete)} non-job offers to remove")
-        
-        if not to_delete:
-            print("No non-job offers found. Database is clean!")
-            return
-        
-        print("\nNon-job offers to be removed:")
-        print("=" * 70)
-        for job in to_delete:
-            print(f"ID {job.id}: {job.title[:70]}")
-            print(f"  Facility: {job.facility_name}, Source: {job.source_id}")
-            print(f"  URL: {job.source_url[:80]}...")
-            print()
-        
-        if not dry_run:
-            # Delete the offers
-            deleted_count = 0
-            for job in to_delete:
-                db.delete(job)
-                deleted_count += 1
-            
-            db.commit()
-            print(f"\n✓ Deleted {deleted_count} non-job offers")
-        else:
-            print(f"\n[DRY RUN] Would delete {len(to_delete)} non-job offers")
-            print("Run without --dry-run to actually delete them")
-        
-    except Exception as e:
-        db.rollback()
-        print(f"❌ Error: {e}")
-        raise
-    finally:
-        db.close()
+    
+    def report(job, result):
+        print(f"ID {job.id}: {job.title[:70]}")
+        print(f"  Facility: {job.facility_name}, Source: {job.source_id}")
+        print(f"  URL: {job.source_url[:80]}...")
+        print()
+    
+    print("\nNon-job offers to be removed:")
+    print("=" * 70)
+    stats = run_backfill(
+        'cleanup_non_job_offers',
+        [JobOffer.title, JobOffer.description, JobOffer.facility_name, JobOffer.source_id, JobOffer.source_url],
+        classify_job,
+        filters=[JobOffer.status == 'active'],
+        chunk_size=chunk_size,
+        workers=workers,
+        dry_run=dry_run,
+        restart=restart,
+        report=report,
+    )
+    
+    if not stats.deleted:
+        print("No non-job offers found. Database is clean!")
+    elif not dry_run:
+        print(f"\n✓ Deleted {stats.deleted} non-job offers ({stats})")
+    else:
+        print(f"\n[DRY RUN] Would delete {stats.deleted} non-job offers ({stats})")
+        print("Run without --dry-run to actually delete them")
 
 if __name__ == '__main__':
     import argparse
     
     parser = argparse.ArgumentParser(description='Cleanup non-job offers from database')
-    parser.add_argument('--dry-run', action='store_true', help='Show what would be deleted without actually deleting')
+    add_backfill_arguments(parser)
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     
     print("=" * 70)
     print("Non-Job Offers Cleanup")
     print("=" * 70)
     
-    cleanup_non_job_offers(dry_run=args.dry_run)
+    cleanup_non_job_offers(dry_run=args.dry_run, chunk_size=args.chunk_size, workers=args.workers,
+                           restart=args.restart)
     
     print("\n✅ Cleanup complete!")
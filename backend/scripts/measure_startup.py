@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Measure cold-start time of the backend entry points.
+
+Every measurement runs in a fresh Python process, so module caches don't
+hide regressions: importing app.database (should not create an engine or
+touch DNS), the API app, the refresh CLI, and the first database access
+(engine creation, connect and init_db()).
+
+Usage:
+    python scripts/measure_startup.py [--runs 5] [--database-url URL] [--max-seconds 2.0]
+
+Without --database-url, a temporary SQLite database is used. With
+--max-seconds, exits 1 if any median exceeds it, so it can gate CI or a
+deploy.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, code timed in a fresh interpreter)
+STEPS = [
+    ("import app.database", "import app.database"),
+    ("import app.main", "import app.main"),
+    ("import refresh_cli", "import app.services.refresh_cli"),
+    ("import + init_db()", "from app.database import init_db; init_db()"),
+]
+
+TIMER = """
+import time
+started = time.perf_counter()
+{code}
+print(time.perf_counter() - started)
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per step")
+    parser.add_argument("--database-url", help="database to connect to (default: temporary SQLite file)")
+    parser.add_argument("--max-seconds", type=float, help="fail if a median exceeds this")
+    return parser.parse_args()
+
+
+def time_step(code, env):
+    """Seconds `code` takes in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", TIMER.format(code=code)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+    env = dict(os.environ)
+    env["DATABASE_URL"] = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "startup.db")
+    
+    print(f"Database: {env['DATABASE_URL'].split('@')[-1]}")
+    print(f"{'step':>20} {'median ms':>10} {'max ms':>8}")
+    slow = []
+    for name, code in STEPS:
+        seconds = [time_step(code, env) for _ in range(args.runs)]
+        median = statistics.median(seconds)
+        print(f"{name:>20} {median * 1000:>10.0f} {max(seconds) * 1000:>8.0f}")
+        if args.max_seconds is not None and median > args.max_seconds:
+            slow.append(name)
+    
+    if slow:
+        print(f"Slower than {args.max_seconds}s: {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
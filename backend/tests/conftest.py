@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Make the app package (and scripts/) importable from any working directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Never touch the application's database: app.database reads DATABASE_URL at
+# import, so point it at a throwaway SQLite file before any test imports it.
+# Tests that need PostgreSQL use TEST_DATABASE_URL instead.
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="medi-etat-tests-"), "app.db")
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Create the schema in the throwaway database once per test session."""
+    from app.database import init_db
+    init_db()
+
+
+@pytest.fixture
+def db(database):
+    """Session on the throwaway database; every table is emptied afterwards."""
+    from app.database import SessionLocal
+    from app.models import Base
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        session.close()
+
+
+@pytest.fixture
+def scraper():
+    """Scraper of a test source whose offers are passed in directly (scrape() is never called)."""
+    from app.scrapers.base import BaseScraper
+
+    class ListingScraper(BaseScraper):
+        def scrape(self):
+            return []
+
+    instance = ListingScraper("https://szpital.example/kariera", "Szpital Testowy", city="Gdynia", source_id="test_source")
+    yield instance
+    instance.close()
@@ -0,0 +1,97 @@
+"""
+Archive tier: archiving old inactive offers and restoring them when their
+source lists them again.
+
+Usage:
+    python -m pytest tests/test_archive.py
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import JobOffer, JobOfferArchive, MedicalRole
+from app.services.archive import archive_inactive_offers
+from app.services.changeset import apply_changeset, build_changeset
+
+
+def scraped_job(number):
+    return {
+        "title": f"Ratownik medyczny SOR {number}",
+        "facility_name": "Szpital Testowy",
+        "city": "Gdynia",
+        "role": MedicalRole.RATOWNIK,
+        "description": f"Oferta pracy numer {number} w szpitalnym oddziale ratunkowym.",
+        "source_url": f"https://szpital.example/kariera/oferta-{number}",
+    }
+
+
+def store_and_age(scraper, numbers, days, db):
+    """Store offers through the scraper, then mark them inactive and last seen days ago."""
+    scraper.save_or_update_to_db([scraped_job(number) for number in numbers], db)
+    db.query(JobOffer).filter(JobOffer.status == "active").update({
+        JobOffer.status: "inactive",
+        JobOffer.last_seen_at: datetime.utcnow() - timedelta(days=days),
+    })
+    db.commit()
+
+
+def test_only_old_inactive_offers_are_archived(scraper, db):
+    store_and_age(scraper, [1, 2, 3], 120, db)
+    store_and_age(scraper, [4], 10, db)
+    scraper.save_or_update_to_db([scraped_job(5)], db)
+    offer_ids = {offer.source_url: offer.id for offer in db.query(JobOffer)}
+
+    assert archive_inactive_offers(90, 2, db) == 3
+
+    assert sorted(offer.source_url for offer in db.query(JobOffer)) == \
+        [scraped_job(4)["source_url"], scraped_job(5)["source_url"]]
+    archived = db.query(JobOfferArchive).order_by(JobOfferArchive.offer_id).all()
+    assert [(row.offer_id, row.source_url) for row in archived] == \
+        [(offer_ids[scraped_job(number)["source_url"]], scraped_job(number)["source_url"]) for number in (1, 2, 3)]
+    assert all(row.archived_at is not None and row.summary for row in archived)
+    assert archive_inactive_offers(90, 2, db) == 0
+
+
+@pytest.mark.parametrize("bulk", [True, False], ids=["bulk", "per-offer"])
+def test_save_restores_archived_offers(scraper, db, bulk):
+    store_and_age(scraper, [1], 120, db)
+    offer_id = db.query(JobOffer.id).scalar()
+    archive_inactive_offers(90, 100, db)
+
+    assert scraper.save_or_update_to_db([scraped_job(1)], db, bulk=bulk) == {"new": 0, "updated": 1, "skipped": 0}
+
+    db.expire_all()
+    offer = db.query(JobOffer).one()
+    assert (offer.id, offer.status) == (offer_id, "active")
+    assert db.query(JobOfferArchive).count() == 0
+
+
+def test_changeset_reactivates_archived_offers(scraper, db):
+    store_and_age(scraper, [1, 2], 120, db)
+    archive_inactive_offers(90, 100, db)
+
+    changeset = build_changeset(scraper, [scraped_job(1)], datetime.utcnow(), db)
+    assert apply_changeset(changeset, db) == {"new": 0, "updated": 1, "inactivated": 0}
+    db.commit()
+
+    assert changeset.reactivated_urls == [scraped_job(1)["source_url"]]
+    assert [(offer.source_url, offer.status) for offer in db.query(JobOffer)] == \
+        [(scraped_job(1)["source_url"], "active")]
+    assert [row.source_url for row in db.query(JobOfferArchive)] == [scraped_job(2)["source_url"]]
+
+
+def test_restored_offer_gets_a_new_id_when_its_id_was_reused(scraper, db):
+    store_and_age(scraper, [1], 120, db)
+    archive_inactive_offers(90, 100, db)
+    archived_id = db.query(JobOfferArchive.offer_id).scalar()
+    # SQLite hands the freed id to the next offer
+    scraper.save_or_update_to_db([scraped_job(2)], db)
+    assert db.query(JobOffer.id).scalar() == archived_id
+
+    assert scraper.save_or_update_to_db([scraped_job(1)], db)["updated"] == 1
+
+    db.expire_all()
+    offers = {offer.source_url: offer for offer in db.query(JobOffer)}
+    assert offers[scraped_job(2)["source_url"]].id == archived_id
+    assert offers[scraped_job(1)["source_url"]].id != archived_id
+    assert offers[scraped_job(1)["source_url"]].status == "active"
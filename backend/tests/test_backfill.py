@@ -0,0 +1,107 @@
+"""
+Chunked, resumable backfill runner (app.services.backfill.run_backfill).
+
+Usage:
+    python -m pytest tests/test_backfill.py
+"""
+from datetime import datetime
+
+import pytest
+
+from app.models import BackfillProgress, JobOffer, MedicalRole
+from app.services.backfill import DELETE, run_backfill
+
+
+def add_offers(db, count):
+    now = datetime.utcnow()
+    for number in range(1, count + 1):
+        db.add(JobOffer(title=f"Położna {number}", facility_name="Szpital Testowy", city="Gdynia",
+                        role=MedicalRole.POŁOŻNA, source_url=f"https://szpital.example/kariera/oferta-{number}",
+                        status="active", scraped_at=now, last_seen_at=now))
+    db.commit()
+
+
+def summarize(row):
+    """Row function: delete every third offer, give the others a summary."""
+    if row.id % 3 == 0:
+        return DELETE
+    return {"summary": f"Podsumowanie: {row.title}"}
+
+
+def summaries(db):
+    db.expire_all()
+    return {offer.id: offer.summary for offer in db.query(JobOffer)}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_backfill_updates_and_deletes_in_chunks(db, workers):
+    add_offers(db, 10)
+
+    stats = run_backfill("summaries", [JobOffer.title], summarize, chunk_size=4, workers=workers)
+
+    assert (stats.rows, stats.chunks, stats.updated, stats.deleted) == (10, 3, 7, 3)
+    assert summaries(db) == {
+        offer_id: f"Podsumowanie: Położna {offer_id}" for offer_id in range(1, 11) if offer_id % 3
+    }
+    progress = db.get(BackfillProgress, "summaries")
+    assert (progress.last_id, progress.rows_processed, progress.rows_changed) == (10, 10, 10)
+    assert progress.finished_at is not None
+
+
+def test_dry_run_writes_nothing(db):
+    add_offers(db, 5)
+
+    stats = run_backfill("summaries", [JobOffer.title], summarize, chunk_size=2, dry_run=True)
+
+    assert (stats.rows, stats.updated, stats.deleted) == (5, 4, 1)
+    assert summaries(db) == {offer_id: None for offer_id in range(1, 6)}
+    assert db.get(BackfillProgress, "summaries") is None
+
+
+def test_filters_limit_the_rows(db):
+    add_offers(db, 6)
+
+    stats = run_backfill("summaries", [JobOffer.title], summarize, filters=[JobOffer.id > 4])
+
+    assert stats.rows == 2
+    assert summaries(db)[4] is None
+
+
+def test_interrupted_backfill_resumes_after_the_last_chunk(db):
+    add_offers(db, 10)
+    seen = []
+
+    def fail_at_seven(row):
+        if row.id == 7:
+            raise RuntimeError("interrupted")
+        seen.append(row.id)
+        return {"summary": "gotowe"}
+
+    with pytest.raises(RuntimeError):
+        run_backfill("summaries", [], fail_at_seven, chunk_size=3)
+    # The chunk in progress (7-9) was rolled back
+    assert [offer_id for offer_id, summary in summaries(db).items() if summary] == [1, 2, 3, 4, 5, 6]
+
+    seen.clear()
+    stats = run_backfill("summaries", [], lambda row: seen.append(row.id) or {"summary": "gotowe"}, chunk_size=3)
+
+    assert stats.resumed_after_id == 6
+    assert seen == [7, 8, 9, 10]
+    db.expire_all()
+    assert db.get(BackfillProgress, "summaries").rows_processed == 10
+
+    # A finished backfill starts over
+    assert run_backfill("summaries", [], lambda row: None).resumed_after_id == 0
+
+
+def test_restart_ignores_saved_progress(db):
+    add_offers(db, 4)
+
+    def fail_at_three(row):
+        if row.id == 3:
+            raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        run_backfill("summaries", [], fail_at_three, chunk_size=2)
+
+    assert run_backfill("summaries", [], lambda row: None, restart=True).rows == 4
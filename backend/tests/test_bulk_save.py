@@ -0,0 +1,116 @@
+"""
+Bulk upsert path of BaseScraper.save_or_update_to_db (INSERT ... ON CONFLICT
+(source_url) DO UPDATE), checked against the per-offer path.
+
+Usage:
+    python -m pytest tests/test_bulk_save.py
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import JobOffer, MedicalRole
+
+
+def scraped_job(number, **overrides):
+    job = {
+        "title": f"Pielęgniarka oddziałowa {number}",
+        "facility_name": "Szpital Testowy",
+        "city": "Gdynia",
+        "role": MedicalRole.PIELĘGNIARKA,
+        "description": f"Oferta pracy numer {number} na oddziale chirurgii ogólnej.",
+        "source_url": f"https://szpital.example/kariera/oferta-{number}",
+    }
+    job.update(overrides)
+    return job
+
+
+def offers(db):
+    db.expire_all()
+    return {offer.source_url: offer for offer in db.query(JobOffer)}
+
+
+@pytest.mark.parametrize("bulk", [True, False], ids=["bulk", "per-offer"])
+def test_counts_match_the_per_offer_path(scraper, db, bulk):
+    changes = {}
+    assert scraper.save_or_update_to_db([scraped_job(1), scraped_job(2)], db, changes=changes, bulk=bulk) == \
+        {"new": 2, "updated": 0, "skipped": 0}
+    assert sorted(changes["new"]) == [scraped_job(1)["source_url"], scraped_job(2)["source_url"]]
+
+    changed = scraped_job(2, description="Nowy opis oferty z dyżurami i innym wynagrodzeniem.")
+    changes = {}
+    assert scraper.save_or_update_to_db([scraped_job(1), changed, scraped_job(3)], db, changes=changes,
+                                        bulk=bulk) == {"new": 1, "updated": 1, "skipped": 1}
+    assert changes == {"updated": [changed["source_url"]], "new": [scraped_job(3)["source_url"]]}
+    assert offers(db)[changed["source_url"]].description == changed["description"]
+
+    assert scraper.save_or_update_to_db([changed], db, update_existing=False, bulk=bulk) == \
+        {"new": 0, "updated": 0, "skipped": 1}
+
+
+def test_upsert_keeps_identity_and_first_seen(scraper, db):
+    scraper.save_or_update_to_db([scraped_job(1)], db)
+    stored = offers(db)[scraped_job(1)["source_url"]]
+    identity = (stored.id, stored.created_at, stored.first_seen_at, stored.canonical_url, stored.summary)
+
+    changed = scraped_job(1, title="Pielęgniarka anestezjologiczna 1",
+                          description="Oferta pracy na bloku operacyjnym, praca w systemie zmianowym.")
+    assert scraper.save_or_update_to_db([changed], db) == {"new": 0, "updated": 1, "skipped": 0}
+
+    offer = offers(db)[changed["source_url"]]
+    assert (offer.id, offer.created_at, offer.first_seen_at, offer.canonical_url) == identity[:4]
+    assert offer.title == "Pielęgniarka anestezjologiczna 1"
+    assert offer.summary != identity[4]
+    assert offer.last_seen_at > stored.first_seen_at
+
+
+def test_unchanged_offers_keep_their_summary(scraper, db):
+    scraper.save_or_update_to_db([scraped_job(1)], db)
+    summary = offers(db)[scraped_job(1)["source_url"]].summary
+
+    # The upsert passes no summary for unchanged content (an external_job_url forces the row through it)
+    job = scraped_job(1, external_job_url="https://aplikuj.example/1")
+    assert scraper.save_or_update_to_db([job], db) == {"new": 0, "updated": 0, "skipped": 1}
+
+    offer = offers(db)[job["source_url"]]
+    assert offer.summary == summary
+    assert offer.external_job_url == "https://aplikuj.example/1"
+
+
+def test_inactive_offers_are_reactivated(scraper, db):
+    scraper.save_or_update_to_db([scraped_job(1)], db)
+    db.query(JobOffer).update({JobOffer.status: "inactive"})
+    db.commit()
+
+    assert scraper.save_or_update_to_db([scraped_job(1)], db) == {"new": 0, "updated": 1, "skipped": 0}
+    assert offers(db)[scraped_job(1)["source_url"]].status == "active"
+
+
+def test_url_variants_update_the_stored_offer(scraper, db):
+    scraper.save_or_update_to_db([scraped_job(1)], db)
+
+    variant_url = scraped_job(1)["source_url"] + "?utm_campaign=praca"
+    changed = scraped_job(1, source_url=variant_url, description="Zmieniony opis oferty po aktualizacji.")
+    # The second variant in the same batch repeats the canonical URL and is skipped
+    assert scraper.save_or_update_to_db([changed, scraped_job(1, source_url=variant_url + "#top")], db) == \
+        {"new": 0, "updated": 1, "skipped": 1}
+
+    stored = offers(db)
+    assert list(stored) == [scraped_job(1)["source_url"]]
+    assert stored[scraped_job(1)["source_url"]].description == changed["description"]
+
+
+def test_legacy_offer_gets_source_id_and_content_hash(scraper, db):
+    job = scraped_job(1)
+    now = datetime.utcnow() - timedelta(days=1)
+    db.add(JobOffer(title=job["title"], facility_name=job["facility_name"], city=job["city"], role=job["role"],
+                    description=job["description"], source_url=job["source_url"], status="active",
+                    scraped_at=now, last_seen_at=now))
+    db.commit()
+
+    assert scraper.save_or_update_to_db([job], db) == {"new": 0, "updated": 0, "skipped": 1}
+
+    offer = offers(db)[job["source_url"]]
+    assert offer.source_id == "test_source"
+    assert offer.content_hash is not None
+    assert offer.last_seen_at > now
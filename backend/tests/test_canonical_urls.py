@@ -0,0 +1,78 @@
+"""
+Canonical offer URLs: canonicalize_url() and the backfill of offers stored
+before job_offers.canonical_url existed.
+
+Usage:
+    python -m pytest tests/test_canonical_urls.py
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.database import backfill_canonical_urls
+from app.models import JobOffer, MedicalRole
+from app.utils.urls import canonicalize_url
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("https://szpital.example/oferta/", "https://szpital.example/oferta"),
+    ("HTTPS://Szpital.Example:443/oferta#a1b2", "https://szpital.example/oferta"),
+    ("http://szpital.example:8080/", "http://szpital.example:8080/"),
+    ("https://szpital.example/oferta?id=7&utm_source=fb&fbclid=x", "https://szpital.example/oferta?id=7"),
+    ("https://szpital.example/oferta?b=2&a=1", "https://szpital.example/oferta?b=2&a=1"),
+    ("https://szpital.example/oferta?q=a%20b", "https://szpital.example/oferta?q=a%20b"),
+])
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+
+def add_offer(db, source_url, status="active", canonical_url=None):
+    now = datetime.utcnow()
+    db.add(JobOffer(title="Ratownik medyczny", facility_name="Szpital Testowy", city="Gdynia",
+                    role=MedicalRole.RATOWNIK, source_url=source_url, canonical_url=canonical_url, status=status,
+                    scraped_at=now, last_seen_at=now))
+    db.commit()
+
+
+def stored(db):
+    db.expire_all()
+    return {offer.source_url: (offer.canonical_url, offer.status) for offer in db.query(JobOffer)}
+
+
+def test_backfill_assigns_canonical_urls_and_retires_duplicates(db):
+    add_offer(db, "https://szpital.example/oferta-1")
+    add_offer(db, "https://szpital.example/oferta-1/#apply")
+    add_offer(db, "https://szpital.example/oferta-2?utm_medium=email", status="inactive")
+    add_offer(db, "https://szpital.example/oferta-2/", status="inactive")
+    add_offer(db, "https://szpital.example/oferta-3/")
+    add_offer(db, "https://szpital.example/oferta-3", canonical_url="https://szpital.example/oferta-3")
+
+    assert backfill_canonical_urls(dry_run=True)["assigned"] == 2
+    assert [canonical_url for canonical_url, _ in stored(db).values()].count(None) == 5
+
+    report = backfill_canonical_urls()
+
+    assert report == {
+        "assigned": 2,
+        "duplicates": ["https://szpital.example/oferta-1/#apply", "https://szpital.example/oferta-2/",
+                       "https://szpital.example/oferta-3/"],
+        "inactivated": 2,
+    }
+    assert stored(db) == {
+        "https://szpital.example/oferta-1": ("https://szpital.example/oferta-1", "active"),
+        "https://szpital.example/oferta-1/#apply": (None, "inactive"),
+        "https://szpital.example/oferta-2?utm_medium=email": ("https://szpital.example/oferta-2", "inactive"),
+        "https://szpital.example/oferta-2/": (None, "inactive"),
+        "https://szpital.example/oferta-3/": (None, "inactive"),
+        "https://szpital.example/oferta-3": ("https://szpital.example/oferta-3", "active"),
+    }
+    # Duplicates keep canonical_url NULL and are reported again, but there is nothing left to write
+    report = backfill_canonical_urls()
+    assert (report["assigned"], report["inactivated"]) == (0, 0)
+
+
+def test_canonical_url_is_unique(db):
+    add_offer(db, "https://szpital.example/oferta-1", canonical_url="https://szpital.example/oferta-1")
+    with pytest.raises(IntegrityError):
+        add_offer(db, "https://szpital.example/oferta-1/", canonical_url="https://szpital.example/oferta-1")
@@ -0,0 +1,138 @@
+"""
+Changeset diff of a source refresh: inserts, content updates, timestamp-only
+updates, reactivation, stale-offer inactivation and canonical URL matching.
+
+Usage:
+    python -m pytest tests/test_changeset.py
+"""
+from datetime import datetime, timedelta
+
+from app.models import JobOffer, MedicalRole
+from app.services.changeset import apply_changeset, build_changeset
+
+
+def scraped_job(number, **overrides):
+    job = {
+        "title": f"Lekarz specjalista chorób wewnętrznych {number}",
+        "facility_name": "Szpital Testowy",
+        "city": "Gdynia",
+        "role": MedicalRole.LEKARZ,
+        "description": f"Oferta pracy numer {number} w oddziale chorób wewnętrznych.",
+        "source_url": f"https://szpital.example/kariera/oferta-{number}",
+    }
+    job.update(overrides)
+    return job
+
+
+def refresh(scraper, jobs, db, changes=None):
+    """Diff and apply a scrape like refresh_source() does, returning the counts."""
+    changeset = build_changeset(scraper, jobs, datetime.utcnow(), db)
+    counts = apply_changeset(changeset, db, changes)
+    db.commit()
+    return changeset, counts
+
+
+def offers(db):
+    db.expire_all()
+    return {offer.source_url: offer for offer in db.query(JobOffer)}
+
+
+def test_new_offers_are_inserted(scraper, db):
+    changes = {}
+    changeset, counts = refresh(scraper, [scraped_job(1), scraped_job(2)], db, changes)
+
+    assert counts == {"new": 2, "updated": 0, "inactivated": 0}
+    assert sorted(changes["new"]) == [scraped_job(1)["source_url"], scraped_job(2)["source_url"]]
+    stored = offers(db)
+    assert len(stored) == 2
+    offer = stored[scraped_job(1)["source_url"]]
+    assert offer.status == "active"
+    assert offer.source_id == "test_source"
+    assert offer.canonical_url == scraped_job(1)["source_url"]
+    assert offer.content_hash and offer.summary
+
+
+def test_unchanged_offers_only_move_timestamps(scraper, db):
+    refresh(scraper, [scraped_job(1)], db)
+    before = offers(db)[scraped_job(1)["source_url"]].last_seen_at
+
+    changeset, counts = refresh(scraper, [scraped_job(1)], db)
+
+    assert counts == {"new": 0, "updated": 0, "inactivated": 0}
+    assert changeset.updates == [] and len(changeset.seen_ids) == 1
+    assert offers(db)[scraped_job(1)["source_url"]].last_seen_at > before
+
+
+def test_changed_offers_are_updated(scraper, db):
+    refresh(scraper, [scraped_job(1)], db)
+    old_hash = offers(db)[scraped_job(1)["source_url"]].content_hash
+
+    changed = scraped_job(1, description="Nowy opis oferty z innymi wymaganiami i wynagrodzeniem.")
+    changes = {}
+    _, counts = refresh(scraper, [changed], db, changes)
+
+    assert counts == {"new": 0, "updated": 1, "inactivated": 0}
+    assert changes["updated"] == [changed["source_url"]]
+    offer = offers(db)[changed["source_url"]]
+    assert offer.description == changed["description"]
+    assert offer.content_hash != old_hash
+
+
+def test_missing_offers_are_inactivated_and_reactivated(scraper, db):
+    refresh(scraper, [scraped_job(1), scraped_job(2)], db)
+
+    changes = {}
+    _, counts = refresh(scraper, [scraped_job(1)], db, changes)
+    assert counts["inactivated"] == 1
+    assert changes["inactivated"] == [scraped_job(2)["source_url"]]
+    assert offers(db)[scraped_job(2)["source_url"]].status == "inactive"
+
+    # Inactive offers are not in the snapshot, but are found and reactivated
+    changes = {}
+    changeset, counts = refresh(scraper, [scraped_job(1), scraped_job(2)], db, changes)
+    assert counts == {"new": 0, "updated": 1, "inactivated": 0}
+    assert changeset.reactivated_urls == [scraped_job(2)["source_url"]]
+    assert changes["reactivated"] == [scraped_job(2)["source_url"]]
+    assert all(offer.status == "active" for offer in offers(db).values())
+    assert len(offers(db)) == 2
+
+
+def test_url_variants_match_the_stored_offer(scraper, db):
+    refresh(scraper, [scraped_job(1)], db)
+
+    variant = scraped_job(1, source_url=scraped_job(1)["source_url"] + "/?utm_source=newsletter#apply")
+    _, counts = refresh(scraper, [variant, scraped_job(1)], db)
+
+    assert counts == {"new": 0, "updated": 0, "inactivated": 0}
+    assert list(offers(db)) == [scraped_job(1)["source_url"]]
+
+
+def test_offers_of_other_sources_are_left_alone(scraper, db):
+    now = datetime.utcnow()
+    db.add(JobOffer(title="Pielęgniarka", facility_name="Inny szpital", city="Sopot", role=MedicalRole.PIELĘGNIARKA,
+                    source_url="https://inny.example/oferta", canonical_url="https://inny.example/oferta",
+                    source_id="other_source", status="active", scraped_at=now - timedelta(days=1),
+                    last_seen_at=now - timedelta(days=1)))
+    db.commit()
+
+    _, counts = refresh(scraper, [scraped_job(1)], db)
+
+    assert counts["inactivated"] == 0
+    assert offers(db)["https://inny.example/oferta"].status == "active"
+
+
+def test_legacy_offer_without_source_id_is_adopted(scraper, db):
+    now = datetime.utcnow()
+    job = scraped_job(1)
+    db.add(JobOffer(title=job["title"], facility_name=job["facility_name"], city=job["city"], role=job["role"],
+                    description=job["description"], source_url=job["source_url"], status="active",
+                    scraped_at=now, last_seen_at=now))
+    db.commit()
+
+    changeset, counts = refresh(scraper, [job], db)
+
+    # Stored before source_id and content_hash existed: both are filled in, but it is no update
+    assert counts == {"new": 0, "updated": 0, "inactivated": 0}
+    offer = offers(db)[job["source_url"]]
+    assert offer.source_id == "test_source"
+    assert offer.content_hash is not None
@@ -0,0 +1,102 @@
+"""
+GET /api/jobs: fields= projection, text search and the physiotherapist flag.
+
+Usage:
+    python -m pytest tests/test_jobs_api.py
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.jobs import FIELD_PRESETS, LIST_FIELDS, parse_fields
+from app.main import app
+from app.models import JobOffer, MedicalRole
+
+
+@pytest.fixture
+def client(db):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def add_offer(db, number, title, description=None, status="active", role=MedicalRole.LEKARZ):
+    db.add(JobOffer(title=title, facility_name="Szpital Testowy", city="Gdynia", role=role,
+                    description=description, summary=f"Podsumowanie {number}",
+                    source_url=f"https://szpital.example/kariera/oferta-{number}", status=status,
+                    created_at=datetime(2026, 1, 1) + timedelta(days=number)))
+    db.commit()
+
+
+def test_parse_fields_presets():
+    assert parse_fields(None) == FIELD_PRESETS["card"]
+    assert parse_fields("") == FIELD_PRESETS["card"]
+    assert "description" not in parse_fields("card")
+    assert parse_fields("full") == LIST_FIELDS
+
+
+def test_parse_fields_keeps_response_order():
+    assert parse_fields(" title , id,title") == ("id", "title")
+
+
+@pytest.mark.parametrize("fields", ["id,salary", ",", "cards"])
+def test_parse_fields_rejects_unknown_fields(fields):
+    with pytest.raises(HTTPException) as error:
+        parse_fields(fields)
+    assert error.value.status_code == 400
+
+
+def test_card_fields_leave_out_the_description(client, db):
+    add_offer(db, 1, "Lekarz rodzinny", description="Długi opis oferty.")
+
+    body = client.get("/api/jobs").json()
+
+    assert body["fields"] == list(FIELD_PRESETS["card"])
+    assert body["total"] == 1
+    result = body["results"][0]
+    assert set(result) == set(FIELD_PRESETS["card"])
+    assert result["role"] == MedicalRole.LEKARZ.value
+    assert result["created_at"] == "2026-01-02T00:00:00"
+
+
+def test_selected_fields_only(client, db):
+    add_offer(db, 1, "Lekarz rodzinny", description="Długi opis oferty.")
+
+    assert client.get("/api/jobs", params={"fields": "title,id"}).json()["results"] == \
+        [{"id": 1, "title": "Lekarz rodzinny"}]
+    assert client.get("/api/jobs", params={"fields": "full"}).json()["results"][0]["description"] == \
+        "Długi opis oferty."
+    assert client.get("/api/jobs", params={"fields": "id,salary"}).status_code == 400
+
+
+def test_search_matches_title_or_description(client, db):
+    add_offer(db, 1, "Lekarz rodzinny", description="Przychodnia w centrum.")
+    add_offer(db, 2, "Rehabilitacja", description="Poszukujemy osoby na stanowisko FIZJOTERAPEUTA.")
+    add_offer(db, 3, "Fizjoterapeuta dziecięcy", status="inactive")
+    add_offer(db, 4, "Specjalista 100% etatu", description="Praca od zaraz.")
+
+    def search(q):
+        return [job["id"] for job in client.get("/api/jobs", params={"q": q, "fields": "id"}).json()["results"]]
+
+    assert search("fizjoterapeuta") == [2]
+    assert search("RODZINNY") == [1]
+    # LIKE wildcards in the query match literally
+    assert search("100%") == [4]
+    assert search("%") == [4]
+    assert search("_") == []
+    assert search("  ") == [4, 2, 1]
+
+
+def test_physiotherapist_flag_covers_the_description(client, db):
+    add_offer(db, 1, "Lekarz rodzinny")
+    add_offer(db, 2, "Rehabilitacja", description="Zatrudnimy fizjoterapeutę (fizjoterapeut/ka).")
+    add_offer(db, 3, "Physiotherapist")
+
+    results = client.get("/api/jobs", params={"fields": "id,mentions_physiotherapist"}).json()["results"]
+
+    assert results == [
+        {"id": 3, "mentions_physiotherapist": True},
+        {"id": 2, "mentions_physiotherapist": True},
+        {"id": 1, "mentions_physiotherapist": False},
+    ]
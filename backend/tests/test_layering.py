@@ -0,0 +1,32 @@
+"""
+Import layering: app.services imports the scrapers, so the scrapers must not
+import app.services (shared persistence helpers live in app.offer_store).
+
+Usage:
+    python -m pytest tests/test_layering.py
+"""
+import ast
+import os
+
+import pytest
+
+SCRAPERS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "scrapers")
+SCRAPER_MODULES = sorted(name for name in os.listdir(SCRAPERS_DIR) if name.endswith(".py"))
+
+
+def imported_modules(path):
+    """Names of the modules imported anywhere in the file at path."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            yield from (alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            yield node.module
+
+
+@pytest.mark.parametrize("module", SCRAPER_MODULES)
+def test_scrapers_do_not_import_services(module):
+    imports = [name for name in imported_modules(os.path.join(SCRAPERS_DIR, module))
+               if name == "app.services" or name.startswith("app.services.")]
+    assert not imports, f"app/scrapers/{module} imports {imports}"
@@ -0,0 +1,114 @@
+"""
+Query plans of the API and refresh queries (see scripts/check_query_plans.py).
+
+The SQLite tests run against a temporary database. The PostgreSQL tests run
+only when TEST_DATABASE_URL points to a dedicated scratch PostgreSQL
+database (DATABASE_URL is never used): missing tables and indexes are
+created, and 20000 offers under https://query-plans.invalid/ are committed
+and vacuumed, so the planner sees realistic statistics and visibility, then
+deleted again.
+
+Usage:
+    python -m pytest tests/test_query_plans.py
+    TEST_DATABASE_URL=postgresql://localhost/scratch python -m pytest tests/test_query_plans.py
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.engine import make_url
+
+from app.models import Base, JobOffer
+from scripts.check_query_plans import INDEXES, check_plan, explain, query_shapes
+
+SQLITE_SHAPES = query_shapes('sqlite')
+POSTGRES_SHAPES = query_shapes('postgresql')
+SHAPE_IDS = [name for name, _, _, _ in SQLITE_SHAPES]
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+requires_postgres = pytest.mark.skipif(
+    TEST_DATABASE_URL is None or make_url(TEST_DATABASE_URL).get_backend_name() != 'postgresql',
+    reason="TEST_DATABASE_URL is not set to a scratch PostgreSQL database",
+)
+
+
+@pytest.fixture(scope="module")
+def sqlite_conn(tmp_path_factory):
+    engine = create_engine("sqlite:///" + str(tmp_path_factory.mktemp("plans") / "plans.db"))
+    Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        yield conn
+    engine.dispose()
+
+
+# Mostly inactive offers from the last 100 days, spread over sources; the
+# role queried for (LEKARZ) is a few percent of them. created_at does not
+# follow the physical row order, as after a few refreshes have updated rows.
+SEED_OFFERS = """
+INSERT INTO job_offers (title, facility_name, city, role, source_url, scraped_at, created_at,
+                        source_id, last_seen_at, status)
+SELECT 'Oferta ' || i, 'Szpital', 'Gdańsk',
+       CASE WHEN i % 25 = 0 THEN 'LEKARZ'
+            ELSE (ARRAY['PIELĘGNIARKA', 'POŁOŻNA', 'RATOWNIK', 'INNY'])[1 + i % 4] END::medicalrole,
+       'https://query-plans.invalid/' || i, now(), now() - (i * 7919 % 20000) * interval '1 minute',
+       CASE WHEN i % 50 = 0 THEN 'uck' ELSE 'source_' || i % 50 END,
+       now() - (i % 100) * interval '1 day',
+       CASE WHEN i % 4 = 0 THEN 'active' ELSE 'inactive' END
+FROM generate_series(1, 20000) AS i
+"""
+
+
+DELETE_SEEDED = "DELETE FROM job_offers WHERE source_url LIKE 'https://query-plans.invalid/%'"
+
+
+@pytest.fixture(scope="module")
+def postgres_conn():
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(DELETE_SEEDED))
+        conn.execute(text(SEED_OFFERS))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            conn.execute(text("VACUUM ANALYZE job_offers"))
+            yield conn
+        finally:
+            conn.execute(text(DELETE_SEEDED))
+            conn.execute(text("VACUUM ANALYZE job_offers"))
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name, statement, index_name, sorted_by_index", SQLITE_SHAPES, ids=SHAPE_IDS)
+def test_sqlite_plan(sqlite_conn, name, statement, index_name, sorted_by_index):
+    plan = explain(sqlite_conn, statement)
+    assert check_plan('sqlite', plan, index_name, sorted_by_index) == [], "\n".join(plan)
+
+
+@requires_postgres
+@pytest.mark.parametrize("name, statement, index_name, sorted_by_index", POSTGRES_SHAPES, ids=SHAPE_IDS)
+def test_postgres_plan(postgres_conn, name, statement, index_name, sorted_by_index):
+    plan = explain(postgres_conn, statement)
+    assert check_plan('postgresql', plan, index_name, sorted_by_index) == [], "\n".join(plan)
+
+
+@requires_postgres
+@pytest.mark.parametrize("index_name", INDEXES['postgresql'])
+def test_postgres_index_is_partial(postgres_conn, index_name):
+    definition = postgres_conn.execute(
+        text("SELECT indexdef FROM pg_indexes WHERE tablename = 'job_offers' AND indexname = :name"),
+        {"name": index_name},
+    ).scalar()
+    assert definition is not None, f"{index_name} is missing"
+    keys, _, predicate = definition.partition(" WHERE ")
+    assert "'active'" in predicate, definition
+    # status belongs in the predicate only; as a leading key column it blocks seeks on the others
+    assert "status" not in keys, definition
+
+
+@requires_postgres
+def test_postgres_inactive_offers_skip_partial_indexes(postgres_conn):
+    # Only active offers are in the partial indexes, so they can't serve other statuses
+    statement = select(JobOffer.id).where(JobOffer.status == 'inactive').order_by(JobOffer.created_at.desc())
+    plan = "\n".join(explain(postgres_conn, statement))
+    assert not any(index_name in plan for index_name in INDEXES['postgresql']), plan
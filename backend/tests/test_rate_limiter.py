@@ -0,0 +1,105 @@
+"""
+Per-host rate limiter: host keys, slot accounting and AIMD adaptation.
+
+Usage:
+    python -m pytest tests/test_rate_limiter.py
+"""
+import time
+
+import pytest
+
+from app.scrapers.rate_limiter import HostLimiter, get_host_limiter, host_key
+
+
+@pytest.mark.parametrize("url, key", [
+    ("https://www.luxmed.pl/kariera", "luxmed.pl"),
+    ("https://szpital-gdansk.luxmed.pl/oferty", "luxmed.pl"),
+    ("https://szpital.olsztyn.com.pl/praca", "olsztyn.com.pl"),
+    ("http://127.0.0.1:8000/jobs", "127.0.0.1"),
+    ("https://UCK.GDA.PL/", "gda.pl"),
+])
+def test_host_key(url, key):
+    assert host_key(url) == key
+
+
+def test_subdomains_share_a_limiter():
+    assert get_host_limiter("https://www.luxmed.pl/a") is get_host_limiter("https://praca.luxmed.pl/b")
+    assert get_host_limiter("https://www.luxmed.pl/a") is not get_host_limiter("https://uck.gda.pl/")
+
+
+def test_in_flight_limit_and_tokens():
+    limiter = HostLimiter(rate=100.0, max_in_flight=4)
+    limiter.tokens = 100.0
+    assert limiter.in_flight_limit == 2
+
+    assert limiter._try_acquire() == 0.0
+    assert limiter._try_acquire() == 0.0
+    assert limiter._try_acquire() > 0
+    assert limiter.in_flight == 2
+
+    limiter.release(200, 0.1)
+    assert limiter.in_flight == 1
+    assert limiter._try_acquire() == 0.0
+
+
+def test_empty_bucket_waits_for_the_next_token():
+    limiter = HostLimiter(rate=1.0)
+    assert limiter._try_acquire() == 0.0
+    assert 0.9 < limiter._try_acquire() <= 1.0
+
+
+def test_healthy_responses_increase_additively():
+    limiter = HostLimiter(rate=1.0, max_in_flight=4)
+    for _ in range(3):
+        limiter.release(200, 0.1)
+    assert limiter.rate == pytest.approx(1.75)
+    assert limiter.in_flight_limit == 4
+
+
+def test_throttling_decreases_multiplicatively_with_a_cooldown():
+    limiter = HostLimiter(rate=2.0, max_in_flight=4)
+    limiter.release(429, 0.1)
+
+    assert limiter.rate == pytest.approx(1.0)
+    assert limiter.in_flight_limit == 1
+    assert limiter.cooldown_until - time.monotonic() == pytest.approx(HostLimiter.initial_backoff, abs=0.1)
+    assert limiter.backoff == HostLimiter.initial_backoff * 2
+    assert limiter._try_acquire() > 1.0
+
+    # Retry-After takes precedence; a healthy response resets the backoff
+    limiter.release(503, 0.1, retry_after="5")
+    assert limiter.cooldown_until - time.monotonic() == pytest.approx(5, abs=0.1)
+    limiter.release(200, 0.1)
+    assert limiter.backoff == HostLimiter.initial_backoff
+
+
+def test_deadline_before_the_cooldown_ends():
+    limiter = HostLimiter()
+    limiter.release(None, 1.0, failed=True)
+
+    with pytest.raises(TimeoutError):
+        limiter.acquire(deadline=time.monotonic() + 0.1)
+    assert limiter.in_flight == 0
+
+
+def test_latency_spike_eases_off():
+    limiter = HostLimiter(rate=2.0, max_in_flight=4)
+    limiter.release(200, 0.1)
+    limit = limiter.in_flight_limit
+
+    limiter.release(200, 1.0)
+
+    assert limiter.rate == pytest.approx(2.25 * 0.75)
+    assert limiter.in_flight_limit == limit - 1
+    assert limiter.cooldown_until == 0.0
+
+
+def test_requests_given_up_locally_leave_the_limits_alone():
+    limiter = HostLimiter(rate=2.0)
+    limiter._try_acquire()
+
+    limiter.release(None, 30.0)
+
+    assert limiter.in_flight == 0
+    assert limiter.rate == 2.0
+    assert limiter.latency_avg is None
@@ -0,0 +1,134 @@
+"""
+Refresh job queue: coalescing, single-flight claims, lease renewal and
+takeover of expired leases, and per-source leases.
+
+Usage:
+    python -m pytest tests/test_refresh_queue.py
+"""
+from datetime import datetime, timedelta
+
+from app.models import RefreshJob, SourceLease
+from app.services.refresh_queue import (
+    acquire_source_lease,
+    claim_job,
+    enqueue_refresh,
+    finish_job,
+    get_job,
+    release_source_lease,
+    renew_job_lease,
+    set_job_run,
+)
+
+
+def expire_job_lease(job_id, db):
+    db.query(RefreshJob).filter(RefreshJob.id == job_id).update(
+        {RefreshJob.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+
+def test_requests_are_coalesced_into_the_queued_job(db):
+    job_id, coalesced = enqueue_refresh(["b"], False, db)
+    assert not coalesced
+
+    assert enqueue_refresh(["a"], False, db) == (job_id, True)
+    # A dry run is a different kind of job
+    dry_run_id, coalesced = enqueue_refresh(["a"], True, db)
+    assert dry_run_id != job_id and not coalesced
+
+    job = get_job(job_id, db)
+    assert job["sources"] == ["a", "b"]
+    assert job["request_count"] == 2
+
+    # All sources absorbs any selection
+    enqueue_refresh(None, False, db)
+    assert get_job(job_id, db)["sources"] is None
+
+
+def test_claim_is_single_flight(db):
+    first_id, _ = enqueue_refresh(["a"], False, db)
+
+    claimed = claim_job("worker-1", db)
+    assert claimed == {"id": first_id, "sources": ["a"], "dry_run": False, "resumed": False, "run_id": None}
+    assert get_job(first_id, db)["status"] == "running"
+
+    # Queued while the first job runs: nobody may start it
+    second_id, coalesced = enqueue_refresh(["b"], False, db)
+    assert not coalesced
+    assert claim_job("worker-2", db) is None
+
+    finish_job(first_id, "worker-1", "done", None, None, None, db)
+    assert get_job(first_id, db)["status"] == "done"
+    assert claim_job("worker-2", db)["id"] == second_id
+
+
+def test_claim_folds_jobs_queued_meanwhile(db):
+    first_id, _ = enqueue_refresh(["a"], False, db)
+    claim_job("worker-1", db)
+    second_id, _ = enqueue_refresh(["b"], False, db)
+    # Bypasses enqueue coalescing, like two API processes inserting concurrently
+    db.add(RefreshJob(status='queued', sources='["c"]', dry_run=False, requested_at=datetime.utcnow()))
+    db.commit()
+    finish_job(first_id, "worker-1", "done", None, None, None, db)
+
+    claimed = claim_job("worker-2", db)
+    assert claimed["id"] == second_id
+    assert claimed["sources"] == ["b", "c"]
+    assert get_job(second_id, db)["request_count"] == 2
+    assert db.query(RefreshJob).filter(RefreshJob.status == 'coalesced').count() == 1
+
+
+def test_renew_job_lease(db):
+    job_id, _ = enqueue_refresh(None, False, db)
+    claim_job("worker-1", db)
+    expire_job_lease(job_id, db)
+
+    assert renew_job_lease(job_id, "worker-1", db)
+    db.expire_all()
+    assert db.get(RefreshJob, job_id).lease_expires_at > datetime.utcnow()
+    # The renewed lease keeps other workers out
+    assert claim_job("worker-2", db) is None
+    assert not renew_job_lease(job_id, "worker-2", db)
+
+
+def test_expired_lease_is_taken_over_and_resumes_the_run(db):
+    job_id, _ = enqueue_refresh(["a"], False, db)
+    claim_job("worker-1", db)
+    set_job_run(job_id, "worker-1", 42, db)
+
+    # Live lease: not abandoned yet
+    assert claim_job("worker-2", db) is None
+
+    expire_job_lease(job_id, db)
+    assert claim_job("worker-2", db) == {"id": job_id, "sources": ["a"], "dry_run": False, "resumed": True,
+                                         "run_id": 42}
+    # The previous worker lost the job
+    assert not renew_job_lease(job_id, "worker-1", db)
+    finish_job(job_id, "worker-1", "failed", None, "late", None, db)
+    assert get_job(job_id, db)["status"] == "running"
+
+
+def test_worker_reclaims_its_own_job_after_recycling(db):
+    job_id, _ = enqueue_refresh(None, False, db)
+    claim_job("worker-1", db)
+
+    claimed = claim_job("worker-1", db)
+    assert claimed["id"] == job_id and claimed["resumed"]
+
+
+def test_source_lease(db):
+    assert acquire_source_lease("a", "run1", db)
+    # Renewal by the holder, refusal for anyone else
+    assert acquire_source_lease("a", "run1", db)
+    assert not acquire_source_lease("a", "run2", db)
+    assert acquire_source_lease("b", "run2", db)
+
+    db.query(SourceLease).filter(SourceLease.source_id == "a").update(
+        {SourceLease.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    assert acquire_source_lease("a", "run2", db)
+
+    # Only the holder releases a lease
+    release_source_lease("a", "run1", db)
+    assert not acquire_source_lease("a", "run1", db)
+    release_source_lease("a", "run2", db)
+    assert acquire_source_lease("a", "run1", db)
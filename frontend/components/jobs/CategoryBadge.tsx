@@ -5,17 +5,19 @@ interface CategoryBadgeProps {
   role: MedicalRole;
   title?: string; // Optional: for enhanced physiotherapist detection
   description?: string | null; // Optional: for enhanced physiotherapist detection
+  mentionsPhysiotherapist?: boolean; // Optional: the API's check of the description (list results)
   size?: 'sm' | 'md';
 }
 
-export default function CategoryBadge({ role, title, description, size = 'sm' }: CategoryBadgeProps) {
+export default function CategoryBadge({ role, title, description, mentionsPhysiotherapist, size = 'sm' }: CategoryBadgeProps) {
   let category = getCategoryForRole(role);
   
   // Enhanced detection: check title/description for physiotherapist
   // even if role is "INNY" (same logic as filterUtils)
-  if (category === JobPositionCategory.OTHER && (title || description)) {
+  if (category === JobPositionCategory.OTHER && (title || description || mentionsPhysiotherapist)) {
     const text = `${title || ''} ${description || ''}`.toLowerCase();
     if (
+      mentionsPhysiotherapist ||
       text.includes('fizjoterapeuta') ||
       text.includes('fizjoterapeutka') ||
       text.includes('fizjoterapeut') ||
@@ -20,8 +20,8 @@ interface JobCardProps {
  * All data comes from props - no business logic or data generation.
  */
 export default function JobCard({ job }: JobCardProps) {
-  // Use summary if available, otherwise fallback to description (for backward compatibility)
-  const summary = job.summary || job.description || null;
+  // List results carry the summary only (the description is loaded on the detail page)
+  const summary = job.summary || null;
   const displaySummary = summary 
     ? (summary.length > 150 ? summary.substring(0, 150) + '...' : summary)
     : null;
@@ -36,7 +36,8 @@ export default function JobCard({ job }: JobCardProps) {
           <CategoryBadge 
             role={job.role} 
             title={job.title}
-            description={job.description}
+            description={job.summary}
+            mentionsPhysiotherapist={job.mentions_physiotherapist}
             size="sm" 
           />
         </div>
@@ -76,10 +76,11 @@ export default function JobDetailClient({ job }: JobDetailClientProps) {
       // Enhanced detection for physiotherapist
       if (baseCategory === JobPositionCategory.OTHER) {
         const title = (j.title || '').toLowerCase();
-        const description = (j.description || '').toLowerCase();
-        const text = `${title} ${description}`;
+        const summary = (j.summary || '').toLowerCase();
+        const text = `${title} ${summary}`;
         
         if (
+          j.mentions_physiotherapist ||
           text.includes('fizjoterapeuta') ||
           text.includes('fizjoterapeutka') ||
           text.includes('fizjoterapeut') ||
@@ -7,7 +7,7 @@ import MobileFilterButton from '@/components/filters/MobileFilterButton';
 import MobileFilterModal from '@/components/filters/MobileFilterModal';
 import JobList from '@/components/jobs/JobList';
 import LoadingState from '@/components/ui/LoadingState';
-import { fetchJobs } from '@/lib/api';
+import { fetchJobs, searchJobIds } from '@/lib/api';
 import { filterJobs, parseFiltersFromURL, buildFiltersURL, FilterState } from '@/lib/filterUtils';
 import { sortJobs, SortOption } from '@/lib/sortUtils';
 import { JobOffer } from '@/types';
@@ -18,6 +18,8 @@ export default function JobsPageClient() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [isMobileModalOpen, setIsMobileModalOpen] = useState(false);
+  // Ids the API matched for the current search (null: no search, or still loading)
+  const [searchMatches, setSearchMatches] = useState<Set<number> | null>(null);
   const searchParams = useSearchParams();
   const router = useRouter();
 
@@ -77,6 +79,23 @@ export default function JobsPageClient() {
     }
   }, [searchParams]);
 
+  // Search on the API, which also matches descriptions (the cards only carry summaries)
+  useEffect(() => {
+    const query = filterState.searchQuery.trim();
+    setSearchMatches(null);
+    if (!query) return;
+
+    let cancelled = false;
+    searchJobIds(query)
+      .then((ids) => {
+        if (!cancelled) setSearchMatches(ids);
+      })
+      .catch((err) => console.error('Error searching jobs:', err));
+    return () => {
+      cancelled = true;
+    };
+  }, [filterState.searchQuery]);
+
   // Get sort option from URL
   const sortOption: SortOption = useMemo(() => {
     const sort = searchParams.get('sort') as SortOption;
@@ -91,9 +110,9 @@ export default function JobsPageClient() {
   // Apply client-side filtering and sorting
   const filteredJobs = useMemo(() => {
     if (loading) return [];
-    const filtered = filterJobs(allJobs, filterState);
+    const filtered = filterJobs(allJobs, filterState, searchMatches);
     return sortJobs(filtered, sortOption);
-  }, [allJobs, filterState, sortOption, loading]);
+  }, [allJobs, filterState, searchMatches, sortOption, loading]);
 
   if (loading) {
     return <LoadingState />;
@@ -11,7 +11,7 @@ interface SimilarJobCardProps {
  * Compact job card for similar jobs section
  */
 export default function SimilarJobCard({ job }: SimilarJobCardProps) {
-  const summary = job.summary || job.description || null;
+  const summary = job.summary || null;
   const displaySummary = summary 
     ? (summary.length > 80 ? summary.substring(0, 80) + '...' : summary)
     : null;
@@ -23,7 +23,8 @@ export default function SimilarJobCard({ job }: SimilarJobCardProps) {
           <CategoryBadge 
             role={job.role} 
             title={job.title}
-            description={job.description}
+            description={job.summary}
+            mentionsPhysiotherapist={job.mentions_physiotherapist}
             size="sm" 
           />
         </div>
@@ -20,6 +20,8 @@ export async function fetchJobs(params?: {
   role?: MedicalRole | null;
   limit?: number;
   offset?: number;
+  fields?: 'card' | 'full' | string;
+  q?: string;
 }): Promise<JobsResponse> {
   const searchParams = new URLSearchParams();
   
@@ -32,6 +34,14 @@ export async function fetchJobs(params?: {
   if (params?.offset) {
     searchParams.append('offset', params.offset.toString());
   }
+  // 'card' (the API default) leaves out description; 'full' includes it
+  if (params?.fields) {
+    searchParams.append('fields', params.fields);
+  }
+  // Search runs on the API, which also matches the description (not in card results)
+  if (params?.q?.trim()) {
+    searchParams.append('q', params.q.trim());
+  }
 
   const queryString = searchParams.toString();
   // Ensure we don't have double slashes
@@ -72,3 +82,11 @@ export async function fetchJob(id: number): Promise<JobOffer> {
   return response.json();
 }
 
+/**
+ * Ids of the active offers whose title or description contains the query
+ * (only ids are transferred; filter the loaded cards with them)
+ */
+export async function searchJobIds(query: string): Promise<Set<number>> {
+  const data = await fetchJobs({ limit: 1000, fields: 'id', q: query });
+  return new Set((data.results || []).map((job) => job.id));
+}
@@ -4,7 +4,7 @@
  * Implements:
  * - OR logic within the same filter group (e.g., Nurse OR Physiotherapist)
  * - AND logic across different filter groups (e.g., (Nurse OR Physiotherapist) AND Gdańsk)
- * - Global search across title and description
+ * - Global search across title and description (matched by the API)
  */
 
 import { JobOffer, MedicalRole } from '@/types';
@@ -24,15 +24,17 @@ export interface FilterState {
 function getJobPositionCategory(job: JobOffer): JobPositionCategory {
   const baseCategory = getCategoryForRole(job.role);
   
-  // Enhanced detection: check title/description for physiotherapist
+  // Enhanced detection: check title/summary for physiotherapist;
+  // the API flags offers whose description mentions one (mentions_physiotherapist)
   // even if role is "INNY"
   if (baseCategory === JobPositionCategory.OTHER) {
     const title = (job.title || '').toLowerCase();
-    const description = (job.description || '').toLowerCase();
-    const text = `${title} ${description}`;
+    const summary = (job.summary || '').toLowerCase();
+    const text = `${title} ${summary}`;
     
     // Check for physiotherapist keywords
     if (
+      job.mentions_physiotherapist ||
       text.includes('fizjoterapeuta') ||
       text.includes('fizjoterapeutka') ||
       text.includes('fizjoterapeut') ||
@@ -75,18 +77,27 @@ function matchesCityFilter(job: JobOffer, selectedCities: string[]): boolean {
 
 /**
  * Check if a job offer matches the search query
- * Searches in title and description (case-insensitive)
+ * Uses the ids the API matched (title and description, see searchJobIds);
+ * until they arrive, searches title and summary (case-insensitive)
  */
-function matchesSearchQuery(job: JobOffer, searchQuery: string): boolean {
+function matchesSearchQuery(
+  job: JobOffer,
+  searchQuery: string,
+  searchMatches: Set<number> | null
+): boolean {
   if (!searchQuery.trim()) {
     return true; // No search = show all
   }
 
+  if (searchMatches) {
+    return searchMatches.has(job.id);
+  }
+
   const query = searchQuery.toLowerCase().trim();
   const title = (job.title || '').toLowerCase();
-  const description = (job.description || '').toLowerCase();
+  const summary = (job.summary || '').toLowerCase();
 
-  return title.includes(query) || description.includes(query);
+  return title.includes(query) || summary.includes(query);
 }
 
 /**
@@ -95,12 +106,19 @@ function matchesSearchQuery(job: JobOffer, searchQuery: string): boolean {
  * Logic:
  * - OR within groups: (position1 OR position2) AND (city1 OR city2)
  * - AND across groups: positions AND cities AND search
+ *
+ * searchMatches holds the ids the API matched for filters.searchQuery
+ * (see searchJobIds); null while they are loading
  */
-export function filterJobs(jobs: JobOffer[], filters: FilterState): JobOffer[] {
+export function filterJobs(
+  jobs: JobOffer[],
+  filters: FilterState,
+  searchMatches: Set<number> | null = null
+): JobOffer[] {
   return jobs.filter((job) => {
     const matchesPosition = matchesPositionFilter(job, filters.positions);
     const matchesCity = matchesCityFilter(job, filters.cities);
-    const matchesSearch = matchesSearchQuery(job, filters.searchQuery);
+    const matchesSearch = matchesSearchQuery(job, filters.searchQuery, searchMatches);
 
     // AND logic across filter groups
     return matchesPosition && matchesCity && matchesSearch;
@@ -13,13 +13,15 @@ export type SortOption = 'recommended' | 'a-z' | 'z-a';
 function getJobPositionCategory(job: JobOffer): JobPositionCategory {
   const baseCategory = getCategoryForRole(job.role);
   
-  // Enhanced detection: check title/description for physiotherapist
+  // Enhanced detection: check title/summary for physiotherapist;
+  // the API flags offers whose description mentions one (mentions_physiotherapist)
   if (baseCategory === JobPositionCategory.OTHER) {
     const title = (job.title || '').toLowerCase();
-    const description = (job.description || '').toLowerCase();
-    const text = `${title} ${description}`;
+    const summary = (job.summary || '').toLowerCase();
+    const text = `${title} ${summary}`;
     
     if (
+      job.mentions_physiotherapist ||
       text.includes('fizjoterapeuta') ||
       text.includes('fizjoterapeutka') ||
       text.includes('fizjoterapeut') ||
@@ -16,8 +16,9 @@ export interface JobOffer {
   facility_name: string;
   city: string;
   role: MedicalRole;
-  description: string | null;
+  description?: string | null; // Only in GET /api/jobs/{id}; list results carry the summary
   summary: string | null;
+  mentions_physiotherapist?: boolean; // Title or description names a physiotherapist (list results)
   source_url: string;
   created_at: string;
   scraped_at?: string;
@@ -27,6 +28,7 @@ export interface JobsResponse {
   total: number;
   limit: number;
   offset: number;
+  fields?: string[];
   results: JobOffer[];
 }
 
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Backfill of canonical_url for existing job offers.
+
+Offers stored before canonical_url existed have it NULL. The backfill sets
+it to canonicalize_url(source_url), oldest offer first. An offer whose
+canonical URL is already taken is a duplicate (e.g. the same page with a
+different fragment or tracking parameters): it keeps canonical_url NULL and,
+if still active, is marked inactive.
+
+init_db() runs the backfill at startup (app.database.backfill_canonical_urls);
+this script previews it (--dry-run) or runs it without starting the app.
+
+Usage: python scripts/backfill_canonical_urls.py [--dry-run]
+"""
+import os
+import sys
+
+# Add backend to path
+backend_path = os.path.join(os.path.dirname(__file__), '..', 'backend')
+sys.path.insert(0, backend_path)
+os.chdir(backend_path)
+
+from app.database import add_missing_columns, backfill_canonical_urls
+
+
+def backfill(dry_run: bool = False):
+    """Set canonical_url on offers that lack it and inactivate duplicates."""
+    report = backfill_canonical_urls(dry_run=dry_run)
+    for source_url in report['duplicates']:
+        print(f"  duplicate: {source_url}")
+    if dry_run:
+        print(f"Dry run: {report['assigned']} offers would get a canonical_url, "
+              f"{len(report['duplicates'])} duplicates found ({report['inactivated']} active)")
+    else:
+        print(f"✅ Set canonical_url on {report['assigned']} offers, "
+              f"inactivated {report['inactivated']} of {len(report['duplicates'])} duplicates")
+
+
+if __name__ == '__main__':
+    # Schema only; init_db() would run the backfill itself
+    add_missing_columns()
+    backfill(dry_run='--dry-run' in sys.argv[1:])
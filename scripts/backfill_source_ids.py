@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+One-time backfill of source_id for legacy job offers.
+
+Offers stored before the refresh mechanism have no source_id. The refresh
+only inactivates offers by source_id, so this script assigns each legacy
+offer to the source whose base_url appears in its source_url (one UPDATE
+per source). Offers that match no source are reported and left alone.
+
+Usage: python scripts/backfill_source_ids.py [--dry-run]
+"""
+import os
+import sys
+
+# Add backend to path
+backend_path = os.path.join(os.path.dirname(__file__), '..', 'backend')
+sys.path.insert(0, backend_path)
+os.chdir(backend_path)
+
+from app.database import SessionLocal, init_db
+from app.models import JobOffer
+from app.scrapers.registry import get_scraper, list_scrapers
+
+
+def backfill(dry_run: bool = False):
+    """Assign legacy offers without source_id to the source matching their URL."""
+    db = SessionLocal()
+    
+    try:
+        legacy = db.query(JobOffer).filter(JobOffer.source_id.is_(None)).count()
+        print(f"Found {legacy} offers without source_id")
+        if not legacy:
+            return
+        
+        # Longer base URLs first, so a more specific source wins over its parent site
+        sources = []
+        for name in list_scrapers():
+            try:
+                sources.append((name, get_scraper(name).base_url))
+            except Exception as e:
+                print(f"⚠️  Skipping {name}: {e}")
+        sources.sort(key=lambda source: len(source[1] or ''), reverse=True)
+        
+        total = 0
+        for name, base_url in sources:
+            if not base_url:
+                continue
+            matched = db.query(JobOffer).filter(
+                JobOffer.source_id.is_(None),
+                JobOffer.source_url.contains(base_url, autoescape=True)
+            ).update({JobOffer.source_id: name}, synchronize_session=False)
+            if matched:
+                print(f"  {name}: {matched} offers")
+                total += matched
+        
+        if dry_run:
+            db.rollback()
+            print(f"Dry run: {total} offers would be assigned")
+        else:
+            db.commit()
+            print(f"✅ Assigned {total} offers")
+        
+        remaining = legacy - total
+        if remaining:
+            print(f"⚠️  {remaining} offers match no configured source and keep source_id NULL")
+    
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Backfill failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    init_db()
+    backfill(dry_run='--dry-run' in sys.argv[1:])
@@ -1,18 +1,24 @@
 #!/usr/bin/env python3
 """
-Script to clean existing job titles and descriptions in the database.
+Script to clean existing job titles and facility names in the database.
+
+Runs as a chunked, resumable backfill (app/services/backfill.py): progress is
+committed every --chunk-size rows, and an interrupted run continues where it
+stopped.
 """
 
+import argparse
+import logging
 import os
 import sys
 
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
-from app.database import SessionLocal, init_db
+from app.database import init_db
 from app.models import JobOffer
 from app.scrapers.base import BaseScraper
-from app.models import MedicalRole
+from app.services.backfill import add_backfill_arguments, run_backfill
 
 class CleanerScraper(BaseScraper):
     """Dummy scraper just for cleaning functions."""
@@ -22,43 +28,43 @@ class CleanerScraper(BaseScraper):
     def scrape(self):
         return []
 
-def clean_database():
-    """Clean all job titles and descriptions in the database."""
+scraper = CleanerScraper()
+
+def clean_job(job):
+    """Row function: cleaned title and facility name, if cleaning made a difference."""
+    cleaned_title = scraper.clean_title(job.title)
+    cleaned_facility = scraper.clean_facility_name(job.facility_name)
+    
+    if cleaned_title != job.title or cleaned_facility != job.facility_name:
+        return {'title': cleaned_title, 'facility_name': cleaned_facility}
+    return None
+
+def clean_database(args):
+    """Clean all job titles and facility names in the database."""
     init_db()
-    db = SessionLocal()
-    scraper = CleanerScraper("", "", "")
+    examples = []
+    
+    def report(job, changes):
+        examples.append(job.id)
+        if len(examples) <= 5:  # Show first 5 examples
+            print(f"\nUpdated job ID {job.id}:")
+            print(f"  Old title: {job.title[:100]}...")
+            print(f"  New title: {changes['title']}")
     
-    try:
-        jobs = db.query(JobOffer).all()
-        print(f"Found {len(jobs)} jobs to clean...")
-        
-        updated_count = 0
-        for job in jobs:
-            original_title = job.title
-            cleaned_title = scraper.clean_title(original_title)
-            cleaned_facility = scraper.clean_facility_name(job.facility_name)
-            
-            # Check if cleaning made a difference
-            if cleaned_title != original_title or cleaned_facility != job.facility_name:
-                job.title = cleaned_title
-                job.facility_name = cleaned_facility
-                updated_count += 1
-                
-                if updated_count <= 5:  # Show first 5 examples
-                    print(f"\nUpdated job ID {job.id}:")
-                    print(f"  Old title: {original_title[:100]}...")
-                    print(f"  New title: {cleaned_title}")
-        
-        db.commit()
-        print(f"\n✅ Cleaned {updated_count} job titles")
-        
-    except Exception as e:
-        db.rollback()
-        print(f"❌ Error: {e}")
-        raise
-    finally:
-        db.close()
+    stats = run_backfill(
+        'clean_titles',
+        [JobOffer.title, JobOffer.facility_name],
+        clean_job,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        dry_run=args.dry_run,
+        restart=args.restart,
+        report=report,
+    )
+    print(f"\n✅ {stats}")
 
 if __name__ == "__main__":
-    clean_database()
-
+    parser = argparse.ArgumentParser(description='Clean job titles and facility names')
+    add_backfill_arguments(parser)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    clean_database(parser.parse_args())
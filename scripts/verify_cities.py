@@ -1,17 +1,26 @@
 #!/usr/bin/env python3
 """
 Script to verify and update job offer cities based on title/description content.
+
+Runs as a chunked, resumable backfill (app/services/backfill.py): progress is
+committed every --chunk-size rows, and an interrupted run continues where it
+stopped.
 """
 
+import argparse
+import logging
 import os
 import sys
 
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
+from sqlalchemy import func
+
 from app.database import SessionLocal, init_db
 from app.models import JobOffer
 from app.scrapers.base import BaseScraper
+from app.services.backfill import add_backfill_arguments, run_backfill
 
 class CityVerifierScraper(BaseScraper):
     """Scraper just for city extraction."""
@@ -21,66 +30,69 @@ class CityVerifierScraper(BaseScraper):
     def scrape(self):
         return []
 
-def verify_and_update_cities():
+scraper = CityVerifierScraper()
+
+def verify_city(job):
+    """Row function: the city found in the title (or description), if it differs."""
+    # Try to extract city from title
+    city_from_title = scraper.extract_city(job.title)
+    
+    # Try to extract from description if title didn't work
+    city_from_desc = None
+    if not city_from_title and job.description:
+        city_from_desc = scraper.extract_city(job.description)
+    
+    extracted_city = city_from_title or city_from_desc
+    
+    # Update if we found a different city
+    if extracted_city and extracted_city != job.city:
+        return {'city': extracted_city}
+    return None
+
+def verify_and_update_cities(args):
     """Verify and update cities for all jobs."""
     init_db()
-    db = SessionLocal()
-    scraper = CityVerifierScraper()
+    city_stats = {}
     
-    try:
-        jobs = db.query(JobOffer).all()
-        print(f"Verifying cities for {len(jobs)} jobs...\n")
+    def report(job, changes):
+        extracted_city = changes['city']
         
-        updated = 0
-        city_stats = {}
+        # Track city changes
+        if extracted_city not in city_stats:
+            city_stats[extracted_city] = 0
+        city_stats[extracted_city] += 1
         
-        for job in jobs:
-            # Try to extract city from title
-            city_from_title = scraper.extract_city(job.title)
-            
-            # Try to extract from description if title didn't work
-            city_from_desc = None
-            if not city_from_title and job.description:
-                city_from_desc = scraper.extract_city(job.description)
-            
-            extracted_city = city_from_title or city_from_desc
-            
-            # Update if we found a different city
-            if extracted_city and extracted_city != job.city:
-                old_city = job.city
-                job.city = extracted_city
-                updated += 1
-                
-                # Track city changes
-                if extracted_city not in city_stats:
-                    city_stats[extracted_city] = 0
-                city_stats[extracted_city] += 1
-                
-                if updated <= 10:  # Show first 10 examples
-                    print(f"Job ID {job.id}:")
-                    print(f"  Title: {job.title[:60]}...")
-                    print(f"  Old city: {old_city}")
-                    print(f"  New city: {extracted_city}")
-                    print()
-        
-        db.commit()
-        
-        print(f"✅ Updated {updated} jobs with verified cities\n")
-        
-        if city_stats:
-            print("City distribution after update:")
-            from sqlalchemy import func
+        if sum(city_stats.values()) <= 10:  # Show first 10 examples
+            print(f"Job ID {job.id}:")
+            print(f"  Title: {job.title[:60]}...")
+            print(f"  Old city: {job.city}")
+            print(f"  New city: {extracted_city}")
+            print()
+    
+    stats = run_backfill(
+        'verify_cities',
+        [JobOffer.title, JobOffer.description, JobOffer.city],
+        verify_city,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        dry_run=args.dry_run,
+        restart=args.restart,
+        report=report,
+    )
+    print(f"✅ {stats}\n")
+    
+    if city_stats and not args.dry_run:
+        print("City distribution after update:")
+        db = SessionLocal()
+        try:
             final_stats = db.query(JobOffer.city, func.count(JobOffer.id)).group_by(JobOffer.city).order_by(func.count(JobOffer.id).desc()).all()
             for city, count in final_stats:
                 print(f"  {city}: {count} jobs")
-        
-    except Exception as e:
-        db.rollback()
-        print(f"❌ Error: {e}")
-        raise
-    finally:
-        db.close()
+        finally:
+            db.close()
 
 if __name__ == "__main__":
-    verify_and_update_cities()
-
+    parser = argparse.ArgumentParser(description='Verify and update job offer cities')
+    add_backfill_arguments(parser)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    verify_and_update_cities(parser.parse_args())